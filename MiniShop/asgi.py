@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'MiniShop.settings')
+# Async requests hop between threads, so a thread-bound persistent connection
+# would leak; use DB_POOL=true to reuse connections under ASGI.
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
@@ -0,0 +1,103 @@
+"""
+The OpenAPI document, built once per code version instead of on every hit.
+
+``manage.py build_schema`` writes ``openapi-<version>.json`` and ``.yaml``
+to ``OPENAPI_SCHEMA_DIR`` at deploy time. A process that finds no artifact
+for its version builds it on first request and stores it there. The files
+are served with a content ETag, so pollers get a 304 while nothing changed.
+"""
+import hashlib
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+import drf_yasg
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import condition, require_GET
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from drf_yasg.generators import OpenAPISchemaGenerator
+
+API_INFO = openapi.Info(
+    title="MiniShop API",
+    default_version='v1',
+    description="Mini shop",
+    terms_of_service="https://www.google.com/policies/terms/",
+    contact=openapi.Contact(email="contact@snippets.local"),
+    license=openapi.License(name="BSD License"),
+)
+
+FORMATS = {
+    'json': (OpenAPICodecJson, 'application/json'),
+    'yaml': (OpenAPICodecYaml, 'application/yaml'),
+}
+
+_lock = threading.Lock()
+_artifacts = {}
+
+
+@lru_cache(maxsize=None)
+def code_version():
+    """``CODE_VERSION`` if the deploy sets one, else a hash of the project's sources."""
+    if settings.CODE_VERSION:
+        return settings.CODE_VERSION
+    digest = hashlib.sha256(drf_yasg.__version__.encode())
+    for package in ('MiniShop', 'MiniShopApp'):
+        for path in sorted((Path(settings.BASE_DIR) / package).rglob('*.py')):
+            digest.update(str(path.relative_to(settings.BASE_DIR)).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def artifact_path(format):
+    return Path(settings.OPENAPI_SCHEMA_DIR) / f'openapi-{code_version()}.{format}'
+
+
+def build(format):
+    """Generate the document and write it to ``artifact_path``; return the bytes."""
+    codec, _ = FORMATS[format]
+    schema = OpenAPISchemaGenerator(API_INFO).get_schema(request=None, public=True)
+    content = codec(validators=[]).encode(schema)
+
+    path = artifact_path(format)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    partial.write_bytes(content)
+    os.replace(partial, path)
+    return content
+
+
+def get_artifact(format):
+    """``(content, etag)`` of the current version, read or built once per process."""
+    artifact = _artifacts.get(format)
+    if artifact is None:
+        with _lock:
+            artifact = _artifacts.get(format)
+            if artifact is None:
+                try:
+                    content = artifact_path(format).read_bytes()
+                except FileNotFoundError:
+                    content = build(format)
+                etag = '"%s"' % hashlib.sha256(content).hexdigest()[:32]
+                artifact = _artifacts[format] = (content, etag)
+    return artifact
+
+
+def _etag(request, format):
+    if format not in FORMATS:
+        return None
+    return get_artifact(format)[1]
+
+
+@require_GET
+@condition(etag_func=_etag)
+def schema_file(request, format):
+    if format not in FORMATS:
+        raise Http404
+    content, _ = get_artifact(format)
+    response = HttpResponse(content, content_type=FORMATS[format][1])
+    # Let clients and the gateway keep a copy but revalidate it each time.
+    response['Cache-Control'] = 'public, no-cache'
+    return response
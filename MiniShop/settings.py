@@ -10,8 +10,10 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+from importlib.util import find_spec
 from pathlib import Path
 import os
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -48,6 +50,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'MiniShopApp.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -80,6 +83,29 @@ WSGI_APPLICATION = 'MiniShop.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Connection reuse. DB_CONN_MAX_AGE keeps each thread's connection open for
+# that many seconds ('none' for no limit, 0 to close it after every request);
+# DB_CONN_HEALTH_CHECKS pings a reused connection before the first query of a
+# request. DB_POOL=true switches to Django's built-in pool instead, which
+# needs psycopg 3 (`pip install "psycopg[binary,pool]"`) and replaces
+# persistent connections. The ASGI entry point defaults DB_CONN_MAX_AGE to 0,
+# since async requests do not stay on one thread.
+
+DB_POOL = os.getenv('DB_POOL', 'false').lower() == 'true'
+if DB_POOL and find_spec('psycopg_pool') is None:
+    # requirements.txt pins psycopg2, which has no pool; fail here rather
+    # than on the first connection.
+    raise ImproperlyConfigured(
+        'DB_POOL=true needs psycopg 3 and its pool: pip install "psycopg[binary,pool]".'
+    )
+DB_POOL_OPTIONS = {
+    'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+    'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+    'timeout': int(os.getenv('DB_POOL_TIMEOUT', '10')),
+}
+_conn_max_age = os.getenv('DB_CONN_MAX_AGE', '60').lower()
+DB_CONN_MAX_AGE = 0 if DB_POOL else None if _conn_max_age == 'none' else int(_conn_max_age)
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -88,10 +114,51 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
         'PORT': os.getenv('DB_PORT', '5432'),
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'true').lower() == 'true',
+        'OPTIONS': {'pool': DB_POOL_OPTIONS} if DB_POOL else {},
     }
 }
 
+# DB_ENGINE=sqlite runs on a local SQLite file (DB_NAME, default db.sqlite3)
+# instead, e.g. for the benchmark harness without a PostgreSQL server.
+# Transactions take the write lock up front so concurrent writers wait for
+# each other instead of failing with "database is locked".
+if os.getenv('DB_ENGINE', 'postgresql').lower() == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('DB_NAME') or str(BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {'timeout': 30, 'transaction_mode': 'IMMEDIATE'},
+        }
+    }
+
 SECRET_KEY = os.getenv('SECRET_KEY')
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# The "responses" cache holds rendered catalog responses and the version
+# counters that invalidate them. LocMemCache evicts the least recently used
+# entries once MAX_ENTRIES is reached, but it is private to each process: a
+# write only invalidates the worker that handled it. Deployments with more
+# than one worker process must point RESPONSE_CACHE_BACKEND at a shared
+# backend such as django.core.cache.backends.redis.RedisCache (checked by
+# `manage.py check --deploy`).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': os.getenv('RESPONSE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('RESPONSE_CACHE_LOCATION', 'minishop-responses'),
+        'TIMEOUT': int(os.getenv('RESPONSE_CACHE_TIMEOUT', '300')),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '10000')),
+        },
+    },
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -134,15 +201,41 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# Upper bound for the ?page_size= query parameter on list endpoints.
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', '100'))
+
+# Stateless JWT authentication keeps the users it has checked in a small
+# per-process cache; an entry is re-read from the database after the TTL.
+JWT_USER_CACHE_TTL = int(os.getenv('JWT_USER_CACHE_TTL', '60'))
+JWT_USER_CACHE_SIZE = int(os.getenv('JWT_USER_CACHE_SIZE', '10000'))
+
+# Sale and purchase creates sent with an Idempotency-Key header keep their
+# response this long (seconds); a retry within it gets the same response back.
+# Expired keys are removed by the expire_idempotency_keys command.
+IDEMPOTENCY_KEY_TTL = int(os.getenv('IDEMPOTENCY_KEY_TTL', '86400'))
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'MiniShopApp.authentication.StatelessJWTAuthentication'
+        if os.getenv('JWT_STATELESS_AUTH', 'true').lower() == 'true'
+        else 'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
-'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',    
+'DEFAULT_PAGINATION_CLASS': 'MiniShopApp.pagination.ShopPagination',
 'PAGE_SIZE': 5,
+    # JSON in and out goes through orjson when it is installed; the bytes are
+    # the same as DRF's JSONRenderer/JSONParser (MiniShopApp/renderers.py).
+    'DEFAULT_RENDERER_CLASSES': [
+        'MiniShopApp.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'MiniShopApp.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
         'rest_framework.filters.OrderingFilter',
@@ -150,6 +243,23 @@ REST_FRAMEWORK = {
     ]
 }
 
+# Per-route latency, SQL and serialization metrics, served at /metrics in the
+# Prometheus text format (MiniShopApp/metrics.py). The endpoint is closed by
+# default: scrapers send "Authorization: Bearer <METRICS_TOKEN>" or connect
+# from METRICS_ALLOWED_IPS, comma-separated addresses or networks matched
+# against REMOTE_ADDR. METRICS_PUBLIC=true opens it to everyone. Requests
+# slower than SLOW_REQUEST_SECONDS are logged with their SQL; 0 turns that off.
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+METRICS_ALLOWED_IPS = [network.strip() for network in os.getenv('METRICS_ALLOWED_IPS', '').split(',') if network.strip()]
+METRICS_PUBLIC = os.getenv('METRICS_PUBLIC', 'false').lower() == 'true'
+SLOW_REQUEST_SECONDS = float(os.getenv('SLOW_REQUEST_SECONDS', '1.0'))
+
+# The OpenAPI document is prebuilt per code version (see MiniShop/schema.py).
+# Set CODE_VERSION (e.g. the git SHA) at deploy time to skip hashing sources.
+CODE_VERSION = os.getenv('CODE_VERSION', '')
+OPENAPI_SCHEMA_DIR = os.getenv('OPENAPI_SCHEMA_DIR', str(BASE_DIR / 'openapi'))
+
 SWAGGER_SETTINGS = {
     'SECURITY_DEFINITIONS': {
         'JWT': {
@@ -160,6 +270,11 @@ SWAGGER_SETTINGS = {
         }
     },
     'USE_SESSION_AUTH': False,
+    'SPEC_URL': ('schema-json', {'format': 'json'}),
+}
+
+REDOC_SETTINGS = {
+    'SPEC_URL': ('schema-json', {'format': 'json'}),
 }
 
 SWAGGER_USE_COMPAT_RENDERERS = False
\ No newline at end of file
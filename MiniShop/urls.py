@@ -15,24 +15,17 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
-from MiniShopApp import urls
+from django.urls import path, include, re_path
+from MiniShopApp import metrics, urls
 from rest_framework_simplejwt import views as jwt_views
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
+from MiniShop import schema
 
 ...
 
 schema_view = get_schema_view(
-   openapi.Info(
-      title="MiniShop API",
-      default_version='v1',
-      description="Mini shop",
-      terms_of_service="https://www.google.com/policies/terms/",
-      contact=openapi.Contact(email="contact@snippets.local"),
-      license=openapi.License(name="BSD License"),
-   ),
+   schema.API_INFO,
    public=True,
    permission_classes=(permissions.AllowAny,),
 )
@@ -46,8 +39,9 @@ urlpatterns = [
     path('api/token/refresh/',
          jwt_views.TokenRefreshView.as_view(),
          name ='token_refresh'),
-    path('swagger<format>/', schema_view.without_ui(cache_timeout=0), name='schema-json'),
+    re_path(r'^swagger\.(?P<format>json|yaml)$', schema.schema_file, name='schema-json'),
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
     path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    path('metrics', metrics.metrics_view, name='metrics'),
 
 ]
@@ -9,3 +9,5 @@ admin.site.register(Customer)
 admin.site.register(Supplier)
 admin.site.register(Purchase)
 admin.site.register(Sale)
+admin.site.register(DailyTotals)
+admin.site.register(Order)
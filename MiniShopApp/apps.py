@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class MinishopappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'MiniShopApp'
+
+    def ready(self):
+        from . import checks, signals
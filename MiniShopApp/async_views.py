@@ -0,0 +1,128 @@
+from functools import wraps
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework import exceptions, status
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from . import models, serializers
+from .authentication import StatelessJWTAuthentication
+from .metrics import serializing
+from .renderers import FastJSONRenderer
+
+# Async, read-only twins of the hottest catalog routes. Under ASGI they run on
+# the event loop instead of hopping to the sync worker thread, and render the
+# same JSON as the DRF ViewSets. Filtering and search stay on the sync routes.
+
+PRODUCT_ORDERING = ['created_at', 'updated_at', 'name', 'price']
+
+authentication = StatelessJWTAuthentication()
+renderer = FastJSONRenderer()
+
+
+def render(data, status_code=status.HTTP_200_OK, headers=None):
+    with serializing():
+        content = renderer.render(data)
+    return HttpResponse(content, status=status_code, headers=headers, content_type='application/json')
+
+
+def render_error(exc):
+    headers = None
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        headers = {'WWW-Authenticate': authentication.authenticate_header(None)}
+    detail = exc.detail if isinstance(exc.detail, dict) else {'detail': exc.detail}
+    return render(detail, exc.status_code, headers)
+
+
+def jwt_required(view):
+    """Authenticate the bearer token and pass the user on as ``request.user``."""
+    @require_GET
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            result = await authentication.aauthenticate(request)
+            if result is None:
+                raise exceptions.NotAuthenticated()
+            request.user, request.auth = result
+            return await view(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return render_error(exc)
+    return wrapper
+
+
+def get_page_size(request):
+    page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+    try:
+        requested = int(request.GET['page_size'])
+    except (KeyError, ValueError):
+        return page_size
+    return min(requested, settings.MAX_PAGE_SIZE) if requested > 0 else page_size
+
+
+async def paginate(request, queryset, serializer_class):
+    """The same page and links ``PageNumberPagination`` would return."""
+    page_size = get_page_size(request)
+    count = await queryset.acount()
+    pages = max(1, -(-count // page_size))
+    page = request.GET.get('page', 1)
+    try:
+        page = pages if page == 'last' else int(page)
+    except ValueError:
+        page = 0
+    if not 1 <= page <= pages:
+        raise exceptions.NotFound('Invalid page.')
+
+    offset = (page - 1) * page_size
+    rows = [row async for row in queryset[offset:offset + page_size]]
+    url = request.build_absolute_uri()
+    previous = None
+    if page == 2:
+        previous = remove_query_param(url, 'page')
+    elif page > 2:
+        previous = replace_query_param(url, 'page', page - 1)
+    return {
+        'count': count,
+        'next': replace_query_param(url, 'page', page + 1) if page < pages else None,
+        'previous': previous,
+        'results': serializer_class(rows, many=True).data,
+    }
+
+
+def owned_products(request):
+    return models.Product.objects.filter(owner=request.user).select_related('category')
+
+
+@jwt_required
+async def product_list(request):
+    ordering = request.GET.get('ordering', 'created_at')
+    if ordering.lstrip('-') not in PRODUCT_ORDERING:
+        ordering = 'created_at'
+    queryset = owned_products(request).order_by(ordering)
+    return render(await paginate(request, queryset, serializers.ProductSerializer))
+
+
+@jwt_required
+async def product_detail(request, pk):
+    try:
+        product = await owned_products(request).aget(pk=pk)
+    except models.Product.DoesNotExist:
+        raise exceptions.NotFound('No Product matches the given query.')
+    return render(serializers.ProductSerializer(product).data)
+
+
+@jwt_required
+async def product_stock(request, pk):
+    try:
+        product = await models.Product.objects.filter(owner=request.user).only(
+            'sku', 'quantity_in_stock', 'updated_at',
+        ).aget(pk=pk)
+    except models.Product.DoesNotExist:
+        raise exceptions.NotFound('No Product matches the given query.')
+    return render(serializers.ProductStockSerializer(product).data)
+
+
+@jwt_required
+async def category_list(request):
+    queryset = models.Category.objects.order_by('name')
+    return render(await paginate(request, queryset, serializers.CategorySerializer))
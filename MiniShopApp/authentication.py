@@ -0,0 +1,142 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class TTLCache:
+    """
+    A thread-safe, size-bounded LRU map whose entries expire ``ttl`` seconds
+    after they were stored.
+    """
+
+    def __init__(self, maxsize, ttl, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires <= self.clock():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (self.clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+user_cache = TTLCache(settings.JWT_USER_CACHE_SIZE, settings.JWT_USER_CACHE_TTL)
+
+
+def get_full_user(user_id):
+    """Return the full ``User`` row, read at most once per TTL per process."""
+    user = user_cache.get(user_id)
+    if user is None:
+        user = get_user_model()._default_manager.get(pk=user_id)
+        user_cache.set(user_id, user)
+    return user
+
+
+async def aget_full_user(user_id):
+    """``get_full_user`` for async views."""
+    user = user_cache.get(user_id)
+    if user is None:
+        user = await get_user_model()._default_manager.aget(pk=user_id)
+        user_cache.set(user_id, user)
+    return user
+
+
+def token_user_id(validated_token):
+    try:
+        return validated_token[api_settings.USER_ID_CLAIM]
+    except KeyError:
+        raise InvalidToken('Token contained no recognizable user identification')
+
+
+def check_user(user, validated_token):
+    """The account checks simplejwt makes after loading the user."""
+    if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+        raise AuthenticationFailed('User is inactive', code='user_inactive')
+
+    if api_settings.CHECK_REVOKE_TOKEN:
+        if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed("The user's password has been changed.", code='password_changed')
+
+
+def token_user(user_id):
+    """
+    A ``User`` instance that only carries its primary key. It can be used in
+    ``filter(owner=...)`` and assigned to foreign keys without a query; any
+    other field is loaded from the database on first access.
+    """
+    User = get_user_model()
+    return User.from_db(DEFAULT_DB_ALIAS, [User._meta.pk.attname], [user_id])
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    ``JWTAuthentication`` without the per-request ``auth_user`` lookup.
+
+    The user is built from the validated token's user id claim. Whether the
+    account still exists and is active is checked against ``user_cache``, so
+    a deactivated user is locked out within ``JWT_USER_CACHE_TTL`` seconds
+    (immediately in the process that saved the change).
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user = get_full_user(token_user_id(validated_token))
+        except get_user_model().DoesNotExist:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+
+        check_user(user, validated_token)
+        return token_user(user.pk)
+
+    async def aauthenticate(self, request):
+        """``authenticate`` for async Django views, which get a plain ``HttpRequest``."""
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        try:
+            user = await aget_full_user(token_user_id(validated_token))
+        except get_user_model().DoesNotExist:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+
+        check_user(user, validated_token)
+        return token_user(user.pk), validated_token
@@ -0,0 +1,329 @@
+"""
+Benchmark harness: a deterministic shop generator and mixed API workloads.
+
+``seed`` fills the database with benchmark owners, each with a catalog,
+customers, suppliers and years of sales and purchases. ``run`` sends a
+weighted mix of requests through the WSGI handler from several threads,
+each authenticated as one of those owners, and ``summarize`` turns the
+timings into throughput and p50/p95/p99 per endpoint. Results are plain
+dicts so the ``benchmark`` command can save them as JSON and ``compare``
+can diff two runs. Requests go through the whole middleware stack but not
+a network or an HTTP server.
+"""
+import json
+import math
+import platform
+import random
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection, connections, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import journal, models, reports
+
+OWNER_PREFIX = 'bench-'
+PASSWORD = 'bench-password'
+BATCH_SIZE = 5000
+# Plenty for the write workloads; purchases top it up as they go.
+OPENING_STOCK = 1_000_000
+
+ADJECTIVES = ['Red', 'Blue', 'Steel', 'Oak', 'Compact', 'Wireless', 'Classic', 'Pro', 'Mini', 'Smart', 'Organic', 'Travel']
+NOUNS = ['Lamp', 'Chair', 'Phone', 'Kettle', 'Desk', 'Speaker', 'Cable', 'Monitor', 'Jacket', 'Bottle', 'Backpack', 'Mug']
+
+
+def seed(owners=2, products=500, customers=200, suppliers=20, years=2, sales_per_day=50, purchases_per_day=5,
+         random_seed=0, log=None):
+    """
+    Create ``owners`` benchmark shops and return the row counts written.
+
+    The same arguments always produce the same shops. Sales and purchases
+    are spread over the last ``years`` years; stock starts at the journal's
+    opening balance and the daily report totals are rebuilt at the end.
+    """
+    rng = random.Random(random_seed)
+    log = log or (lambda message: None)
+    categories = [models.Category.objects.get_or_create(name=noun)[0] for noun in NOUNS]
+    today = date.today()
+    days = [today - timedelta(days=offset) for offset in range(years * 365, -1, -1)]
+    counts = defaultdict(int)
+
+    for index in range(owners):
+        owner = User.objects.create_user(username=f'{OWNER_PREFIX}{index}', password=PASSWORD)
+        with transaction.atomic():
+            catalog = models.Product.objects.bulk_create([
+                models.Product(
+                    owner=owner, name=f'{rng.choice(ADJECTIVES)} {NOUNS[i % len(NOUNS)]} {i:05d}',
+                    sku=f'B{index}-{i:06d}', price=Decimal(rng.randint(100, 50000)) / 100,
+                    quantity_in_stock=OPENING_STOCK, reorder_level=rng.choice([None, 10, 50]),
+                    category=categories[i % len(categories)],
+                )
+                for i in range(products)
+            ], batch_size=BATCH_SIZE)
+            buyers = models.Customer.objects.bulk_create([
+                models.Customer(owner=owner, name=f'Customer {i:05d}', email=f'customer{i}@example.com',
+                                phone=f'+359{rng.randint(10 ** 8, 10 ** 9 - 1)}' if i % 3 else None)
+                for i in range(customers)
+            ], batch_size=BATCH_SIZE)
+            vendors = models.Supplier.objects.bulk_create([
+                models.Supplier(owner=owner, name=f'Supplier {i:04d}', contact_email=f'supplier{i}@example.com')
+                for i in range(suppliers)
+            ], batch_size=BATCH_SIZE)
+            # The generated history predates the journal, like the rows the
+            # journal migration opened balances for.
+            journal.record_many(models.StockMovement.OPENING, [(product.pk, OPENING_STOCK, None) for product in catalog])
+
+            sales, purchases = [], []
+            for day in days:
+                for _ in range(rng.randint(sales_per_day // 2, sales_per_day * 3 // 2)):
+                    product = rng.choice(catalog)
+                    quantity = rng.randint(1, 5)
+                    sales.append(models.Sale(
+                        owner=owner, product=product, customer=rng.choice(buyers), quantity=quantity, sale_date=day,
+                        sale_price=product.price, total_price=quantity * product.price,
+                    ))
+                for _ in range(rng.randint(0, purchases_per_day * 2)):
+                    quantity = rng.randint(10, 100)
+                    cost = (Decimal(rng.randint(50, 90)) / 100 * rng.choice(catalog).price).quantize(Decimal('0.01'))
+                    purchases.append(models.Purchase(
+                        owner=owner, product=rng.choice(catalog), supplier=rng.choice(vendors), quantity=quantity,
+                        purchase_date=day, unit_cost_price=cost, total_price=quantity * cost,
+                    ))
+                if len(sales) >= BATCH_SIZE:
+                    counts['sales'] += _flush(models.Sale, sales)
+                    counts['purchases'] += _flush(models.Purchase, purchases)
+            counts['sales'] += _flush(models.Sale, sales)
+            counts['purchases'] += _flush(models.Purchase, purchases)
+
+        reports.rebuild(owner)
+        counts['owners'] += 1
+        counts['products'] += len(catalog)
+        counts['customers'] += len(buyers)
+        counts['suppliers'] += len(vendors)
+        log(f'Seeded {owner.username}: {len(catalog)} products, {counts["sales"]} sales so far.')
+    return dict(counts)
+
+
+def _flush(model, rows):
+    model.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+    written = len(rows)
+    rows.clear()
+    return written
+
+
+def flush():
+    """Delete the benchmark owners and everything they own."""
+    deleted, _ = User.objects.filter(username__startswith=OWNER_PREFIX).delete()
+    return deleted
+
+
+class Shop:
+    """What the workloads need to know about one benchmark owner."""
+
+    def __init__(self, owner):
+        self.owner = owner
+        self.token = str(AccessToken.for_user(owner))
+        self.product_ids = list(models.Product.objects.filter(owner=owner).values_list('pk', flat=True))
+        self.products = list(models.Product.objects.filter(owner=owner).values_list('name', flat=True))
+        self.customers = list(models.Customer.objects.filter(owner=owner).values_list('name', flat=True))
+        self.suppliers = list(models.Supplier.objects.filter(owner=owner).values_list('name', flat=True))
+
+
+def _sale(shop, rng, product=None):
+    return {'product': product or rng.choice(shop.products), 'customer': rng.choice(shop.customers),
+            'quantity': rng.randint(1, 3), 'sale_date': date.today().isoformat()}
+
+
+def _purchase(shop, rng):
+    return {'product': rng.choice(shop.products), 'supplier': rng.choice(shop.suppliers),
+            'quantity': rng.randint(20, 200), 'purchase_date': date.today().isoformat(), 'unit_cost_price': '5.00'}
+
+
+# Each operation returns (method, path, query string, JSON body or None).
+OPERATIONS = {
+    'catalog-list': lambda shop, rng: (
+        'GET', '/products/', f'page={rng.randint(1, min(20, math.ceil(len(shop.products) / 20)))}&page_size=20', None,
+    ),
+    'catalog-search': lambda shop, rng: (
+        'GET', '/products/', f'search={rng.choice(ADJECTIVES + NOUNS).lower()[:rng.randint(3, 6)]}', None,
+    ),
+    'product-detail': lambda shop, rng: ('GET', f'/products/{rng.choice(shop.product_ids)}/', '', None),
+    'sale-list': lambda shop, rng: ('GET', '/sales/', 'pagination=cursor&page_size=50', None),
+    'report': lambda shop, rng: ('GET', '/reports/', f'group_by={rng.choice(["day", "month", "product"])}', None),
+    'sale-create': lambda shop, rng: ('POST', '/sales/', '', _sale(shop, rng)),
+    'sale-bulk': lambda shop, rng: ('POST', '/sales/bulk/', '', [_sale(shop, rng) for _ in range(20)]),
+    'purchase-bulk': lambda shop, rng: ('POST', '/purchases/bulk/', '', [_purchase(shop, rng) for _ in range(20)]),
+    'order-create': lambda shop, rng: ('POST', '/orders/', '', {
+        'customer': rng.choice(shop.customers), 'order_date': date.today().isoformat(),
+        'lines': [{'product': name, 'quantity': rng.randint(1, 3)} for name in rng.sample(shop.products, 5)],
+    }),
+}
+
+# Relative weights of the operations in each workload.
+WORKLOADS = {
+    'mixed': {
+        'catalog-list': 30, 'catalog-search': 15, 'product-detail': 15, 'sale-list': 10, 'report': 5,
+        'sale-create': 12, 'sale-bulk': 4, 'purchase-bulk': 4, 'order-create': 5,
+    },
+    'read': {'catalog-list': 40, 'catalog-search': 20, 'product-detail': 20, 'sale-list': 15, 'report': 5},
+    'write': {'sale-create': 50, 'sale-bulk': 15, 'purchase-bulk': 15, 'order-create': 20},
+}
+
+
+def _environ(shop, method, path, query, body, host):
+    content = b'' if body is None else json.dumps(body).encode()
+    environ = {
+        'REQUEST_METHOD': method, 'PATH_INFO': path, 'QUERY_STRING': query,
+        'SERVER_NAME': host, 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_AUTHORIZATION': f'Bearer {shop.token}', 'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(content), 'wsgi.errors': BytesIO(),
+    }
+    if body is not None:
+        environ.update(CONTENT_TYPE='application/json', CONTENT_LENGTH=str(len(content)))
+    return environ
+
+
+def run(workload='mixed', threads=4, requests=2000, duration=None, warmup=50, random_seed=0, host='localhost'):
+    """
+    Send ``requests`` requests (or keep going for ``duration`` seconds) of
+    ``workload`` from ``threads`` threads and return the results as a dict.
+
+    Each thread works as one benchmark owner, in turn, and draws operations
+    from its own seeded generator. The first ``warmup`` requests of each
+    thread are not timed.
+    """
+    owners = list(User.objects.filter(username__startswith=OWNER_PREFIX).order_by('username'))
+    if not owners:
+        raise ValueError('No benchmark owners; run the seed_benchmark command first.')
+    shops = [Shop(owner) for owner in owners]
+    names, weights = zip(*WORKLOADS[workload].items())
+    connections.close_all()
+
+    handler = WSGIHandler()
+    timings = defaultdict(list)
+    failures = defaultdict(int)
+    lock = threading.Lock()
+    deadline = None
+
+    def send(shop, name, rng):
+        method, path, query, body = OPERATIONS[name](shop, rng)
+        status = []
+        started = time.perf_counter()
+        response = handler(_environ(shop, method, path, query, body, host),
+                           lambda s, headers, exc_info=None: status.append(s))
+        b''.join(response)
+        response.close()
+        return time.perf_counter() - started, int(status[0][:3])
+
+    def worker(index, count):
+        shop = shops[index % len(shops)]
+        rng = random.Random(random_seed * 1000 + index)
+        mine, failed = defaultdict(list), defaultdict(int)
+        try:
+            for _ in range(warmup):
+                send(shop, rng.choices(names, weights)[0], rng)
+            sent = 0
+            while (sent < count) if deadline is None else (time.perf_counter() < deadline):
+                name = rng.choices(names, weights)[0]
+                elapsed, status = send(shop, name, rng)
+                mine[name].append(elapsed)
+                if status >= 400:
+                    failed[name] += 1
+                sent += 1
+        finally:
+            connections.close_all()
+            with lock:
+                for name, latencies in mine.items():
+                    timings[name] += latencies
+                for name, count in failed.items():
+                    failures[name] += count
+
+    per_thread, extra = divmod(requests, threads)
+    workers = [threading.Thread(target=worker, args=(i, per_thread + (i < extra))) for i in range(threads)]
+    started = time.perf_counter()
+    if duration is not None:
+        # Warm-up is not timed but does eat into the run.
+        deadline = started + duration
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'meta': {
+            'commit': _commit(),
+            'started_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'debug': settings.DEBUG,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'workload': workload,
+            'threads': threads,
+            'seed': random_seed,
+            'owners': len(shops),
+            'products': models.Product.objects.filter(owner__in=owners).count(),
+            'sales': models.Sale.objects.filter(owner__in=owners).count(),
+        },
+        'elapsed_seconds': round(elapsed, 3),
+        'endpoints': {name: summarize(timings[name], failures[name], elapsed) for name in sorted(timings)},
+        'total': summarize([t for latencies in timings.values() for t in latencies], sum(failures.values()), elapsed),
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+def summarize(latencies, errors, elapsed):
+    ordered = sorted(latencies)
+    if not ordered:
+        return {'requests': 0, 'errors': errors}
+    return {
+        'requests': len(ordered),
+        'errors': errors,
+        'throughput_rps': round(len(ordered) / elapsed, 2),
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 3),
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
+
+
+def compare(baseline, current, tolerance=0.10):
+    """
+    The endpoints of ``current`` that got worse than in ``baseline`` by more
+    than ``tolerance``: a higher p95 or lower throughput. Returns
+    ``(endpoint, metric, before, after)`` tuples.
+    """
+    regressions = []
+    for name, after in current['endpoints'].items():
+        before = baseline['endpoints'].get(name)
+        if not before or not before.get('requests') or not after.get('requests'):
+            continue
+        if after['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+            regressions.append((name, 'p95_ms', before['p95_ms'], after['p95_ms']))
+        if after['throughput_rps'] < before['throughput_rps'] * (1 - tolerance):
+            regressions.append((name, 'throughput_rps', before['throughput_rps'], after['throughput_rps']))
+    return regressions
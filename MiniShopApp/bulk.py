@@ -0,0 +1,204 @@
+from collections import defaultdict
+
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from . import caching, journal, models, reports, serializers, stock
+
+BATCH_SIZE = 1000
+DOES_NOT_EXIST = 'Object with name={value} does not exist.'
+NOT_ENOUGH_STOCK = 'Not enough stock to complete the sale.'
+
+
+def ingest_sales(owner, lines, atomic=True):
+    """
+    Create many sales in one transaction.
+
+    Product and customer names are resolved with one query each, stock for
+    every product is checked under lock and moved with a single UPDATE, and
+    the rows are written with ``bulk_create``. Returns ``(created, errors)``
+    where ``errors`` lists the rejected lines by index. When ``atomic`` is
+    set, any error rejects the whole batch.
+    """
+    errors = {}
+    valid = _validate(serializers.SaleLineSerializer, lines, errors)
+    products = _resolve(models.Product, owner, [data['product'] for _, data in valid], 'price')
+    customers = _resolve(models.Customer, owner, [data['customer'] for _, data in valid])
+
+    sales = []
+    deltas = defaultdict(int)
+    with transaction.atomic():
+        in_stock = stock.lock_stock({products[data['product']][0] for _, data in valid if data['product'] in products})
+
+        for index, data in valid:
+            line_errors = _missing(data, product=products, customer=customers)
+            if line_errors:
+                errors[index] = line_errors
+                continue
+
+            product_id, price = products[data['product']]
+            if data['quantity'] > in_stock.get(product_id, 0) + deltas[product_id]:
+                errors[index] = {'quantity': [NOT_ENOUGH_STOCK]}
+                continue
+
+            deltas[product_id] -= data['quantity']
+            sale_price = data.get('sale_price') or price
+            sales.append(models.Sale(
+                owner=owner,
+                product_id=product_id,
+                customer_id=customers[data['customer']][0],
+                quantity=data['quantity'],
+                sale_date=data['sale_date'],
+                sale_price=sale_price,
+                total_price=data['quantity'] * sale_price,
+            ))
+
+        if errors and atomic:
+            return 0, _report(errors)
+
+        stock.apply_stock_deltas(deltas)
+        models.Sale.objects.bulk_create(sales, batch_size=BATCH_SIZE)
+        journal.record_many(models.StockMovement.SALE, [(sale.product_id, -sale.quantity, sale.pk) for sale in sales])
+        reports.record_many(owner.pk, sales, 'sale_quantity', 'sale_total', 'sale_date')
+        caching.invalidate(models.Product, owner.pk)
+
+    return len(sales), _report(errors)
+
+
+def ingest_purchases(owner, lines, atomic=True):
+    """
+    Create many purchases in one transaction, the same way as ``ingest_sales``.
+    """
+    errors = {}
+    valid = _validate(serializers.PurchaseLineSerializer, lines, errors)
+    products = _resolve(models.Product, owner, [data['product'] for _, data in valid])
+    suppliers = _resolve(models.Supplier, owner, [data['supplier'] for _, data in valid])
+
+    purchases = []
+    deltas = defaultdict(int)
+    with transaction.atomic():
+        stock.lock_stock({products[data['product']][0] for _, data in valid if data['product'] in products})
+
+        for index, data in valid:
+            line_errors = _missing(data, product=products, supplier=suppliers)
+            if line_errors:
+                errors[index] = line_errors
+                continue
+
+            product_id = products[data['product']][0]
+            deltas[product_id] += data['quantity']
+            purchases.append(models.Purchase(
+                owner=owner,
+                product_id=product_id,
+                supplier_id=suppliers[data['supplier']][0],
+                quantity=data['quantity'],
+                purchase_date=data['purchase_date'],
+                unit_cost_price=data['unit_cost_price'],
+                total_price=data['quantity'] * data['unit_cost_price'],
+            ))
+
+        if errors and atomic:
+            return 0, _report(errors)
+
+        stock.apply_stock_deltas(deltas)
+        models.Purchase.objects.bulk_create(purchases, batch_size=BATCH_SIZE)
+        journal.record_many(
+            models.StockMovement.PURCHASE,
+            [(purchase.product_id, purchase.quantity, purchase.pk) for purchase in purchases],
+        )
+        reports.record_many(owner.pk, purchases, 'purchase_quantity', 'purchase_total', 'purchase_date')
+        caching.invalidate(models.Product, owner.pk)
+
+    return len(purchases), _report(errors)
+
+
+def place_order(owner, customer, order_date, lines):
+    """
+    Check out a basket: create an ``Order`` and one sale per line in one
+    transaction.
+
+    ``lines`` are dicts with ``product`` (a name), ``quantity`` and an
+    optional ``sale_price``. The way ``ingest_sales`` does it, names are
+    resolved with one query, every product is locked in id order and its
+    stock checked for all lines together, stock moves with a single UPDATE
+    and the lines are written with ``bulk_create``. Returns ``(order,
+    errors)``. A line naming an unknown product or short of stock rejects the
+    whole basket: ``order`` is then None and ``errors`` holds each line's
+    errors, ``{}`` for the good ones, the way DRF reports nested lists.
+    """
+    products = _resolve(models.Product, owner, [line['product'] for line in lines], 'price')
+    errors = {
+        index: _missing(line, product=products)
+        for index, line in enumerate(lines)
+        if line['product'] not in products
+    }
+    if errors:
+        return None, [errors.get(index, {}) for index in range(len(lines))]
+
+    sales = []
+    deltas = defaultdict(int)
+    with transaction.atomic():
+        in_stock = stock.lock_stock({products[line['product']][0] for line in lines})
+
+        for index, line in enumerate(lines):
+            product_id, price = products[line['product']]
+            if line['quantity'] > in_stock.get(product_id, 0) + deltas[product_id]:
+                errors[index] = {'quantity': [NOT_ENOUGH_STOCK]}
+                continue
+
+            deltas[product_id] -= line['quantity']
+            sale_price = line.get('sale_price') or price
+            sales.append(models.Sale(
+                owner=owner,
+                product_id=product_id,
+                customer=customer,
+                quantity=line['quantity'],
+                sale_date=order_date,
+                sale_price=sale_price,
+                total_price=line['quantity'] * sale_price,
+            ))
+
+        if errors:
+            return None, [errors.get(index, {}) for index in range(len(lines))]
+
+        order = models.Order.objects.create(owner=owner, customer=customer, order_date=order_date)
+        for sale in sales:
+            sale.order = order
+        stock.apply_stock_deltas(deltas)
+        models.Sale.objects.bulk_create(sales, batch_size=BATCH_SIZE)
+        journal.record_many(models.StockMovement.SALE, [(sale.product_id, -sale.quantity, sale.pk) for sale in sales])
+        reports.record_many(owner.pk, sales, 'sale_quantity', 'sale_total', 'sale_date')
+        caching.invalidate(models.Product, owner.pk)
+
+    return order, []
+
+
+def _validate(serializer_class, lines, errors):
+    if not isinstance(lines, list) or not lines:
+        raise ValidationError({'non_field_errors': ['Expected a non-empty list of lines.']})
+
+    valid = []
+    for index, line in enumerate(lines):
+        serializer = serializer_class(data=line)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            errors[index] = serializer.errors
+    return valid
+
+
+def _resolve(model, owner, names, *fields):
+    rows = model.objects.filter(owner=owner, name__in=set(names)).values_list('name', 'pk', *fields)
+    return {row[0]: row[1:] for row in rows}
+
+
+def _missing(data, **known):
+    return {
+        field: [DOES_NOT_EXIST.format(value=data[field])]
+        for field, rows in known.items()
+        if data[field] not in rows
+    }
+
+
+def _report(errors):
+    return [{'line': index, 'errors': errors[index]} for index in sorted(errors)]
@@ -0,0 +1,97 @@
+import hashlib
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+from .conditional import VALIDATOR_HEADERS, not_modified
+
+CACHE_ALIAS = 'responses'
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def _version_key(model, owner_id):
+    if not any(field.name == 'owner' for field in model._meta.fields):
+        owner_id = None
+    return f'version:{model._meta.label_lower}:{owner_id or "all"}'
+
+
+def get_version(model, owner_id):
+    """
+    Return the owner's current version counter for ``model``.
+
+    A missing counter starts from the clock rather than zero, so a counter
+    that was evicted never comes back with a value older entries were
+    stored under.
+    """
+    cache = get_cache()
+    key = _version_key(model, owner_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump(model, owner_id):
+    cache = get_cache()
+    key = _version_key(model, owner_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def invalidate(model, owner_id=None):
+    """
+    Make every cached response built from the owner's ``model`` rows stale.
+
+    The counter is bumped right away and again once the transaction
+    commits, so a response cached by a concurrent reader in between does
+    not survive either.
+    """
+    _bump(model, owner_id)
+    transaction.on_commit(lambda: _bump(model, owner_id))
+
+
+class CachedResponseMixin:
+    """
+    Read-through cache for ``list`` and ``retrieve``.
+
+    Keys combine the user, the renderer format, the absolute URL and the
+    version counters of ``cache_models``. Saving or deleting one of those
+    models anywhere (ViewSets, admin, commands) bumps its counter through
+    the receivers in ``signals``; bulk paths that skip signals call
+    ``invalidate`` themselves. Only 200 responses are stored, together with
+    their ``ETag``/``Last-Modified``, so a hit can also answer a conditional
+    GET with a 304.
+    """
+    cache_models = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, view, request, *args, **kwargs):
+        owner_id = request.user.pk
+        versions = ':'.join(str(get_version(model, owner_id)) for model in self.cache_models)
+        url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+        key = f'response:{owner_id}:{self.basename}:{request.accepted_renderer.format}:{versions}:{url}'
+
+        cache = get_cache()
+        entry = cache.get(key)
+        if entry is not None:
+            data, headers = entry
+            return not_modified(request, headers) or Response(data, headers=headers)
+
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200:
+            headers = {name: response[name] for name in VALIDATOR_HEADERS if name in response}
+            cache.set(key, (response.data, headers))
+        return response
@@ -0,0 +1,159 @@
+import csv
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+
+from . import caching, journal, models, serializers, stock
+
+CHUNK_SIZE = 1000
+# A chunk that lost a race with another import is checked and written again.
+WRITE_ATTEMPTS = 3
+UPDATE_FIELDS = ['name', 'price', 'quantity_in_stock', 'category', 'updated_at']
+
+
+def import_products(owner, stream, chunk_size=CHUNK_SIZE):
+    """
+    Upsert the owner's products by ``sku`` from a CSV text stream with the
+    columns ``name,sku,price,quantity_in_stock,category``.
+
+    The file is read ``chunk_size`` rows at a time. For each chunk the
+    categories are resolved, and created if missing, in bulk. Existing SKUs
+    and names are locked and checked with one query each, and the rows are
+    written with a single ``bulk_create(update_conflicts=True)`` in the same
+    transaction, which also journals the stock changes and refreshes the
+    low-stock flags. Returns counts and a per-line error report. Line
+    numbers count the header as line 1.
+    """
+    reader = csv.DictReader(stream)
+    report = {'created': 0, 'updated': 0, 'errors': []}
+    categories = {}
+    seen_skus, seen_names = set(), set()
+
+    line = 1
+    while True:
+        chunk = list(islice(reader, chunk_size))
+        if not chunk:
+            break
+
+        valid = []
+        for row in chunk:
+            line += 1
+            serializer = serializers.ProductImportSerializer(data=row)
+            if not serializer.is_valid():
+                report['errors'].append({'line': line, 'errors': serializer.errors})
+            elif serializer.validated_data['sku'] in seen_skus:
+                report['errors'].append({'line': line, 'errors': {'sku': ['Duplicate sku in this file.']}})
+            elif serializer.validated_data['name'] in seen_names:
+                report['errors'].append({'line': line, 'errors': {'name': ['Duplicate name in this file.']}})
+            else:
+                seen_skus.add(serializer.validated_data['sku'])
+                seen_names.add(serializer.validated_data['name'])
+                valid.append((line, serializer.validated_data))
+
+        _write_chunk(owner, valid, categories, report)
+
+    if report['created'] or report['updated']:
+        caching.invalidate(models.Product, owner.pk)
+    return report
+
+
+class _ConcurrentWrite(Exception):
+    """Another import wrote one of the chunk's SKUs or names meanwhile."""
+
+
+def _write_chunk(owner, rows, categories, report):
+    for attempt in range(WRITE_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                errors, created, updated = _upsert_chunk(owner, rows, categories)
+        except (IntegrityError, _ConcurrentWrite):
+            # Categories created in the rolled-back transaction are gone too.
+            categories.clear()
+            if attempt == WRITE_ATTEMPTS - 1:
+                raise
+        else:
+            report['errors'] += errors
+            report['created'] += created
+            report['updated'] += updated
+            return
+
+
+def _upsert_chunk(owner, rows, categories):
+    """
+    Write one chunk in the caller's transaction; returns ``(errors,
+    created, updated)``.
+
+    The rows holding the chunk's SKUs, whoever owns them, and the owner's
+    rows holding its names are locked before they are checked, so nothing
+    checked here changes before the upsert. A SKU that was first inserted
+    by someone else in the meantime had no row to lock; the upsert then
+    lands on that row, which is caught afterwards and the chunk is rolled
+    back with ``_ConcurrentWrite`` to be checked again.
+    """
+    if not rows:
+        return [], 0, 0
+    skus = [data['sku'] for _, data in rows]
+    names = [data['name'] for _, data in rows]
+    existing = {
+        sku: (owner_id, quantity)
+        for sku, owner_id, quantity in models.Product.objects.select_for_update().filter(sku__in=skus)
+        .values_list('sku', 'owner_id', 'quantity_in_stock')
+    }
+    name_skus = dict(
+        models.Product.objects.select_for_update().filter(owner=owner, name__in=names).values_list('name', 'sku')
+    )
+
+    errors, accepted = [], []
+    for line, data in rows:
+        if existing.get(data['sku'], (owner.pk,))[0] != owner.pk:
+            errors.append({'line': line, 'errors': {'sku': ['product with this sku already exists.']}})
+        elif name_skus.get(data['name'], data['sku']) != data['sku']:
+            errors.append({'line': line, 'errors': {'name': ['product with this name already exists.']}})
+        else:
+            accepted.append(data)
+    if not accepted:
+        return errors, 0, 0
+
+    _resolve_categories({data['category'] for data in accepted}, categories)
+    accepted_skus = [data['sku'] for data in accepted]
+    models.Product.objects.bulk_create(
+        [
+            models.Product(
+                owner=owner,
+                name=data['name'],
+                sku=data['sku'],
+                price=data['price'],
+                quantity_in_stock=data['quantity_in_stock'],
+                category_id=categories[data['category']],
+            )
+            for data in accepted
+        ],
+        update_conflicts=True,
+        unique_fields=['sku'],
+        update_fields=UPDATE_FIELDS,
+    )
+    if models.Product.objects.filter(sku__in=accepted_skus).exclude(owner=owner).exists():
+        raise _ConcurrentWrite()
+
+    written = models.Product.objects.filter(owner=owner, sku__in=accepted_skus)
+    journal.record_many(models.StockMovement.IMPORT, [
+        (pk, quantity - existing[sku][1] if sku in existing else quantity, None)
+        for pk, sku, quantity in written.values_list('pk', 'sku', 'quantity_in_stock')
+    ])
+    stock.track_low_stock(written)
+
+    updated = sum(1 for sku in accepted_skus if sku in existing)
+    return errors, len(accepted) - updated, updated
+
+
+def _resolve_categories(names, categories):
+    missing = names - categories.keys()
+    if not missing:
+        return
+
+    categories.update(models.Category.objects.filter(name__in=missing).values_list('name', 'pk'))
+    new = missing - categories.keys()
+    if new:
+        models.Category.objects.bulk_create([models.Category(name=name) for name in new], ignore_conflicts=True)
+        categories.update(models.Category.objects.filter(name__in=new).values_list('name', 'pk'))
+        caching.invalidate(models.Category)
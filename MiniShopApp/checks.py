@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+from .caching import CACHE_ALIAS
+
+
+@register('caches', deploy=True)
+def check_response_cache(app_configs, **kwargs):
+    backend = settings.CACHES.get(CACHE_ALIAS, {}).get('BACKEND')
+    if backend != 'django.core.cache.backends.locmem.LocMemCache':
+        return []
+    return [Warning(
+        f'The "{CACHE_ALIAS}" cache uses LocMemCache, which every worker process keeps for itself.',
+        hint='Invalidation only reaches the process that made the write, so other workers can serve stale '
+             'catalog responses. Set RESPONSE_CACHE_BACKEND/RESPONSE_CACHE_LOCATION to a shared backend '
+             '(Redis, Memcached, database) when running more than one process.',
+        id='MiniShopApp.W001',
+    )]
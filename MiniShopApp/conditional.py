@@ -0,0 +1,110 @@
+import hashlib
+from datetime import datetime
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date
+from rest_framework.response import Response
+
+from .metrics import serializing
+
+VALIDATOR_HEADERS = ('ETag', 'Last-Modified')
+
+
+def not_modified(request, headers):
+    """A 304 for ``request`` if it already holds the version ``headers`` describe."""
+    response = Response(headers=headers)
+    last_modified = headers.get('Last-Modified')
+    conditional = get_conditional_response(
+        request,
+        etag=headers.get('ETag'),
+        last_modified=last_modified and parse_http_date(last_modified),
+        response=response,
+    )
+    return None if conditional is response else conditional
+
+
+class ConditionalGetMixin:
+    """
+    ``ETag`` on ``list`` and ``retrieve``, ``Last-Modified`` on ``retrieve``,
+    and a 304 when the client's copy is current, without serializing
+    anything.
+
+    The validators come from the rows the response would show: their keys,
+    ``updated_at`` and that of the ``conditional_related`` rows their JSON
+    includes, plus the paginator's count, which catches deletes elsewhere.
+    The ``ETag`` is exact; ``Last-Modified`` is the newest of those stamps.
+    Lists go without it: a delete removes a row without making any stamp
+    newer, so ``If-Modified-Since`` would keep answering 304.
+
+    With a ``values_serializer_class`` (see ``read_serializers``) ``list``
+    reads the page as ``values()`` rows and skips the ModelSerializer.
+    """
+    conditional_related = ()
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.values_serializer_class is not None:
+            queryset = queryset.values(*self.get_values_lookups(queryset))
+        page = self.paginate_queryset(queryset)
+        rows = list(queryset) if page is None else page
+
+        identity = self.get_page_state() + [row['pk'] if isinstance(row, dict) else row.pk for row in rows]
+        stamps = [stamp for row in rows for stamp in self.get_stamps(row)]
+        headers = self.get_validators(request, identity, stamps, dated=False)
+        response = not_modified(request, headers)
+        if response is None:
+            with serializing():
+                if self.values_serializer_class is not None:
+                    data = self.values_serializer_class.serialize(rows)
+                else:
+                    data = self.get_serializer(rows, many=True).data
+            response = self.get_paginated_response(data) if page is not None else Response(data)
+            self.add_validators(response, headers)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        headers = self.get_validators(request, [instance.pk], self.get_stamps(instance))
+        response = not_modified(request, headers)
+        if response is None:
+            with serializing():
+                data = self.get_serializer(instance).data
+            response = self.add_validators(Response(data), headers)
+        return response
+
+    def get_page_state(self):
+        """What, besides the rows, the page's links and count depend on."""
+        keyset = getattr(self.paginator, 'keyset', None)
+        if keyset is not None:
+            return [keyset.has_next, keyset.has_previous]
+        page = getattr(self.paginator, 'page', None)
+        return [page.paginator.count] if page is not None else []
+
+    def get_values_lookups(self, queryset):
+        """The serializer's columns plus what validators and cursors read."""
+        lookups = [*self.values_serializer_class.lookups, 'pk', 'updated_at']
+        lookups += [f'{name}__updated_at' for name in self.conditional_related]
+        lookups += [field.lstrip('-') for field in queryset.query.order_by if isinstance(field, str)]
+        return list(dict.fromkeys(lookups))
+
+    def get_stamps(self, instance):
+        if isinstance(instance, dict):
+            return [instance['updated_at']] + [instance[f'{name}__updated_at'] for name in self.conditional_related]
+        return [instance.updated_at] + [getattr(instance, name).updated_at for name in self.conditional_related]
+
+    def get_validators(self, request, identity, stamps, dated=True):
+        last_modified = max(stamps, default=None) if dated else None
+        parts = [request.user.pk, request.get_full_path(), request.accepted_renderer.format, *identity]
+        parts += [stamp.isoformat() for stamp in stamps]
+        headers = {'ETag': '"%s"' % hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest()}
+        if isinstance(last_modified, datetime):
+            headers['Last-Modified'] = http_date(last_modified.timestamp())
+        return headers
+
+    @staticmethod
+    def add_validators(response, headers):
+        if response.status_code == 200:
+            for name, value in headers.items():
+                response[name] = value
+        return response
@@ -0,0 +1,87 @@
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from . import models
+from .exceptions import IdempotencyKeyInProgress, IdempotencyKeyReused
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+header_parameter = openapi.Parameter(
+    HEADER, openapi.IN_HEADER, type=openapi.TYPE_STRING, required=False,
+    description='Retries with the same key get the first response back instead of creating the row again.',
+)
+
+
+def fingerprint(request):
+    content = json.dumps(request.data, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(f'{request.method} {request.path}\n{content}'.encode()).hexdigest()
+
+
+def sweep_expired(now=None):
+    """Delete every expired key in one DELETE statement; return how many went."""
+    deleted, _ = models.IdempotencyKey.objects.filter(expires_at__lte=now or timezone.now()).delete()
+    return deleted
+
+
+class IdempotentCreateMixin:
+    """
+    ``Idempotency-Key`` support for ``create``.
+
+    The first request with a key stores its response in the same transaction
+    as the row it creates. A retry finds the stored response with one indexed
+    lookup and gets it back, marked ``Idempotent-Replayed: true``, without
+    running the create again. A duplicate sent while the first is still
+    running waits on the key's unique index and then replays it. Requests
+    that fail store nothing, so they can be retried with the same key.
+    """
+
+    @swagger_auto_schema(manual_parameters=[header_parameter])
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return super().create(request, *args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise ValidationError({HEADER: [f'Must be 1 to {MAX_KEY_LENGTH} characters long.']})
+
+        digest = fingerprint(request)
+        keys = models.IdempotencyKey.objects.filter(owner=request.user, route=self.basename, key=key)
+        stored = keys.first()
+        now = timezone.now()
+        if stored is not None and stored.expires_at <= now:
+            keys.filter(expires_at__lte=now).delete()
+            stored = None
+
+        if stored is None:
+            with transaction.atomic():
+                try:
+                    with transaction.atomic():
+                        claim = models.IdempotencyKey.objects.create(
+                            owner=request.user, route=self.basename, key=key, fingerprint=digest,
+                            created_at=now, expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+                        )
+                except IntegrityError:
+                    claim = None
+                if claim is not None:
+                    response = super().create(request, *args, **kwargs)
+                    claim.status_code = response.status_code
+                    claim.body = json.dumps(response.data, default=str)
+                    claim.save(update_fields=['status_code', 'body'])
+                    return response
+            # A concurrent request with the same key committed first.
+            stored = keys.first()
+
+        if stored is None or stored.status_code is None:
+            raise IdempotencyKeyInProgress()
+        if stored.fingerprint != digest:
+            raise IdempotencyKeyReused()
+        return Response(json.loads(stored.body), status=stored.status_code, headers={'Idempotent-Replayed': 'true'})
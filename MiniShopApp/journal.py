@@ -0,0 +1,121 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, Max, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import models
+
+# Every change to ``Product.quantity_in_stock`` appends a ``StockMovement`` in
+# the same transaction, so the journal always sums to the stored stock.
+# ``take_snapshots`` periodically folds each product's new movements into a
+# ``StockSnapshot``; the stock at any moment is then the latest snapshot
+# before it plus the few movements after that.
+#
+# Stock writes lock the product row, so a product's movements get their ids
+# and timestamps in the same order.
+
+# Movements newer than this may still belong to open transactions with
+# lower ids, so snapshots stop short of them.
+SNAPSHOT_SETTLE = timedelta(minutes=5)
+
+
+def record(product_id, delta, kind, reference=None):
+    if delta:
+        models.StockMovement.objects.create(product_id=product_id, delta=delta, kind=kind, reference=reference)
+
+
+def record_many(kind, movements):
+    """Append ``(product_id, delta, reference)`` movements with one INSERT."""
+    now = timezone.now()
+    models.StockMovement.objects.bulk_create([
+        models.StockMovement(product_id=product_id, delta=delta, kind=kind, reference=reference, created_at=now)
+        for product_id, delta, reference in movements
+        if delta
+    ])
+
+
+def _latest_snapshot(product):
+    return models.StockSnapshot.objects.filter(product=product).order_by('-taken_at', '-movement_id')
+
+
+def stock_as_of(product_id, moment):
+    """``quantity_in_stock`` of the product as it stood at ``moment``."""
+    snapshot = _latest_snapshot(product_id).filter(taken_at__lte=moment).values_list(
+        'movement_id', 'taken_at', 'quantity',
+    ).first()
+    tail = models.StockMovement.objects.filter(product_id=product_id, created_at__lte=moment)
+    base = 0
+    if snapshot is not None:
+        movement_id, taken_at, base = snapshot
+        tail = tail.filter(created_at__gte=taken_at, pk__gt=movement_id)
+    return base + tail.aggregate(total=Coalesce(Sum('delta'), 0))['total']
+
+
+def take_snapshots(settle=SNAPSHOT_SETTLE, min_movements=1):
+    """
+    Snapshot every product with at least ``min_movements`` settled movements
+    since its last snapshot. Returns how many snapshots were written.
+    """
+    cutoff = models.StockMovement.objects.filter(created_at__lte=timezone.now() - settle).aggregate(last=Max('pk'))['last']
+    if cutoff is None:
+        return 0
+
+    latest = _latest_snapshot(OuterRef('product'))
+    tails = (
+        models.StockMovement.objects
+        .filter(pk__lte=cutoff)
+        .alias(since=Coalesce(Subquery(latest.values('movement_id')[:1]), 0))
+        .filter(pk__gt=F('since'))
+        .order_by()
+        .values('product')
+        .annotate(
+            delta=Sum('delta'),
+            movements=Count('pk'),
+            last=Max('pk'),
+            base=Coalesce(Subquery(latest.values('quantity')[:1]), 0),
+        )
+        .filter(movements__gte=min_movements)
+    )
+    with transaction.atomic():
+        rows = list(tails)
+        taken_at = dict(models.StockMovement.objects.filter(pk__in=[row['last'] for row in rows]).values_list('pk', 'created_at'))
+        models.StockSnapshot.objects.bulk_create([
+            models.StockSnapshot(
+                product_id=row['product'],
+                movement_id=row['last'],
+                taken_at=taken_at[row['last']],
+                quantity=row['base'] + row['delta'],
+            )
+            for row in rows
+        ])
+    return len(rows)
+
+
+def reconcile(products=None):
+    """
+    Compare ``quantity_in_stock`` with the journal for ``products`` (all by
+    default) in one query. Returns ``(product_id, quantity_in_stock,
+    journal_quantity)`` for every product where they differ.
+    """
+    latest = _latest_snapshot(OuterRef('pk'))
+    tail = (
+        models.StockMovement.objects
+        .filter(product=OuterRef('pk'), pk__gt=Coalesce(Subquery(_latest_snapshot(OuterRef(OuterRef('pk'))).values('movement_id')[:1]), 0))
+        .order_by()
+        .values('product')
+        .annotate(total=Sum('delta'))
+        .values('total')
+    )
+    journal = (
+        Coalesce(Subquery(latest.values('quantity')[:1]), 0)
+        + Coalesce(Subquery(tail, output_field=IntegerField()), 0)
+    )
+    products = models.Product.objects.all() if products is None else products
+    return list(
+        products.annotate(journal_quantity=journal)
+        .exclude(quantity_in_stock=F('journal_quantity'))
+        .order_by('pk')
+        .values_list('pk', 'quantity_in_stock', 'journal_quantity')
+    )
@@ -0,0 +1,61 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from MiniShopApp import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Run a mixed API workload against the benchmark shops (see seed_benchmark) and report throughput '
+        'and p50/p95/p99 latency per endpoint. Save the results with --output and check a later run '
+        'against them with --compare.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workload', choices=sorted(benchmark.WORKLOADS), default='mixed')
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--requests', type=int, default=2000, help='Timed requests across all threads.')
+        parser.add_argument('--duration', type=float, help='Run for this many seconds instead of --requests.')
+        parser.add_argument('--warmup', type=int, default=50, help='Untimed requests per thread first.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the request mix.')
+        parser.add_argument('--host', default='localhost', help='Host header; must be in ALLOWED_HOSTS.')
+        parser.add_argument('--output', help='Write the results to this JSON file.')
+        parser.add_argument('--compare', help='Results JSON of an earlier run to compare against.')
+        parser.add_argument('--tolerance', type=float, default=0.10,
+                            help='Allowed p95 increase or throughput drop before --compare fails (0.10 = 10%%).')
+
+    def handle(self, *args, **options):
+        if settings.DEBUG:
+            self.stderr.write('DEBUG is on: every query is logged in memory and timings will be inflated.')
+        try:
+            results = benchmark.run(
+                workload=options['workload'], threads=options['threads'], requests=options['requests'],
+                duration=options['duration'], warmup=options['warmup'], random_seed=options['seed'],
+                host=options['host'],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(f"{'endpoint':<16} {'requests':>8} {'errors':>6} {'req/s':>8} "
+                          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for name, stats in [*results['endpoints'].items(), ('total', results['total'])]:
+            self.stdout.write(
+                f"{name:<16} {stats['requests']:>8} {stats['errors']:>6} {stats.get('throughput_rps', 0):>8.1f} "
+                f"{stats.get('p50_ms', 0):>8.1f} {stats.get('p95_ms', 0):>8.1f} {stats.get('p99_ms', 0):>8.1f}"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+            self.stdout.write(f"Results written to {options['output']}.")
+
+        if options['compare']:
+            with open(options['compare']) as baseline:
+                regressions = benchmark.compare(json.load(baseline), results, options['tolerance'])
+            for name, metric, before, after in regressions:
+                self.stdout.write(f'{name}: {metric} {before} -> {after}')
+            if regressions:
+                raise CommandError(f'{len(regressions)} regressions against {options["compare"]}.')
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['compare']}."))
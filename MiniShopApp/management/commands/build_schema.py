@@ -0,0 +1,28 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from MiniShop import schema
+
+
+class Command(BaseCommand):
+    help = 'Prebuild the OpenAPI document served at /swagger.json and /swagger.yaml for the current code version.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-old', action='store_true', help='Keep the files built for other code versions.')
+
+    def handle(self, *args, **options):
+        for format in schema.FORMATS:
+            path = schema.artifact_path(format)
+            schema.build(format)
+            self.stdout.write(f'Wrote {path}')
+
+        if not options['keep_old']:
+            current = {schema.artifact_path(format) for format in schema.FORMATS}
+            for path in Path(settings.OPENAPI_SCHEMA_DIR).glob('openapi-*'):
+                if path not in current:
+                    path.unlink()
+                    self.stdout.write(f'Removed {path}')
+
+        self.stdout.write(self.style.SUCCESS(f'Schema built for version {schema.code_version()}.'))
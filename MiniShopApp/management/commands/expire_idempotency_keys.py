@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from MiniShopApp import idempotency
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete the stored responses of Idempotency-Key requests whose TTL has run out. '
+        'Run it periodically, e.g. hourly.'
+    )
+
+    def handle(self, *args, **options):
+        count = idempotency.sweep_expired()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {count} expired idempotency keys.'))
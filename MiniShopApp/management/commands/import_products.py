@@ -0,0 +1,30 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from MiniShopApp.catalog import CHUNK_SIZE, import_products
+
+
+class Command(BaseCommand):
+    help = 'Create or update products by sku from a CSV file with name,sku,price,quantity_in_stock,category columns.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file to import.')
+        parser.add_argument('--owner', required=True, help='Username that will own the products.')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Rows written per transaction.')
+
+    def handle(self, *args, **options):
+        try:
+            owner = User.objects.get(username=options['owner'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['owner']}' does not exist.")
+
+        with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+            report = import_products(owner, stream, chunk_size=options['chunk_size'])
+
+        for error in report['errors']:
+            self.stderr.write(f"line {error['line']}: {json.dumps(error['errors'])}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {report['created']}, updated {report['updated']}, rejected {len(report['errors'])} products."
+        ))
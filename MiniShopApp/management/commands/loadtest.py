@@ -0,0 +1,102 @@
+import statistics
+import threading
+import time
+from io import BytesIO
+
+from django.contrib.auth.models import User
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+class Command(BaseCommand):
+    help = (
+        'Send GET requests through the WSGI handler from several threads and report latency '
+        'and how many database connections were opened. Compare DB_CONN_MAX_AGE=0 with the '
+        'default or DB_POOL=true to see the connection churn.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--owner', required=True, help='Username to authenticate as.')
+        parser.add_argument('--path', default='/sales/', help='Path to request (default: /sales/).')
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--threads', type=int, default=8)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['owner'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['owner']}' does not exist.")
+        token = str(AccessToken.for_user(user))
+        connections.close_all()
+
+        handler = WSGIHandler()
+        opened = []
+        latencies = []
+        failures = []
+        lock = threading.Lock()
+
+        def count(sender, connection, **kwargs):
+            with lock:
+                opened.append(connection.alias)
+
+        def environ():
+            return {
+                'REQUEST_METHOD': 'GET', 'PATH_INFO': options['path'], 'QUERY_STRING': '',
+                'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+                'HTTP_AUTHORIZATION': f'Bearer {token}', 'wsgi.url_scheme': 'http',
+                'wsgi.input': BytesIO(), 'wsgi.errors': BytesIO(),
+            }
+
+        def worker(requests):
+            try:
+                for _ in range(requests):
+                    status = []
+                    started = time.perf_counter()
+                    body = handler(environ(), lambda s, headers, exc_info=None: status.append(s))
+                    b''.join(body)
+                    body.close()
+                    elapsed = time.perf_counter() - started
+                    with lock:
+                        latencies.append(elapsed)
+                        if not status[0].startswith('200'):
+                            failures.append(status[0])
+            finally:
+                connections.close_all()
+
+        per_thread, extra = divmod(options['requests'], options['threads'])
+        threads = [
+            threading.Thread(target=worker, args=(per_thread + (i < extra),))
+            for i in range(options['threads'])
+        ]
+        connection_created.connect(count)
+        started = time.perf_counter()
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            connection_created.disconnect(count)
+        elapsed = time.perf_counter() - started
+
+        if failures:
+            raise CommandError(f'{len(failures)} requests failed, first status: {failures[0]}')
+        latencies.sort()
+        settings_dict = connection.settings_dict
+        if settings_dict['OPTIONS'].get('pool'):
+            # With a pool every checkout fires connection_created; the pool
+            # itself knows how many server connections it really opened.
+            stats = connection.pool.get_stats()
+            mode = f"pool (min {stats['pool_min']}, max {stats['pool_max']}, {stats.get('connections_num', 0)} opened by the pool)"
+        else:
+            mode = f"CONN_MAX_AGE={settings_dict['CONN_MAX_AGE']}"
+        self.stdout.write(
+            f'{mode}: {len(latencies)} requests in {elapsed:.2f}s ({len(latencies) / elapsed:.0f} req/s), '
+            f'{len(opened)} connections created\n'
+            f'p50 {statistics.median(latencies) * 1000:.1f} ms, '
+            f'p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} ms, '
+            f'p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f} ms'
+        )
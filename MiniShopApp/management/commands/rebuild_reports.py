@@ -0,0 +1,22 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from MiniShopApp import reports
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily sales and purchase totals behind /reports/ from the raw rows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--owner', help='Only rebuild the totals of this username.')
+
+    def handle(self, *args, **options):
+        owner = None
+        if options['owner']:
+            try:
+                owner = User.objects.get(username=options['owner'])
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['owner']}' does not exist.")
+
+        count = reports.rebuild(owner)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} daily totals.'))
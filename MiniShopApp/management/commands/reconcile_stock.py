@@ -0,0 +1,27 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from MiniShopApp import journal
+from MiniShopApp.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Check every product\'s quantity_in_stock against its stock movement journal.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--owner', help='Only check the products of this username.')
+
+    def handle(self, *args, **options):
+        products = Product.objects.all()
+        if options['owner']:
+            try:
+                products = products.filter(owner=User.objects.get(username=options['owner']))
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['owner']}' does not exist.")
+
+        mismatches = journal.reconcile(products)
+        for product_id, quantity, expected in mismatches:
+            self.stdout.write(f'Product {product_id}: quantity_in_stock {quantity}, journal {expected}')
+        if mismatches:
+            raise CommandError(f'{len(mismatches)} products disagree with the journal.')
+        self.stdout.write(self.style.SUCCESS('Stock matches the journal.'))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.models import User
+
+from MiniShopApp import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate benchmark shops: owners named bench-<n> (password bench-password) with products, '
+        'customers, suppliers and years of sales and purchases. The same options give the same data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--owners', type=int, default=2)
+        parser.add_argument('--products', type=int, default=500, help='Products per owner.')
+        parser.add_argument('--customers', type=int, default=200, help='Customers per owner.')
+        parser.add_argument('--suppliers', type=int, default=20, help='Suppliers per owner.')
+        parser.add_argument('--years', type=int, default=2, help='Years of sales and purchases.')
+        parser.add_argument('--sales-per-day', type=int, default=50, help='Average sales per owner and day.')
+        parser.add_argument('--purchases-per-day', type=int, default=5, help='Average purchases per owner and day.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed.')
+        parser.add_argument('--flush', action='store_true', help='Delete existing benchmark owners first.')
+
+    def handle(self, *args, **options):
+        if options['flush']:
+            benchmark.flush()
+        elif User.objects.filter(username__startswith=benchmark.OWNER_PREFIX).exists():
+            raise CommandError('Benchmark owners already exist; pass --flush to replace them.')
+
+        counts = benchmark.seed(
+            owners=options['owners'], products=options['products'], customers=options['customers'],
+            suppliers=options['suppliers'], years=options['years'], sales_per_day=options['sales_per_day'],
+            purchases_per_day=options['purchases_per_day'], random_seed=options['seed'], log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            'Seeded ' + ', '.join(f'{count} {name}' for name, count in counts.items()) + '.'
+        ))
@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from MiniShopApp import journal
+
+
+class Command(BaseCommand):
+    help = (
+        'Fold the stock movements written since the last run into per-product snapshots, '
+        'so stock-as-of queries only scan a short tail. Run it periodically, e.g. nightly.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-movements', type=int, default=1,
+            help='Only snapshot products with at least this many new movements.',
+        )
+        parser.add_argument(
+            '--settle-seconds', type=int, default=int(journal.SNAPSHOT_SETTLE.total_seconds()),
+            help='Leave out movements younger than this, which may belong to open transactions.',
+        )
+
+    def handle(self, *args, **options):
+        count = journal.take_snapshots(timedelta(seconds=options['settle_seconds']), options['min_movements'])
+        self.stdout.write(self.style.SUCCESS(f'Wrote {count} stock snapshots.'))
@@ -0,0 +1,256 @@
+"""
+Per-route request metrics, kept in process and served at ``/metrics`` in the
+Prometheus text format.
+
+``MetricsMiddleware`` times every request and, through a database execute
+wrapper, counts its SQL statements and their time. Time spent turning rows
+into the response body (serializers and the renderer) is reported as
+serialization time. Requests slower than ``SLOW_REQUEST_SECONDS`` are logged
+with their SQL. Each worker process keeps its own numbers; Prometheus adds
+them up across the instances it scrapes.
+
+``/metrics`` answers only a request carrying ``METRICS_TOKEN`` or coming
+from ``METRICS_ALLOWED_IPS``, unless ``METRICS_PUBLIC`` is set.
+"""
+import ipaddress
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+
+logger = logging.getLogger(__name__)
+
+# Latency histogram buckets in seconds.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Statements kept per request for the slow-request log.
+SLOW_LOG_QUERIES = 50
+UNMATCHED = 'unmatched'
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestStats:
+    __slots__ = ('queries', 'sql_seconds', 'serialization_seconds', 'statements')
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.serialization_seconds = 0.0
+        self.statements = []
+
+
+class RouteMetrics:
+    __slots__ = ('buckets', 'count', 'seconds', 'queries', 'sql_seconds', 'serialization_seconds')
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.seconds = 0.0
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.serialization_seconds = 0.0
+
+    def observe(self, seconds, stats):
+        for index, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[index] += 1
+                break
+        self.count += 1
+        self.seconds += seconds
+        self.queries += stats.queries
+        self.sql_seconds += stats.sql_seconds
+        self.serialization_seconds += stats.serialization_seconds
+
+
+class Registry:
+    """``RouteMetrics`` by ``(route, method)``."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def observe(self, route, method, seconds, stats):
+        with self._lock:
+            metrics = self._routes.get((route, method))
+            if metrics is None:
+                metrics = self._routes[(route, method)] = RouteMetrics()
+            metrics.observe(seconds, stats)
+
+    def get(self, route, method):
+        return self._routes.get((route, method))
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+
+    def render(self):
+        with self._lock:
+            routes = sorted(self._routes.items())
+            lines = [
+                '# HELP minishop_request_duration_seconds Request latency by route and method.',
+                '# TYPE minishop_request_duration_seconds histogram',
+            ]
+            for (route, method), metrics in routes:
+                labels = f'route="{_escape(route)}",method="{method}"'
+                total = 0
+                for bound, count in zip(BUCKETS, metrics.buckets):
+                    total += count
+                    lines.append(f'minishop_request_duration_seconds_bucket{{{labels},le="{bound}"}} {total}')
+                lines.append(f'minishop_request_duration_seconds_bucket{{{labels},le="+Inf"}} {metrics.count}')
+                lines.append(f'minishop_request_duration_seconds_sum{{{labels}}} {metrics.seconds!r}')
+                lines.append(f'minishop_request_duration_seconds_count{{{labels}}} {metrics.count}')
+
+            for name, attribute, help_text in COUNTERS:
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} counter')
+                for (route, method), metrics in routes:
+                    value = getattr(metrics, attribute)
+                    lines.append(f'{name}{{route="{_escape(route)}",method="{method}"}} {value!r}')
+        return '\n'.join(lines) + '\n'
+
+
+COUNTERS = [
+    ('minishop_db_queries_total', 'queries', 'SQL statements run by requests.'),
+    ('minishop_db_query_seconds_total', 'sql_seconds', 'Time spent in SQL statements.'),
+    ('minishop_serialization_seconds_total', 'serialization_seconds', 'Time spent serializing and rendering responses.'),
+]
+
+registry = Registry()
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+@contextmanager
+def serializing():
+    """Count the time spent in the block as the current request's serialization time."""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serialization_seconds += time.perf_counter() - started
+
+
+def record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        stats.queries += 1
+        stats.sql_seconds += elapsed
+        if len(stats.statements) < SLOW_LOG_QUERIES:
+            stats.statements.append((elapsed, sql))
+
+
+def install(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class MetricsMiddleware:
+    """
+    Record latency, SQL and serialization time per route. List it first in
+    ``MIDDLEWARE`` so it covers the other middleware too.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        # Connections opened from now on, in any thread, report to the request
+        # running there; the ones that already exist are caught per request.
+        connection_created.connect(install)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        stats, token, started = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.finish(request, response, stats, started)
+        return response
+
+    async def __acall__(self, request):
+        stats, token, started = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.finish(request, response, stats, started)
+        return response
+
+    def start(self):
+        for connection in connections.all(initialized_only=True):
+            install(connection)
+        stats = RequestStats()
+        return stats, _current.set(stats), time.perf_counter()
+
+    def process_template_response(self, request, response):
+        render = response.render
+
+        def timed_render():
+            with serializing():
+                return render()
+
+        response.render = timed_render
+        return response
+
+    def finish(self, request, response, stats, started):
+        elapsed = time.perf_counter() - started
+        match = request.resolver_match
+        route = match.view_name if match is not None else UNMATCHED
+        registry.observe(route, request.method, elapsed, stats)
+
+        if settings.SLOW_REQUEST_SECONDS and elapsed >= settings.SLOW_REQUEST_SECONDS:
+            logger.warning(
+                'Slow request: %s %s (%s) took %.3fs, status %s, %d queries in %.3fs, serialization %.3fs\n%s',
+                request.method, request.get_full_path(), route, elapsed, response.status_code,
+                stats.queries, stats.sql_seconds, stats.serialization_seconds,
+                '\n'.join(f'  {seconds * 1000:.1f} ms  {sql}' for seconds, sql in stats.statements),
+            )
+
+
+def scrape_allowed(request):
+    if settings.METRICS_PUBLIC:
+        return True
+    token = settings.METRICS_TOKEN
+    if token and constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return True
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(network, strict=False) for network in settings.METRICS_ALLOWED_IPS)
+
+
+@require_GET
+def metrics_view(request):
+    if not scrape_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.3 on 2026-10-18 05:38
+
+from django.conf import settings
+from django.db import migrations, models
+from MiniShopApp.operations import AddIndexNonBlocking
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('MiniShopApp', '0005_rename_added_by_customer_owner_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexNonBlocking(
+            model_name='purchase',
+            index=models.Index(fields=['owner', 'created_at', 'id'], name='purchase_owner_created_idx'),
+        ),
+        AddIndexNonBlocking(
+            model_name='sale',
+            index=models.Index(fields=['owner', 'created_at', 'id'], name='sale_owner_created_idx'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.3 on 2026-10-18 05:40
+
+from django.conf import settings
+from django.db import migrations, models
+from MiniShopApp.operations import AddIndexNonBlocking
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('MiniShopApp', '0006_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexNonBlocking(
+            model_name='customer',
+            index=models.Index(fields=['owner', 'created_at', 'id'], name='customer_owner_created_idx'),
+        ),
+        AddIndexNonBlocking(
+            model_name='customer',
+            index=models.Index(fields=['owner', 'name'], name='customer_owner_name_idx'),
+        ),
+        AddIndexNonBlocking(
+            model_name='product',
+            index=models.Index(fields=['owner', 'created_at', 'id'], name='product_owner_created_idx'),
+        ),
+        AddIndexNonBlocking(
+            model_name='product',
+            index=models.Index(fields=['owner', 'name'], name='product_owner_name_idx'),
+        ),
+        AddIndexNonBlocking(
+            model_name='product',
+            index=models.Index(fields=['owner', 'category', 'created_at'], name='product_owner_category_idx'),
+        ),
+        AddIndexNonBlocking(
+            model_name='purchase',
+            index=models.Index(fields=['owner', 'product', 'created_at'], name='purchase_owner_product_idx'),
+        ),
+        AddIndexNonBlocking(
+            model_name='purchase',
+            index=models.Index(fields=['owner', 'supplier', 'created_at'], name='purchase_owner_supplier_idx'),
+        ),
+        AddIndexNonBlocking(
+            model_name='purchase',
+            index=models.Index(fields=['owner', 'purchase_date', 'created_at'], name='purchase_owner_date_idx'),
+        ),
+        AddIndexNonBlocking(
+            model_name='sale',
+            index=models.Index(fields=['owner', 'product', 'created_at'], name='sale_owner_product_idx'),
+        ),
+        AddIndexNonBlocking(
+            model_name='sale',
+            index=models.Index(fields=['owner', 'customer', 'created_at'], name='sale_owner_customer_idx'),
+        ),
+        AddIndexNonBlocking(
+            model_name='supplier',
+            index=models.Index(fields=['owner', 'created_at', 'id'], name='supplier_owner_created_idx'),
+        ),
+        AddIndexNonBlocking(
+            model_name='supplier',
+            index=models.Index(fields=['owner', 'name'], name='supplier_owner_name_idx'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.3 on 2026-10-18 05:46
+
+from django.conf import settings
+from django.db import migrations, models
+from MiniShopApp.operations import AddUniqueConstraintNonBlocking, RemoveIndexNonBlocking
+
+
+def rename_duplicates(apps, schema_editor):
+    """
+    Give every name an owner repeats a unique suffix, keeping the oldest
+    row's name as it is, so the unique constraints below can be built.
+    """
+    for model_name in ['Product', 'Customer', 'Supplier']:
+        model = apps.get_model('MiniShopApp', model_name)
+        duplicated = (
+            model.objects.values('owner', 'name').order_by()
+            .annotate(rows=models.Count('pk')).filter(rows__gt=1)
+        )
+        for group in duplicated.iterator():
+            rows = model.objects.filter(owner=group['owner'], name=group['name']).order_by('pk')
+            for row in rows[1:]:
+                suffix = f' ({row.pk})'
+                name = group['name'][:100 - len(suffix)] + suffix
+                attempt = 1
+                while model.objects.filter(owner=group['owner'], name=name).exists():
+                    attempt += 1
+                    suffix = f' ({row.pk}-{attempt})'
+                    name = group['name'][:100 - len(suffix)] + suffix
+                model.objects.filter(pk=row.pk).update(name=name)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('MiniShopApp', '0007_owner_scoped_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_duplicates, migrations.RunPython.noop, atomic=True),
+        AddUniqueConstraintNonBlocking(
+            model_name='customer',
+            constraint=models.UniqueConstraint(fields=('owner', 'name'), name='customer_owner_name_uniq'),
+        ),
+        AddUniqueConstraintNonBlocking(
+            model_name='product',
+            constraint=models.UniqueConstraint(fields=('owner', 'name'), name='product_owner_name_uniq'),
+        ),
+        AddUniqueConstraintNonBlocking(
+            model_name='supplier',
+            constraint=models.UniqueConstraint(fields=('owner', 'name'), name='supplier_owner_name_uniq'),
+        ),
+        # Dropped once the unique indexes are in place to serve the same lookups.
+        RemoveIndexNonBlocking(
+            model_name='customer',
+            name='customer_owner_name_idx',
+        ),
+        RemoveIndexNonBlocking(
+            model_name='product',
+            name='product_owner_name_idx',
+        ),
+        RemoveIndexNonBlocking(
+            model_name='supplier',
+            name='supplier_owner_name_idx',
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.3 on 2026-10-18 05:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MiniShopApp', '0008_unique_owner_names'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyTotals',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('sale_quantity', models.BigIntegerField(default=0)),
+                ('sale_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('purchase_quantity', models.BigIntegerField(default=0)),
+                ('purchase_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_totals', to='MiniShopApp.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['owner', 'day'], name='dailytotals_owner_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('owner', 'product', 'day'), name='dailytotals_product_day_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.3 on 2026-10-18 06:22
+
+from django.conf import settings
+from django.db import migrations, models
+from MiniShopApp.operations import AddIndexNonBlocking
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('MiniShopApp', '0011_category_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='low_stock_since',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='reorder_level',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        AddIndexNonBlocking(
+            model_name='product',
+            index=models.Index(condition=models.Q(('low_stock_since__isnull', False)), fields=['owner', 'low_stock_since'], name='product_low_stock_idx'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.3 on 2026-10-18 06:26
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def open_journal(apps, schema_editor):
+    """Start every existing product's journal with its current stock."""
+    Product = apps.get_model('MiniShopApp', 'Product')
+    StockMovement = apps.get_model('MiniShopApp', 'StockMovement')
+    now = django.utils.timezone.now()
+    rows = Product.objects.filter(quantity_in_stock__gt=0).values_list('pk', 'quantity_in_stock')
+    batch = []
+    for product_id, quantity in rows.iterator(chunk_size=5000):
+        batch.append(StockMovement(product_id=product_id, delta=quantity, kind='opening', created_at=now))
+        if len(batch) == 5000:
+            StockMovement.objects.bulk_create(batch)
+            batch = []
+    StockMovement.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MiniShopApp', '0012_low_stock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('delta', models.IntegerField()),
+                ('kind', models.CharField(choices=[('opening', 'Opening stock'), ('adjustment', 'Adjustment'), ('import', 'Import'), ('sale', 'Sale'), ('purchase', 'Purchase')], max_length=10)),
+                ('reference', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='MiniShopApp.product')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('taken_at', models.DateTimeField()),
+                ('quantity', models.IntegerField()),
+                ('movement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='MiniShopApp.stockmovement')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_snapshots', to='MiniShopApp.product')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='stockmovement',
+            index=models.Index(fields=['product', 'created_at', 'id'], name='movement_product_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stocksnapshot',
+            index=models.Index(fields=['product', 'taken_at', 'movement'], name='snapshot_product_taken_idx'),
+        ),
+        migrations.RunPython(open_journal, migrations.RunPython.noop),
+    ]
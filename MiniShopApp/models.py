@@ -1,13 +1,16 @@
-from django.db import models
+from decimal import Decimal
+
+from django.db import models, transaction
 from django.contrib.auth.models import User
-from django.core.exceptions import ValidationError
 from django.utils import timezone
+from . import caching, journal, reports, stock
 
 # Create your models here.
 
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -17,11 +20,82 @@ class Product(models.Model):
     sku = models.CharField(max_length=50, unique=True)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     quantity_in_stock = models.PositiveIntegerField()
+    # Stock at or below this level counts as low; null turns the alert off.
+    reorder_level = models.PositiveIntegerField(null=True, blank=True)
+    # When the stock last fell to the reorder level, null while above it.
+    # Kept up to date by every stock write, see stock.track_low_stock.
+    low_stock_since = models.DateTimeField(null=True, blank=True, editable=False)
     owner = models.ForeignKey(User, on_delete=models.CASCADE)
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='products')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'created_at', 'id'], name='product_owner_created_idx'),
+            models.Index(fields=['owner', 'category', 'created_at'], name='product_owner_category_idx'),
+            models.Index(
+                fields=['owner', 'low_stock_since'],
+                condition=models.Q(low_stock_since__isnull=False),
+                name='product_low_stock_idx',
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'name'], name='product_owner_name_uniq'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_quantity = instance.__dict__.get('quantity_in_stock')
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using, fields, from_queryset)
+        if fields is None or 'quantity_in_stock' in fields:
+            self._loaded_quantity = self.quantity_in_stock
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        stock_fields = {'quantity_in_stock', 'reorder_level'}
+        if update_fields is not None:
+            stock_fields &= set(update_fields)
+        adding = self._state.adding
+
+        with transaction.atomic():
+            previous = 0
+            if stock_fields and not adding:
+                current = Product.objects.select_for_update().filter(pk=self.pk).values_list(
+                    'quantity_in_stock', 'low_stock_since',
+                ).first()
+                if current is not None:
+                    previous = current[0]
+                    # Sales and purchases may have moved the stock since this
+                    # instance was read. Unless the caller set a quantity of
+                    # their own, keep the stored one rather than write back
+                    # a stale value.
+                    changed = self.quantity_in_stock != getattr(self, '_loaded_quantity', None)
+                    if 'quantity_in_stock' not in stock_fields or not changed:
+                        self.quantity_in_stock, self.low_stock_since = current
+
+            crossed = False
+            if self.reorder_level is not None and self.quantity_in_stock <= self.reorder_level:
+                crossed = self.low_stock_since is None
+                if crossed:
+                    self.low_stock_since = timezone.now()
+            else:
+                self.low_stock_since = None
+            if update_fields is not None and stock_fields:
+                kwargs['update_fields'] = {*update_fields, 'low_stock_since'}
+
+            super().save(*args, **kwargs)
+            if 'quantity_in_stock' in stock_fields:
+                kind = StockMovement.OPENING if adding else StockMovement.ADJUSTMENT
+                journal.record(self.pk, self.quantity_in_stock - previous, kind)
+            self._loaded_quantity = self.quantity_in_stock
+            if crossed:
+                transaction.on_commit(lambda: stock.low_stock.send(sender=Product, product_ids=[self.pk]))
+
     def __str__(self):
         return f"{self.name} ({self.sku})"
 
@@ -34,6 +108,14 @@ class Customer(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'created_at', 'id'], name='customer_owner_created_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'name'], name='customer_owner_name_uniq'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -46,9 +128,40 @@ class Supplier(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'created_at', 'id'], name='supplier_owner_created_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'name'], name='supplier_owner_name_uniq'),
+        ]
+
     def __str__(self):
         return self.name
 
+class ReportedQuerySet(models.QuerySet):
+    """
+    Sales or purchases whose bulk ``delete()`` (the admin's "delete selected"
+    among others) first takes them out of the daily totals, one UPDATE per
+    owner. Like the cascades in ``signals``, it leaves the stock alone.
+    """
+    report_fields = ()
+
+    def delete(self):
+        with transaction.atomic():
+            for owner_id in self.order_by().values_list('owner_id', flat=True).distinct():
+                reports.remove_many(owner_id, self, *self.report_fields)
+            return super().delete()
+
+
+class PurchaseQuerySet(ReportedQuerySet):
+    report_fields = ('purchase_quantity', 'purchase_total', 'purchase_date')
+
+
+class SaleQuerySet(ReportedQuerySet):
+    report_fields = ('sale_quantity', 'sale_total', 'sale_date')
+
+
 class Purchase(models.Model):
     owner = models.ForeignKey(User, on_delete=models.CASCADE)
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='purchased_products')
@@ -60,18 +173,73 @@ class Purchase(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PurchaseQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'created_at', 'id'], name='purchase_owner_created_idx'),
+            models.Index(fields=['owner', 'product', 'created_at'], name='purchase_owner_product_idx'),
+            models.Index(fields=['owner', 'supplier', 'created_at'], name='purchase_owner_supplier_idx'),
+            models.Index(fields=['owner', 'purchase_date', 'created_at'], name='purchase_owner_date_idx'),
+        ]
+
     def save(self, *args, **kwargs):
-        self.product.quantity_in_stock += self.quantity
-        self.product.save()
         self.total_price = self.quantity * self.unit_cost_price
 
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            previous = None if self._state.adding else Purchase.objects.select_for_update().get(pk=self.pk)
+            deltas = stock.net_deltas(previous, self, sign=1)
+            stock.move_stock(deltas)
+            if previous is not None:
+                reports.record_purchase(previous, sign=-1, create=False)
+            super().save(*args, **kwargs)
+            journal.record_many(StockMovement.PURCHASE, [(product_id, delta, self.pk) for product_id, delta in deltas.items()])
+            reports.record_purchase(self)
+        caching.invalidate(Product, self.product.owner_id)
+
+    def delete(self, *args, **kwargs):
+        # Only an explicit delete gives the stock back; purchases removed by
+        # a cascade leave it alone and leave the reports to the receivers in
+        # signals.
+        with transaction.atomic():
+            previous = Purchase.objects.select_for_update().get(pk=self.pk)
+            deltas = stock.net_deltas(previous, None, sign=1)
+            stock.move_stock(deltas)
+            reports.record_purchase(previous, sign=-1, create=False)
+            journal.record_many(StockMovement.PURCHASE, [(product_id, delta, self.pk) for product_id, delta in deltas.items()])
+            result = super().delete(*args, **kwargs)
+        caching.invalidate(Product, self.owner_id)
+        return result
 
     def __str__(self):
         return f"Purchase of {self.quantity} x {self.product.name} on {self.purchase_date.strftime('%Y-%m-%d')}"
 
+class Order(models.Model):
+    """A basket checked out at once; its lines are ``Sale`` rows."""
+    owner = models.ForeignKey(User, on_delete=models.CASCADE)
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='orders')
+    order_date = models.DateField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'created_at', 'id'], name='order_owner_created_idx'),
+        ]
+
+    @property
+    def total_price(self):
+        return sum((line.total_price for line in self.lines.all()), Decimal('0'))
+
+    def __str__(self):
+        return f"Order {self.pk} for {self.customer.name} on {self.order_date.strftime('%Y-%m-%d')}"
+
 class Sale(models.Model):
     owner = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Set on the lines of an order; most sales stand alone, hence the
+    # partial index below instead of the usual one on every row.
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, null=True, blank=True, related_name='lines',
+                              db_index=False)
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='sales')
     quantity = models.PositiveIntegerField()
     sale_date = models.DateField()
@@ -81,21 +249,141 @@ class Sale(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
-    def clean(self):
-        if self.quantity > self.product.quantity_in_stock:
-            raise ValidationError('Not enough stock to complete the sale.')
-    
+    objects = SaleQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'created_at', 'id'], name='sale_owner_created_idx'),
+            models.Index(fields=['owner', 'product', 'created_at'], name='sale_owner_product_idx'),
+            models.Index(fields=['owner', 'customer', 'created_at'], name='sale_owner_customer_idx'),
+            models.Index(fields=['order'], condition=models.Q(order__isnull=False), name='sale_order_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.sale_price:
             self.sale_price = self.product.price
         
-        self.clean()
-        self.product.quantity_in_stock -= self.quantity
-        self.product.save()
         self.total_price = self.quantity * self.sale_price
 
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            previous = None if self._state.adding else Sale.objects.select_for_update().get(pk=self.pk)
+            deltas = stock.net_deltas(previous, self, sign=-1)
+            stock.move_stock(deltas)
+            if previous is not None:
+                reports.record_sale(previous, sign=-1, create=False)
+            super().save(*args, **kwargs)
+            journal.record_many(StockMovement.SALE, [(product_id, delta, self.pk) for product_id, delta in deltas.items()])
+            reports.record_sale(self)
+        caching.invalidate(Product, self.product.owner_id)
+
+    def delete(self, *args, **kwargs):
+        # As for purchases, only an explicit delete puts the stock back.
+        with transaction.atomic():
+            previous = Sale.objects.select_for_update().get(pk=self.pk)
+            deltas = stock.net_deltas(previous, None, sign=-1)
+            stock.move_stock(deltas)
+            reports.record_sale(previous, sign=-1, create=False)
+            journal.record_many(StockMovement.SALE, [(product_id, delta, self.pk) for product_id, delta in deltas.items()])
+            result = super().delete(*args, **kwargs)
+        caching.invalidate(Product, self.owner_id)
+        return result
 
     def __str__(self):
         return f"Sale of {self.quantity} x {self.product.name} on {self.sale_date.strftime('%Y-%m-%d')}"
 
+class DailyTotals(models.Model):
+    owner = models.ForeignKey(User, on_delete=models.CASCADE)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='daily_totals')
+    day = models.DateField()
+    sale_quantity = models.BigIntegerField(default=0)
+    sale_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    purchase_quantity = models.BigIntegerField(default=0)
+    purchase_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'day'], name='dailytotals_owner_day_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'product', 'day'], name='dailytotals_product_day_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.product.name} on {self.day.strftime('%Y-%m-%d')}"
+
+class StockMovement(models.Model):
+    """One change to a product's stock. Rows are only ever appended."""
+    OPENING = 'opening'
+    ADJUSTMENT = 'adjustment'
+    IMPORT = 'import'
+    SALE = 'sale'
+    PURCHASE = 'purchase'
+    KINDS = [
+        (OPENING, 'Opening stock'),
+        (ADJUSTMENT, 'Adjustment'),
+        (IMPORT, 'Import'),
+        (SALE, 'Sale'),
+        (PURCHASE, 'Purchase'),
+    ]
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_movements')
+    delta = models.IntegerField()
+    kind = models.CharField(max_length=10, choices=KINDS)
+    # The id of the sale or purchase behind the movement, kept after it is deleted.
+    reference = models.PositiveBigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['product', 'created_at', 'id'], name='movement_product_created_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('Stock movements cannot be changed once written.')
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError('Stock movements cannot be deleted.')
+
+    def __str__(self):
+        return f"{self.delta:+d} x {self.product.name} ({self.kind})"
+
+class StockSnapshot(models.Model):
+    """A product's stock after ``movement``, the journal folded up to that point."""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_snapshots')
+    movement = models.ForeignKey(StockMovement, on_delete=models.CASCADE, related_name='+')
+    taken_at = models.DateTimeField()
+    quantity = models.IntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['product', 'taken_at', 'movement'], name='snapshot_product_taken_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product.name} at {self.taken_at:%Y-%m-%d %H:%M}"
+
+class IdempotencyKey(models.Model):
+    """The response to a create request sent with an ``Idempotency-Key`` header."""
+    owner = models.ForeignKey(User, on_delete=models.CASCADE)
+    route = models.CharField(max_length=50)
+    key = models.CharField(max_length=255)
+    # SHA-256 of the request, so a key reused for a different body is refused.
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    # The response data as JSON text; jsonb would not keep its key order.
+    body = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['expires_at'], name='idempotency_expires_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'route', 'key'], name='idempotency_owner_key_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.route} {self.key}"
@@ -3,7 +3,7 @@ from rest_framework import permissions
 class IsOwner(permissions.BasePermission):
     
     def has_object_permission(self, request, view, obj):
-        return obj.owner == request.user
+        return obj.owner_id == request.user.pk
     
     def has_permission(self, request, view):
-        return request.user and request.user.is_authenticated
\ No newline at end of file
+        return request.user and request.user.is_authenticated
@@ -0,0 +1,131 @@
+import zoneinfo
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+
+from django.db import models as fields
+from django.utils import timezone
+
+from . import models
+
+# Read-only twins of the ModelSerializers for list pages. A ModelSerializer
+# builds a field tree and calls each field's to_representation for every
+# model instance; these read the page as ``values()`` rows and format each
+# column with a function picked once per class from the model field. The
+# JSON is the same as the ModelSerializer's, key order and all.
+
+
+def _format_decimal(field):
+    exponent = Decimal(1).scaleb(-field.decimal_places)
+    return lambda value: '{:f}'.format(value.quantize(exponent))
+
+
+# Database rows come back in UTC; while the active zone is UTC as well the
+# conversion DRF does would not change the value, and it is the slow part.
+UTC_ZONES = (dt_timezone.utc, zoneinfo.ZoneInfo('UTC'))
+
+
+def _format_datetime(zone):
+    """A datetime formatter for ``zone``, which is resolved once per page rather than per value."""
+    utc = zone in UTC_ZONES
+
+    def format(value):
+        if utc and value.tzinfo is dt_timezone.utc:
+            return value.isoformat()[:-6] + 'Z'
+        value = value.astimezone(zone).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+    return format
+
+
+def _format_date(value):
+    return value.isoformat()
+
+
+def _formatter(field):
+    if isinstance(field, fields.DecimalField):
+        return _format_decimal(field)
+    if isinstance(field, fields.DateTimeField):
+        return _format_datetime
+    if isinstance(field, fields.DateField):
+        return _format_date
+    return None
+
+
+def _resolve(model, lookup):
+    *path, name = lookup.split('__')
+    for step in path:
+        model = model._meta.get_field(step).related_model
+    return model._meta.get_field(name)
+
+
+class ValuesSerializer:
+    """
+    Serializes ``values()`` rows. ``columns`` lists ``(key, lookup)`` pairs
+    in output order; ``lookups`` is what the queryset must select.
+    """
+    model = None
+    columns = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.lookups = [lookup for _, lookup in cls.columns]
+        cls._compiled = [(key, lookup, _formatter(_resolve(cls.model, lookup))) for key, lookup in cls.columns]
+
+    @classmethod
+    def serialize(cls, rows):
+        format_datetime = _format_datetime(timezone.get_current_timezone())
+        compiled = [
+            (key, lookup, format_datetime if format is _format_datetime else format)
+            for key, lookup, format in cls._compiled
+        ]
+        data = []
+        for row in rows:
+            item = {}
+            for key, lookup, format in compiled:
+                value = row[lookup]
+                item[key] = value if format is None or value is None else format(value)
+            data.append(item)
+        return data
+
+
+class ProductValuesSerializer(ValuesSerializer):
+    model = models.Product
+    columns = [
+        ('name', 'name'), ('sku', 'sku'), ('price', 'price'), ('quantity_in_stock', 'quantity_in_stock'),
+        ('reorder_level', 'reorder_level'), ('category', 'category__name'),
+        ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+    ]
+
+
+class CustomerValuesSerializer(ValuesSerializer):
+    model = models.Customer
+    columns = [
+        ('name', 'name'), ('email', 'email'), ('phone', 'phone'), ('address', 'address'),
+        ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+    ]
+
+
+class SupplierValuesSerializer(ValuesSerializer):
+    model = models.Supplier
+    columns = [
+        ('name', 'name'), ('contact_email', 'contact_email'), ('phone', 'phone'), ('address', 'address'),
+        ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+    ]
+
+
+class PurchaseValuesSerializer(ValuesSerializer):
+    model = models.Purchase
+    columns = [
+        ('product', 'product__name'), ('supplier', 'supplier__name'), ('quantity', 'quantity'),
+        ('purchase_date', 'purchase_date'), ('unit_cost_price', 'unit_cost_price'), ('total_price', 'total_price'),
+        ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+    ]
+
+
+class SaleValuesSerializer(ValuesSerializer):
+    model = models.Sale
+    columns = [
+        ('product', 'product__name'), ('quantity', 'quantity'), ('sale_date', 'sale_date'),
+        ('customer', 'customer__name'), ('sale_price', 'sale_price'), ('total_price', 'total_price'),
+        ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+    ]
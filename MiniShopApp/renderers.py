@@ -0,0 +1,85 @@
+import datetime
+import math
+import re
+from decimal import Decimal
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+
+_encoder = JSONEncoder()
+
+# Python writes large and tiny floats as 1e+16 / 1.5e-05, orjson as 1e16 /
+# 0.000015. Output with anything that may be such a float is rendered again by
+# the stdlib encoder; a match inside a string only costs the slow path. The
+# searches start on a literal so that re can skip ahead quickly.
+EXPONENT = re.compile(rb'e[-0-9]')
+DIGITS = b'0123456789'
+
+
+def _float_forms_differ(content):
+    if b'0.0000' in content:
+        return True
+    return any(content[match.start() - 1] in DIGITS for match in EXPONENT.finditer(content, 1))
+
+
+def encode_default(obj):
+    """
+    What DRF's ``JSONEncoder`` turns ``obj`` into, with the types our
+    payloads actually carry checked first.
+    """
+    if isinstance(obj, datetime.datetime):
+        representation = obj.isoformat()
+        if representation.endswith('+00:00'):
+            representation = representation[:-6] + 'Z'
+        return representation
+    if isinstance(obj, datetime.date):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        value = float(obj)
+        if not math.isfinite(value):
+            # orjson would write null; make it fall back to the stock renderer.
+            raise ValueError('Out of range float values are not JSON compliant')
+        return value
+    return _encoder.default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` on orjson when it is installed, with byte-for-byte the
+    same output: compact, unescaped UTF-8, U+2028/U+2029 escaped, dates and
+    decimals as DRF encodes them. Indented output, non-default JSON settings,
+    floats in exponent form and anything orjson cannot encode (integers
+    beyond 64 bits, say) go through the stock renderer. So do Decimals that
+    make no finite float, which it refuses with a ``ValueError``. Payloads
+    carry no native floats, so a float NaN or infinity is not looked for
+    and comes out as null.
+    """
+    fast = orjson is not None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            data is None
+            or not self.fast
+            or self.ensure_ascii
+            or not self.compact
+            or self.encoder_class is not JSONEncoder
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            content = orjson.dumps(
+                data,
+                default=encode_default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if _float_forms_differ(content):
+            return super().render(data, accepted_media_type, renderer_context)
+        return content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
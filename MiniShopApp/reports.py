@@ -0,0 +1,143 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import DecimalField, Exists, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth, TruncYear
+
+from . import models
+
+GROUPINGS = {
+    'day': F('day'),
+    'month': TruncMonth('day'),
+    'year': TruncYear('day'),
+    'product': F('product__name'),
+}
+
+ZERO = Value(Decimal('0'), output_field=DecimalField(max_digits=16, decimal_places=2))
+
+TOTALS = {
+    'quantity_sold': Coalesce(Sum('sale_quantity'), 0),
+    'revenue': Coalesce(Sum('sale_total'), ZERO),
+    'quantity_purchased': Coalesce(Sum('purchase_quantity'), 0),
+    'cost': Coalesce(Sum('purchase_total'), ZERO),
+}
+
+
+def record(owner_id, product_id, day, create=True, **deltas):
+    """
+    Add ``deltas`` to one owner/product/day rollup row with an F() UPDATE.
+
+    The row is created on first use; a concurrent insert of the same row is
+    caught and turned into an update. With ``create=False`` a missing row is
+    left alone, which is what removing a contribution needs.
+    """
+    rows = models.DailyTotals.objects.filter(owner_id=owner_id, product_id=product_id, day=day)
+    changes = {field: F(field) + value for field, value in deltas.items()}
+    if rows.update(**changes) or not create:
+        return
+
+    try:
+        with transaction.atomic():
+            models.DailyTotals.objects.create(owner_id=owner_id, product_id=product_id, day=day, **deltas)
+    except IntegrityError:
+        rows.update(**changes)
+
+
+def record_sale(sale, sign=1, create=True):
+    record(sale.owner_id, sale.product_id, sale.sale_date, create,
+           sale_quantity=sign * sale.quantity, sale_total=sign * sale.total_price)
+
+
+def record_purchase(purchase, sign=1, create=True):
+    record(purchase.owner_id, purchase.product_id, purchase.purchase_date, create,
+           purchase_quantity=sign * purchase.quantity, purchase_total=sign * purchase.total_price)
+
+
+def record_many(owner_id, rows, quantity_field, total_field, date_field):
+    """
+    Roll a batch of unsaved sales or purchases into the daily totals, one
+    update per distinct product and day rather than per row.
+    """
+    sums = defaultdict(lambda: [0, Decimal('0')])
+    for row in rows:
+        key = (row.product_id, getattr(row, date_field))
+        sums[key][0] += row.quantity
+        sums[key][1] += row.total_price
+
+    for (product_id, day), (quantity, total) in sums.items():
+        record(owner_id, product_id, day, **{quantity_field: quantity, total_field: total})
+
+
+def remove_many(owner_id, rows, quantity_field, total_field, date_field):
+    """
+    Take the sales or purchases in ``rows``, a queryset about to be deleted,
+    out of the daily totals with a single UPDATE of every product/day row
+    they touch, however many rows there are.
+    """
+    matching = (
+        rows.filter(owner_id=owner_id, product=OuterRef('product'), **{date_field: OuterRef('day')})
+        .order_by().values('product')
+    )
+    quantity = Subquery(matching.annotate(sum=Sum('quantity')).values('sum'))
+    total = Subquery(matching.annotate(sum=Sum('total_price')).values('sum'))
+    models.DailyTotals.objects.filter(Exists(matching), owner_id=owner_id).update(**{
+        quantity_field: F(quantity_field) - quantity,
+        total_field: F(total_field) - total,
+    })
+
+
+def rebuild(owner=None):
+    """
+    Recompute the daily totals from the raw sales and purchases with two
+    GROUP BY queries and a ``bulk_create``. Returns the number of rows.
+    """
+    sales = models.Sale.objects.all()
+    purchases = models.Purchase.objects.all()
+    if owner is not None:
+        sales = sales.filter(owner=owner)
+        purchases = purchases.filter(owner=owner)
+
+    totals = {}
+
+    def row(owner_id, product_id, day):
+        key = (owner_id, product_id, day)
+        if key not in totals:
+            totals[key] = models.DailyTotals(owner_id=owner_id, product_id=product_id, day=day)
+        return totals[key]
+
+    for values in sales.values('owner_id', 'product_id', 'sale_date').annotate(quantity=Sum('quantity'), total=Sum('total_price')).order_by():
+        daily = row(values['owner_id'], values['product_id'], values['sale_date'])
+        daily.sale_quantity, daily.sale_total = values['quantity'], values['total']
+
+    for values in purchases.values('owner_id', 'product_id', 'purchase_date').annotate(quantity=Sum('quantity'), total=Sum('total_price')).order_by():
+        daily = row(values['owner_id'], values['product_id'], values['purchase_date'])
+        daily.purchase_quantity, daily.purchase_total = values['quantity'], values['total']
+
+    with transaction.atomic():
+        existing = models.DailyTotals.objects.all()
+        if owner is not None:
+            existing = existing.filter(owner=owner)
+        existing.delete()
+        models.DailyTotals.objects.bulk_create(totals.values(), batch_size=1000)
+    return len(totals)
+
+
+def summarize(owner, date_from=None, date_to=None, group_by='day', product=None):
+    """
+    Totals for ``owner`` read from the daily rollups, grouped by day, month,
+    year or product, or as one grand total when ``group_by`` is ``'total'``.
+    """
+    rows = models.DailyTotals.objects.filter(owner=owner)
+    if date_from:
+        rows = rows.filter(day__gte=date_from)
+    if date_to:
+        rows = rows.filter(day__lte=date_to)
+    if product:
+        rows = rows.filter(product__name=product)
+
+    if group_by == 'total':
+        groups = [{'group': 'total', **rows.aggregate(**TOTALS)}]
+    else:
+        groups = rows.annotate(group=GROUPINGS[group_by]).values('group').annotate(**TOTALS).order_by('group')
+    return [dict(group, margin=group['revenue'] - group['cost']) for group in groups]
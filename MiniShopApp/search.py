@@ -0,0 +1,299 @@
+import re
+import threading
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from datetime import date, timedelta
+from functools import reduce
+from operator import and_, or_
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import OrderingFilter, SearchFilter
+
+from . import caching, models
+
+# Search matches every term of the query as a word prefix of a row's text:
+# a product's name, SKU or category name, a customer's or supplier's name.
+# Products are ranked; sales and purchases are filtered by the products,
+# customers and suppliers that match.
+#
+# PostgreSQL evaluates it with to_tsvector/to_tsquery against GIN expression
+# indexes (migrations 0010 and 0016). Other backends use a per-process
+# inverted index per owner and model, so SQLite test runs behave like
+# production. An index is built on first use and stamped with the response
+# cache's version counters (see caching); a write in any process sharing
+# that cache bumps them and the next search rebuilds it. At most
+# MAX_INDEXES are kept, least recently used first out, and an owner with
+# more than MAX_INDEXED_ROWS rows is searched with LIKE scans instead.
+
+SEARCH_CONFIG = 'simple'
+MAX_TERMS = 8
+# The inverted index hands its matches to the database as an IN list, so it
+# keeps only the best ones.
+MAX_INDEX_HITS = 1000
+MAX_INDEXES = 64
+MAX_INDEXED_ROWS = 200_000
+WORD = re.compile(r'\w+')
+PERIOD = re.compile(r'(\d{4})(?:-(\d{2}))?(?:-(\d{2}))?$')
+
+# The text searched per model, with the weight of a word found there: a word
+# in a product's name counts more than one in its SKU or category.
+FIELDS = {
+    models.Product: {'name': 1.0, 'sku': 0.6, 'category__name': 0.4},
+    models.Customer: {'name': 1.0},
+    models.Supplier: {'name': 1.0},
+}
+
+
+def product_vector():
+    """The expression behind ``product_search_idx`` (migration 0010); queries must use the same one."""
+    return SearchVector('name', 'sku', config=SEARCH_CONFIG)
+
+
+def category_vector():
+    return SearchVector('name', config=SEARCH_CONFIG)
+
+
+def name_vector():
+    """The expression behind ``customer_search_idx`` and ``supplier_search_idx`` (migration 0016)."""
+    return SearchVector('name', config=SEARCH_CONFIG)
+
+
+def words(text):
+    return [word.lower() for word in WORD.findall(text or '')]
+
+
+def query_terms(query):
+    return words(query)[:MAX_TERMS]
+
+
+def search_products(queryset, query, owner_id):
+    """
+    Filter ``queryset``, a set of ``owner_id``'s products, to the ones matching
+    every term of ``query`` and annotate them with ``search_rank`` (higher is
+    better).
+    """
+    terms = query_terms(query)
+    if not terms:
+        return _no_matches(queryset)
+    if connection.vendor == 'postgresql':
+        return _search_postgres(queryset, terms)
+    return _search_index(queryset, terms, owner_id)
+
+
+def _no_matches(queryset):
+    return queryset.annotate(search_rank=Value(0.0, output_field=FloatField())).none()
+
+
+def _prefix_query(terms, operator):
+    return SearchQuery(operator.join(f'{term}:*' for term in terms), search_type='raw', config=SEARCH_CONFIG)
+
+
+def _term_match(model, term):
+    """``Q`` on a queryset aliased with ``search`` for rows with a word starting with ``term`` (PostgreSQL)."""
+    match = Q(search=_prefix_query([term], ''))
+    if model is models.Product:
+        categories = models.Category.objects.annotate(search=category_vector()).filter(search=_prefix_query([term], ''))
+        match |= Q(category__in=categories.values('pk'))
+    return match
+
+
+def _search_postgres(queryset, terms):
+    matches = [_term_match(models.Product, term) for term in terms]
+    return queryset.alias(search=product_vector()).filter(reduce(and_, matches)).annotate(
+        search_rank=SearchRank(product_vector(), _prefix_query(terms, ' | ')),
+    )
+
+
+def _word_prefix(model, term):
+    """Approximates the word-prefix match with LIKE scans, for owners too large to index."""
+    return reduce(or_, [
+        Q(**{f'{field}__istartswith': term}) | Q(**{f'{field}__icontains': f' {term}'}) for field in FIELDS[model]
+    ])
+
+
+def _search_scan(queryset, terms):
+    return queryset.filter(reduce(and_, [_word_prefix(models.Product, term) for term in terms])).annotate(
+        search_rank=Value(0.0, output_field=FloatField()),
+    )
+
+
+class InvertedIndex:
+    """Maps each lower-cased word to ``{pk: weight}``; ``rows`` are ``(pk, *texts)`` in ``weights`` order."""
+
+    def __init__(self, rows, weights):
+        postings = defaultdict(dict)
+        for pk, *texts in rows:
+            for weight, text in zip(weights.values(), texts):
+                for word in words(text):
+                    postings[word][pk] = max(postings[word].get(pk, 0.0), weight)
+        self.postings = dict(postings)
+        self.words = sorted(self.postings)
+
+    def lookup(self, term):
+        """``{pk: score}`` for the rows with a word starting with ``term``."""
+        scores = {}
+        start = bisect_left(self.words, term)
+        for word in self.words[start:]:
+            if not word.startswith(term):
+                break
+            # An exact word match ranks above a longer word it is a prefix of.
+            boost = 1.0 if word == term else 0.5
+            for pk, weight in self.postings[word].items():
+                scores[pk] = max(scores.get(pk, 0.0), weight * boost)
+        return scores
+
+    def search(self, terms):
+        results = None
+        for term in terms:
+            scores = self.lookup(term)
+            if results is None:
+                results = scores
+            else:
+                results = {pk: results[pk] + score for pk, score in scores.items() if pk in results}
+            if not results:
+                return {}
+        return results
+
+
+_indexes = OrderedDict()
+_lock = threading.Lock()
+
+
+def _version(model, owner_id):
+    dependencies = [model, models.Category] if model is models.Product else [model]
+    return tuple(caching.get_version(dependency, owner_id) for dependency in dependencies)
+
+
+def get_index(owner_id, model=models.Product):
+    """
+    The owner's inverted index over ``model``, or ``None`` when they have more
+    rows than it is worth holding in memory.
+    """
+    key = (model._meta.label_lower, owner_id)
+    version = _version(model, owner_id)
+    with _lock:
+        entry = _indexes.get(key)
+        # Without a cache to keep the counters (DummyCache) nothing is reused.
+        if entry is None or entry[0] != version or None in version:
+            entry = _indexes[key] = (version, _build_index(model, owner_id))
+            while len(_indexes) > MAX_INDEXES:
+                _indexes.popitem(last=False)
+        _indexes.move_to_end(key)
+        return entry[1]
+
+
+def _build_index(model, owner_id):
+    rows = model.objects.filter(owner_id=owner_id)
+    if rows.count() > MAX_INDEXED_ROWS:
+        return None
+    return InvertedIndex(rows.values_list('pk', *FIELDS[model]).iterator(chunk_size=5000), FIELDS[model])
+
+
+def invalidate(owner_id=None):
+    """Drop this process's inverted indexes of ``owner_id``, or of everyone."""
+    with _lock:
+        for key in [key for key in _indexes if owner_id is None or key[1] == owner_id]:
+            del _indexes[key]
+
+
+def _search_index(queryset, terms, owner_id):
+    index = get_index(owner_id)
+    if index is None:
+        return _search_scan(queryset, terms)
+    scores = index.search(terms)
+    if not scores:
+        return _no_matches(queryset)
+    if len(scores) > MAX_INDEX_HITS:
+        best = sorted(scores, key=scores.get, reverse=True)[:MAX_INDEX_HITS]
+        scores = {pk: scores[pk] for pk in best}
+    # A simple CASE compiles and evaluates far faster than one When() per hit.
+    qn = connection.ops.quote_name
+    column = f'{qn(queryset.model._meta.db_table)}.{qn(queryset.model._meta.pk.column)}'
+    rank = RawSQL(
+        f"CASE {column} {' '.join(['WHEN %s THEN %s'] * len(scores))} ELSE 0 END",
+        [value for item in scores.items() for value in item],
+        output_field=FloatField(),
+    )
+    return queryset.filter(pk__in=list(scores)).annotate(search_rank=rank)
+
+
+class ProductSearchFilter(SearchFilter):
+    """
+    ``?search=`` through ``search_products``. Unless the client asked for an
+    explicit ``?ordering=``, results come best match first. List it after
+    ``OrderingFilter``.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        if not query_terms(query):
+            return queryset
+
+        queryset = search_products(queryset, query, request.user.pk)
+        if OrderingFilter.ordering_param not in request.query_params:
+            queryset = queryset.order_by('-search_rank', *queryset.query.order_by)
+        return queryset
+
+
+def matching(model, term, owner_id):
+    """
+    The owner's ``model`` rows with a word starting with ``term``, as a value
+    for an ``__in`` lookup: a subquery, or the ids the inverted index found.
+    """
+    rows = model.objects.filter(owner_id=owner_id)
+    if connection.vendor == 'postgresql':
+        vector = product_vector() if model is models.Product else name_vector()
+        return rows.alias(search=vector).filter(_term_match(model, term)).values('pk')
+    index = get_index(owner_id, model)
+    hits = index.lookup(term) if index is not None else {}
+    if index is None or len(hits) > MAX_INDEX_HITS:
+        return rows.filter(_word_prefix(model, term)).values('pk')
+    return list(hits)
+
+
+def period(token):
+    """The first and last day of a ``YYYY``, ``YYYY-MM`` or ``YYYY-MM-DD`` token, else ``None``."""
+    match = PERIOD.match(token)
+    if match is None:
+        return None
+    year, month, day = (int(part) if part else None for part in match.groups())
+    try:
+        if day:
+            return date(year, month, day), date(year, month, day)
+        if month:
+            return date(year, month, 1), date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+        return date(year, 1, 1), date(year, 12, 31)
+    except ValueError:
+        return None
+
+
+class RelatedSearchFilter(SearchFilter):
+    """
+    ``?search=`` for sales and purchases. Every term must be a word prefix of
+    one of the related rows in the view's ``search_related`` (``{lookup:
+    model}``); the rows are found as ``matching`` does and applied as
+    ``<lookup>__in``, over the owner-scoped foreign key indexes. With
+    ``search_date_field`` set, a term such as ``2025-07`` also matches that
+    year, month or day.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        date_field = getattr(view, 'search_date_field', None)
+        conditions = []
+        for token in self.get_search_terms(request)[:MAX_TERMS]:
+            names = [
+                reduce(or_, [Q(**{f'{lookup}__in': matching(model, term, request.user.pk)})
+                             for lookup, model in view.search_related.items()])
+                for term in words(token)
+            ]
+            days = period(token) if date_field else None
+            if days is not None:
+                # The token's digits are words too, so a name may match it as well.
+                names = [Q(**{f'{date_field}__range': days}) | reduce(and_, names)]
+            conditions += names
+        if not conditions:
+            return queryset
+        return queryset.filter(reduce(and_, conditions))
@@ -3,6 +3,28 @@ from . import models
 from django.contrib.auth.models import User
 from rest_framework_simplejwt.tokens import RefreshToken
 
+class OwnerSlugRelatedField(serializers.SlugRelatedField):
+    """
+    Resolves a name among the requesting user's own rows only, through the
+    (owner, name) unique constraint, and remembers each lookup for the rest
+    of the request so a name repeated in one payload costs one query.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(owner=self.context['request'].user)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            return super().to_internal_value(data)
+
+        request = self.context['request']
+        if not hasattr(request, '_slug_memo'):
+            request._slug_memo = {}
+        key = (self.queryset.model, self.slug_field, data)
+        if key not in request._slug_memo:
+            request._slug_memo[key] = super().to_internal_value(data)
+        return request._slug_memo[key]
+
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = models.Category
@@ -16,9 +38,19 @@ class ProductSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = models.Product
-        fields = ['name', 'sku', 'price', 'quantity_in_stock', 'owner', 'category', 'created_at', 'updated_at']
+        fields = ['name', 'sku', 'price', 'quantity_in_stock', 'reorder_level', 'owner', 'category', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
 
+class ProductStockSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.Product
+        fields = ['sku', 'quantity_in_stock', 'updated_at']
+
+class LowStockSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.Product
+        fields = ['id', 'name', 'sku', 'quantity_in_stock', 'reorder_level', 'low_stock_since']
+
 class CustomerSerializer(serializers.ModelSerializer):
     owner = serializers.HiddenField(
         default=serializers.CurrentUserDefault()
@@ -42,8 +74,8 @@ class PurchaseSerializer(serializers.ModelSerializer):
     owner = serializers.HiddenField(
         default=serializers.CurrentUserDefault()
     )
-    product = serializers.SlugRelatedField(slug_field='name', queryset=models.Product.objects.all())
-    supplier = serializers.SlugRelatedField(slug_field='name', queryset=models.Supplier.objects.all())
+    product = OwnerSlugRelatedField(slug_field='name', queryset=models.Product.objects.all())
+    supplier = OwnerSlugRelatedField(slug_field='name', queryset=models.Supplier.objects.all())
 
     class Meta:
         model = models.Purchase
@@ -51,8 +83,8 @@ class PurchaseSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'updated_at']
     
 class SaleSerializer(serializers.ModelSerializer):
-    product = serializers.SlugRelatedField(slug_field='name', queryset=models.Product.objects.all())
-    customer = serializers.SlugRelatedField(slug_field='name', queryset=models.Customer.objects.all())
+    product = OwnerSlugRelatedField(slug_field='name', queryset=models.Product.objects.all())
+    customer = OwnerSlugRelatedField(slug_field='name', queryset=models.Customer.objects.all())
     owner = serializers.HiddenField(
         default=serializers.CurrentUserDefault()
     )
@@ -62,6 +94,64 @@ class SaleSerializer(serializers.ModelSerializer):
         fields = ['product', 'quantity', 'sale_date', 'customer', 'sale_price', 'total_price', 'created_at', 'updated_at', 'owner']
         read_only_fields = ['created_at', 'updated_at']
 
+class OrderLineSerializer(serializers.ModelSerializer):
+    # Names are resolved for the whole basket at once when the order is placed.
+    product = serializers.CharField(source='product.name', max_length=100)
+
+    class Meta:
+        model = models.Sale
+        fields = ['id', 'product', 'quantity', 'sale_price', 'total_price']
+        read_only_fields = ['id', 'total_price']
+        extra_kwargs = {'quantity': {'min_value': 1}}
+
+class OrderSerializer(serializers.ModelSerializer):
+    customer = OwnerSlugRelatedField(slug_field='name', queryset=models.Customer.objects.all())
+    lines = OrderLineSerializer(many=True, allow_empty=False)
+    total_price = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+    owner = serializers.HiddenField(
+        default=serializers.CurrentUserDefault()
+    )
+
+    class Meta:
+        model = models.Order
+        fields = ['id', 'customer', 'order_date', 'lines', 'total_price', 'created_at', 'updated_at', 'owner']
+        read_only_fields = ['created_at', 'updated_at']
+
+class ProductImportSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=100)
+    sku = serializers.CharField(max_length=50)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    quantity_in_stock = serializers.IntegerField(min_value=0)
+    category = serializers.CharField(max_length=100)
+
+class PurchaseLineSerializer(serializers.Serializer):
+    product = serializers.CharField(max_length=100)
+    supplier = serializers.CharField(max_length=100)
+    quantity = serializers.IntegerField(min_value=1)
+    purchase_date = serializers.DateField()
+    unit_cost_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+class SaleLineSerializer(serializers.Serializer):
+    product = serializers.CharField(max_length=100)
+    customer = serializers.CharField(max_length=100)
+    quantity = serializers.IntegerField(min_value=1)
+    sale_date = serializers.DateField()
+    sale_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, allow_null=True)
+
+class ReportQuerySerializer(serializers.Serializer):
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    group_by = serializers.ChoiceField(choices=['day', 'month', 'year', 'product', 'total'], default='day')
+    product = serializers.CharField(max_length=100, required=False)
+
+class ReportRowSerializer(serializers.Serializer):
+    group = serializers.CharField()
+    quantity_sold = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=16, decimal_places=2)
+    quantity_purchased = serializers.IntegerField()
+    cost = serializers.DecimalField(max_digits=16, decimal_places=2)
+    margin = serializers.DecimalField(max_digits=16, decimal_places=2)
+
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
     
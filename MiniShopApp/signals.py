@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import caching, models, reports
+from .authentication import user_cache
+
+
+# Sales and purchases have no delete receivers, so cascades remove them with
+# one DELETE instead of loading every row. Sale.delete/Purchase.delete update
+# the reports for explicit deletes; the receivers below take the rows a
+# customer, supplier or order cascades to out of them in bulk. Deleting the
+# owner or a product removes its daily totals as well, so those cascades
+# need nothing.
+def _deleted_directly(sender, origin):
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return issubclass(model, sender)
+
+
+@receiver(pre_delete, sender=models.Customer)
+def remove_customer_sales_from_reports(sender, instance, origin=None, **kwargs):
+    if _deleted_directly(sender, origin):
+        reports.remove_many(instance.owner_id, instance.sales_customers.all(), 'sale_quantity', 'sale_total', 'sale_date')
+
+
+@receiver(pre_delete, sender=models.Supplier)
+def remove_supplier_purchases_from_reports(sender, instance, origin=None, **kwargs):
+    if _deleted_directly(sender, origin):
+        reports.remove_many(instance.owner_id, instance.purchases.all(), 'purchase_quantity', 'purchase_total',
+                            'purchase_date')
+
+
+@receiver(pre_delete, sender=models.Order)
+def remove_order_lines_from_reports(sender, instance, origin=None, **kwargs):
+    if _deleted_directly(sender, origin):
+        reports.remove_many(instance.owner_id, instance.lines.all(), 'sale_quantity', 'sale_total', 'sale_date')
+
+
+# Drop users from the stateless JWT cache as soon as this process changes
+# them, so deactivation takes effect here without waiting for the TTL.
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def evict_cached_user(sender, instance, **kwargs):
+    user_cache.pop(instance.pk)
+
+
+@receiver(post_save, sender=models.Product)
+@receiver(post_delete, sender=models.Product)
+@receiver(post_save, sender=models.Customer)
+@receiver(post_delete, sender=models.Customer)
+@receiver(post_save, sender=models.Supplier)
+@receiver(post_delete, sender=models.Supplier)
+@receiver(post_save, sender=models.Category)
+@receiver(post_delete, sender=models.Category)
+def invalidate_cached_responses(sender, instance, **kwargs):
+    caching.invalidate(sender, getattr(instance, 'owner_id', None))
@@ -0,0 +1,138 @@
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.dispatch import Signal
+from django.utils import timezone
+
+from . import models
+from .exceptions import InsufficientStock
+
+# Sent once the transaction commits, with the ``product_ids`` that just fell
+# to or below their ``reorder_level``.
+low_stock = Signal()
+
+LOW = Q(quantity_in_stock__lte=F('reorder_level'))
+RESTOCKED = Q(quantity_in_stock__gt=F('reorder_level')) | Q(reorder_level__isnull=True)
+
+
+def apply_stock_delta(product_id, delta):
+    """
+    Move a product's stock by ``delta`` with one conditional UPDATE.
+
+    The arithmetic happens in the database, so concurrent callers never
+    overwrite each other, and a decrement only matches the row while enough
+    stock is left. Only ``quantity_in_stock`` and ``updated_at`` are written.
+    Call it inside the transaction that writes the sale or purchase row.
+    """
+    move_stock({product_id: delta})
+
+
+def move_stock(deltas):
+    """
+    Apply ``{product_id: delta}`` like ``apply_stock_delta``, still with one
+    conditional UPDATE, and raise ``InsufficientStock`` unless every
+    decrement found enough stock. The caller's transaction then rolls the
+    whole change back.
+    """
+    deltas = {product_id: delta for product_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    products = models.Product.objects.filter(pk__in=deltas)
+    for product_id, delta in deltas.items():
+        if delta < 0:
+            products = products.filter(~Q(pk=product_id) | Q(quantity_in_stock__gte=-delta))
+
+    updated = products.update(
+        quantity_in_stock=F('quantity_in_stock') + _change(deltas),
+        updated_at=timezone.now(),
+    )
+    if updated != len(deltas):
+        raise InsufficientStock()
+    _track(deltas)
+
+
+def net_deltas(before, after, sign):
+    """
+    The ``{product_id: delta}`` that turns the stock effect of the sale or
+    purchase row ``before`` into that of ``after``; either may be None for a
+    create or a delete. ``sign`` is -1 for sales and 1 for purchases.
+    """
+    deltas = {}
+    if before is not None:
+        deltas[before.product_id] = -sign * before.quantity
+    if after is not None:
+        deltas[after.product_id] = deltas.get(after.product_id, 0) + sign * after.quantity
+    return {product_id: delta for product_id, delta in deltas.items() if delta}
+
+
+def lock_stock(product_ids):
+    """
+    Lock the given products for the rest of the transaction and return their
+    stock as ``{product_id: quantity_in_stock}``.
+
+    Rows are locked in primary-key order, so two batches touching the same
+    products always queue behind each other instead of deadlocking.
+    """
+    return dict(
+        models.Product.objects.select_for_update()
+        .filter(pk__in=product_ids)
+        .order_by('pk')
+        .values_list('pk', 'quantity_in_stock')
+    )
+
+
+def apply_stock_deltas(deltas):
+    """
+    Apply ``{product_id: delta}`` to many products with one UPDATE.
+
+    Unlike ``apply_stock_delta`` this does not check the stock level, so the
+    caller must hold the locks from ``lock_stock`` and have checked it already.
+    """
+    deltas = {product_id: delta for product_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    models.Product.objects.filter(pk__in=deltas).update(
+        quantity_in_stock=F('quantity_in_stock') + _change(deltas),
+        updated_at=timezone.now(),
+    )
+    _track(deltas)
+
+
+def _change(deltas):
+    if len(deltas) == 1:
+        [delta] = deltas.values()
+        return Value(delta)
+    return Case(
+        *[When(pk=product_id, then=Value(delta)) for product_id, delta in deltas.items()],
+        output_field=IntegerField(),
+    )
+
+
+def _track(deltas):
+    fell = [product_id for product_id, delta in deltas.items() if delta < 0]
+    rose = [product_id for product_id, delta in deltas.items() if delta > 0]
+    if fell:
+        track_low_stock(models.Product.objects.filter(pk__in=fell), rose=False)
+    if rose:
+        track_low_stock(models.Product.objects.filter(pk__in=rose), fell=False)
+
+
+def track_low_stock(products, fell=True, rose=True):
+    """
+    Keep ``low_stock_since`` in step with the stock of ``products``, a
+    queryset of rows whose ``quantity_in_stock`` was just written in this
+    transaction and are therefore locked.
+
+    ``fell`` stamps the rows that crossed their ``reorder_level`` and sends
+    ``low_stock`` for them on commit; ``rose`` clears the rows back above it.
+    Each direction costs one statement that matches nothing in the common
+    case, so crossings are caught as they happen instead of by a scan.
+    """
+    if rose:
+        products.filter(low_stock_since__isnull=False).filter(RESTOCKED).update(low_stock_since=None)
+    if fell:
+        crossed = list(products.filter(LOW, low_stock_since__isnull=True).values_list('pk', flat=True))
+        if crossed:
+            models.Product.objects.filter(pk__in=crossed).update(low_stock_since=timezone.now())
+            transaction.on_commit(lambda: low_stock.send(sender=models.Product, product_ids=crossed))
@@ -1,6 +1,6 @@
 from django.urls import path
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import async_views, views
 
 router = DefaultRouter()
 
@@ -10,8 +10,14 @@ router.register(r'products', views.ProductViewSet, basename='product')
 router.register(r'suppliers', views.SupplierViewSet, basename='supplier')
 router.register(r'purchases', views.PurchaseViewSet, basename='purchase')
 router.register(r'sales', views.SaleViewSet, basename='sale')
+router.register(r'orders', views.OrderViewSet, basename='order')
 
 
 urlpatterns = [
-    path('register/', views.RegisterView.as_view(), name='register')
+    path('register/', views.RegisterView.as_view(), name='register'),
+    path('reports/', views.ReportView.as_view(), name='reports'),
+    path('async/categories/', async_views.category_list, name='async-category-list'),
+    path('async/products/', async_views.product_list, name='async-product-list'),
+    path('async/products/<int:pk>/', async_views.product_detail, name='async-product-detail'),
+    path('async/products/<int:pk>/stock/', async_views.product_stock, name='async-product-stock'),
 ] + router.urls
\ No newline at end of file
@@ -1,17 +1,42 @@
+import io
+
 from . import models
+from . import read_serializers
+from . import reports
 from . import serializers
+from .bulk import ingest_purchases, ingest_sales, place_order
+from .catalog import import_products
+from .caching import CachedResponseMixin
+from .conditional import ConditionalGetMixin
+from .export import ExportMixin
+from .idempotency import IdempotentCreateMixin
+from .parsers import FastJSONParser, NDJSONParser
 from .permissions import IsOwner
-from rest_framework import viewsets, filters
+from .search import ProductSearchFilter, RelatedSearchFilter
+from rest_framework import mixins, viewsets, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import CreateAPIView
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework.permissions import AllowAny
 from drf_yasg.utils import swagger_auto_schema
-from django_filters.rest_framework import DjangoFilterBackend
+from django.db.models import Prefetch
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 
 # Create your views here.
 
-class CategoryViewSet(viewsets.ModelViewSet):
+def bulk_response(request, ingest):
+    atomic = request.query_params.get('atomic', 'true').lower() not in ('false', '0', 'no')
+    created, errors = ingest(request.user, request.data, atomic=atomic)
+    if errors and atomic:
+        return Response({'created': created, 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'created': created, 'errors': errors}, status=status.HTTP_201_CREATED)
+
+class CategoryViewSet(CachedResponseMixin, ConditionalGetMixin, viewsets.ModelViewSet):
+    cache_models = [models.Category]
 
     queryset = models.Category.objects.all()
     serializer_class = serializers.CategorySerializer
@@ -22,24 +47,54 @@ class CategoryViewSet(viewsets.ModelViewSet):
     ordering_fields = ['name']
     ordering = ['name']
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(CachedResponseMixin, ConditionalGetMixin, ExportMixin, viewsets.ModelViewSet):
     permission_classes = [IsOwner]
-
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    cache_models = [models.Product, models.Category]
+    conditional_related = ['category']
+    export_columns = [
+        ('name', 'name'), ('sku', 'sku'), ('price', 'price'), ('quantity_in_stock', 'quantity_in_stock'),
+        ('reorder_level', 'reorder_level'), ('category', 'category__name'),
+        ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+    ]
+
+    filter_backends = [DjangoFilterBackend, OrderingFilter, ProductSearchFilter]
     filterset_fields = ['name', 'sku', 'category']
-    search_fields = ['name','sku', 'category__name']
     ordering_fields = ['created_at', 'updated_at', 'name', 'price']
     ordering = ['created_at']
 
     queryset = models.Product.objects.all()
     serializer_class = serializers.ProductSerializer
+    values_serializer_class = read_serializers.ProductValuesSerializer
 
     def get_queryset(self):
-        return models.Product.objects.filter(owner=self.request.user)
+        return models.Product.objects.filter(owner=self.request.user).select_related('category')
+
+    @action(detail=True, methods=['get'])
+    def stock(self, request, pk=None):
+        product = self.get_object()
+        return Response(serializers.ProductStockSerializer(product).data)
 
+    @action(detail=False, methods=['get'], url_path='low-stock', url_name='low-stock')
+    def low_stock(self, request):
+        """The owner's products at or below their reorder level, longest-running first."""
+        products = models.Product.objects.filter(owner=request.user, low_stock_since__isnull=False).only(
+            *serializers.LowStockSerializer.Meta.fields,
+        ).order_by('low_stock_since')
+        return Response(serializers.LowStockSerializer(products, many=True).data)
 
-class CustomerViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['post'], url_path='import', url_name='import', parser_classes=[MultiPartParser])
+    def import_csv(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'file': ['No CSV file was submitted.']}, status=status.HTTP_400_BAD_REQUEST)
+
+        report = import_products(request.user, io.TextIOWrapper(upload, encoding='utf-8-sig', newline=''))
+        return Response(report, status=status.HTTP_200_OK)
+
+
+class CustomerViewSet(CachedResponseMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     permission_classes = [IsOwner]
+    cache_models = [models.Customer]
 
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['name']
@@ -49,12 +104,14 @@ class CustomerViewSet(viewsets.ModelViewSet):
 
     queryset = models.Customer.objects.all()
     serializer_class = serializers.CustomerSerializer
+    values_serializer_class = read_serializers.CustomerValuesSerializer
 
     def get_queryset(self):
         return models.Customer.objects.filter(owner=self.request.user)
 
-class SupplierViewSet(viewsets.ModelViewSet):
+class SupplierViewSet(CachedResponseMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     permission_classes = [IsOwner]
+    cache_models = [models.Supplier]
 
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['name']
@@ -64,40 +121,107 @@ class SupplierViewSet(viewsets.ModelViewSet):
 
     queryset = models.Supplier.objects.all()
     serializer_class = serializers.SupplierSerializer
+    values_serializer_class = read_serializers.SupplierValuesSerializer
 
     def get_queryset(self):
         return models.Supplier.objects.filter(owner=self.request.user)
 
 
-class PurchaseViewSet(viewsets.ModelViewSet):
+class PurchaseViewSet(IdempotentCreateMixin, ConditionalGetMixin, ExportMixin, viewsets.ModelViewSet):
     permission_classes = [IsOwner]
-
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    conditional_related = ['product', 'supplier']
+    export_columns = [
+        ('product', 'product__name'), ('supplier', 'supplier__name'), ('quantity', 'quantity'),
+        ('purchase_date', 'purchase_date'), ('unit_cost_price', 'unit_cost_price'), ('total_price', 'total_price'),
+        ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+    ]
+
+    filter_backends = [DjangoFilterBackend, RelatedSearchFilter, OrderingFilter]
     filterset_fields = ['product', 'supplier', 'purchase_date']
-    search_fields = ['product__name', 'supplier__name', 'purchase_date']
+    search_related = {'product': models.Product, 'supplier': models.Supplier}
+    search_date_field = 'purchase_date'
     ordering_fields = ['created_at', 'updated_at', 'purchase_date', 'price']
     ordering = ['created_at']
 
     queryset = models.Purchase.objects.all()
     serializer_class = serializers.PurchaseSerializer
+    values_serializer_class = read_serializers.PurchaseValuesSerializer
 
     def get_queryset(self):
-        return models.Purchase.objects.filter(owner=self.request.user)
+        return models.Purchase.objects.filter(owner=self.request.user).select_related('product', 'supplier')
 
-class SaleViewSet(viewsets.ModelViewSet):
-    permission_classes = [IsOwner]
+    @swagger_auto_schema(request_body=serializers.PurchaseLineSerializer(many=True))
+    @action(detail=False, methods=['post'], parser_classes=[FastJSONParser, NDJSONParser])
+    def bulk(self, request):
+        return bulk_response(request, ingest_purchases)
 
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ['product', 'customer']
-    search_fields = ['product__name', 'customer__name']
+class SaleViewSet(IdempotentCreateMixin, ConditionalGetMixin, ExportMixin, viewsets.ModelViewSet):
+    permission_classes = [IsOwner]
+    conditional_related = ['product', 'customer']
+    export_columns = [
+        ('product', 'product__name'), ('quantity', 'quantity'), ('sale_date', 'sale_date'),
+        ('customer', 'customer__name'), ('sale_price', 'sale_price'), ('total_price', 'total_price'),
+        ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+    ]
+
+    filter_backends = [DjangoFilterBackend, RelatedSearchFilter, OrderingFilter]
+    filterset_fields = ['product', 'customer', 'order']
+    search_related = {'product': models.Product, 'customer': models.Customer}
     ordering_fields = ['created_at', 'updated_at', 'price']
     ordering = ['created_at']
 
     queryset = models.Sale.objects.all()
     serializer_class = serializers.SaleSerializer
+    values_serializer_class = read_serializers.SaleValuesSerializer
+
+    def get_queryset(self):
+        return models.Sale.objects.filter(owner=self.request.user).select_related('product', 'customer')
+
+    @swagger_auto_schema(request_body=serializers.SaleLineSerializer(many=True))
+    @action(detail=False, methods=['post'], parser_classes=[FastJSONParser, NDJSONParser])
+    def bulk(self, request):
+        return bulk_response(request, ingest_sales)
+
+class OrderViewSet(IdempotentCreateMixin, mixins.CreateModelMixin, mixins.ListModelMixin,
+                   mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    permission_classes = [IsOwner]
+
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_fields = ['customer']
+    ordering_fields = ['created_at', 'order_date']
+    ordering = ['created_at']
+
+    queryset = models.Order.objects.all()
+    serializer_class = serializers.OrderSerializer
 
     def get_queryset(self):
-        return models.Sale.objects.filter(owner=self.request.user)
+        lines = models.Sale.objects.select_related('product').order_by('pk')
+        return (
+            models.Order.objects.filter(owner=self.request.user)
+            .select_related('customer')
+            .prefetch_related(Prefetch('lines', queryset=lines))
+        )
+
+    def perform_create(self, serializer):
+        data = serializer.validated_data
+        lines = [
+            {'product': line['product']['name'], 'quantity': line['quantity'], 'sale_price': line.get('sale_price')}
+            for line in data['lines']
+        ]
+        order, errors = place_order(self.request.user, data['customer'], data['order_date'], lines)
+        if errors:
+            raise ValidationError({'lines': errors})
+        serializer.instance = self.get_queryset().get(pk=order.pk)
+
+class ReportView(APIView):
+
+    @swagger_auto_schema(query_serializer=serializers.ReportQuerySerializer,
+                         responses={200: serializers.ReportRowSerializer(many=True)})
+    def get(self, request):
+        query = serializers.ReportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        rows = reports.summarize(request.user, **query.validated_data)
+        return Response(serializers.ReportRowSerializer(rows, many=True).data)
 
 class RegisterView(CreateAPIView):
     serializer_class = serializers.RegisterSerializer
@@ -1,6 +1,12 @@
+from types import SimpleNamespace
+
 import pytest
 from rest_framework.test import APIClient
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from MiniShopApp.authentication import user_cache
+from MiniShopApp.caching import CACHE_ALIAS
+from MiniShopApp.models import Category, Customer, Product, Supplier
 
 User = get_user_model()
 
@@ -13,4 +19,34 @@ def api_client():
 def create_user(db):
     def make_user(**kwargs):
         return User.objects.create_user(**kwargs)
-    return make_user
\ No newline at end of file
+    return make_user
+
+
+@pytest.fixture
+def make_shop(create_user):
+    """
+    Build user1's shop: an 'Electronics' category, ``products`` as (name,
+    sku, price) rows, 'Test Customer' and 'Test Supplier'. ``stock`` and
+    ``reorder_level`` take one value for every product or a list with one
+    per product.
+    """
+    def make(products=(('Laptop', 'ABC123', 1200),), stock=10, reorder_level=None):
+        user = create_user(username='user1', password='pass')
+        category = Category.objects.create(name='Electronics')
+        stocks = stock if isinstance(stock, (list, tuple)) else [stock] * len(products)
+        levels = reorder_level if isinstance(reorder_level, (list, tuple)) else [reorder_level] * len(products)
+        items = [
+            Product.objects.create(name=name, sku=sku, price=price, quantity_in_stock=quantity, reorder_level=level,
+                                   category=category, owner=user)
+            for (name, sku, price), quantity, level in zip(products, stocks, levels)
+        ]
+        customer = Customer.objects.create(owner=user, name='Test Customer', email='t@t.bg', phone='1', address='X')
+        supplier = Supplier.objects.create(owner=user, name='Test Supplier', contact_email='s@t.bg', phone='1', address='X')
+        return SimpleNamespace(user=user, category=category, products=items, product=items[0], customer=customer,
+                               supplier=supplier)
+    return make
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    caches[CACHE_ALIAS].clear()
+    user_cache.clear()
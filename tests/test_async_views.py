@@ -0,0 +1,175 @@
+import asyncio
+import os
+import time
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.asgi import get_asgi_application
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from MiniShopApp.models import Category, Product
+
+
+@pytest.fixture
+def user(create_user):
+    return create_user(username='user1', password='pass')
+
+
+@pytest.fixture
+def products(user):
+    categories = [Category.objects.create(name=f'Category {i}') for i in range(3)]
+    return [
+        Product.objects.create(name=f'Item {i}', sku=f'SKU{i}', price=i + 0.5, quantity_in_stock=i, category=categories[i % 3], owner=user)
+        for i in range(12)
+    ]
+
+
+@pytest.fixture
+def client(api_client, user):
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    return api_client
+
+
+def strip_links(data):
+    return {key: value for key, value in data.items() if key not in ('next', 'previous')}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('query', ['', '?page=2', '?page=last', '?page_size=10&ordering=-price', '?ordering=bogus'])
+def test_async_product_list_matches_sync(client, products, query):
+    sync = client.get(reverse('product-list') + query)
+    response = client.get(reverse('async-product-list') + query)
+
+    assert response.status_code == 200
+    assert strip_links(response.json()) == strip_links(sync.json())
+    for link in ('next', 'previous'):
+        expected = sync.json()[link]
+        assert response.json()[link] == (expected and expected.replace('/products/', '/async/products/'))
+
+
+@pytest.mark.django_db
+def test_async_category_list_matches_sync(client, products):
+    sync = client.get(reverse('category-list'))
+    response = client.get(reverse('async-category-list'))
+
+    assert response.status_code == 200
+    assert response.content.replace(b'/async', b'') == sync.content
+
+
+@pytest.mark.django_db
+def test_async_product_detail_and_stock_match_sync(client, products):
+    product = products[3]
+    for sync_route, async_route in (('product-detail', 'async-product-detail'), ('product-stock', 'async-product-stock')):
+        sync = client.get(reverse(sync_route, args=[product.pk]))
+        response = client.get(reverse(async_route, args=[product.pk]))
+
+        assert response.status_code == 200
+        assert response.content == sync.content
+    assert response.json() == {'sku': 'SKU3', 'quantity_in_stock': 3, 'updated_at': sync.json()['updated_at']}
+
+
+@pytest.mark.django_db
+def test_async_views_hide_other_owners_products(client, create_user, products):
+    other = create_user(username='user2', password='pass')
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(other)}')
+
+    assert client.get(reverse('async-product-list')).json()['count'] == 0
+    response = client.get(reverse('async-product-detail', args=[products[0].pk]))
+    assert response.status_code == 404
+    assert response.json() == {'detail': 'No Product matches the given query.'}
+
+
+@pytest.mark.django_db
+def test_async_views_require_a_valid_token(api_client, products):
+    response = api_client.get(reverse('async-product-list'))
+    assert response.status_code == 401
+    assert response['WWW-Authenticate'].startswith('Bearer')
+
+    api_client.credentials(HTTP_AUTHORIZATION='Bearer nonsense')
+    response = api_client.get(reverse('async-product-list'))
+    assert response.status_code == 401
+    assert response.json()['code'] == 'token_not_valid'
+
+
+@pytest.mark.django_db
+def test_async_views_are_read_only(client, products):
+    response = client.post(reverse('async-product-list'), {}, format='json')
+
+    assert response.status_code == 405
+
+
+@pytest.mark.django_db
+def test_async_product_list_rejects_invalid_page(client, products):
+    response = client.get(reverse('async-product-list') + '?page=99')
+
+    assert response.status_code == 404
+    assert response.json() == {'detail': 'Invalid page.'}
+
+
+async def asgi_get(app, path, token):
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'testserver'), (b'authorization', f'Bearer {token}'.encode())],
+        'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+    }
+    sent = []
+    messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        # The client stays connected until the handler stops listening.
+        await asyncio.Event().wait()
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return sent[0]['status']
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'responses': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+})
+def test_benchmark_async_vs_sync_under_asgi(user, products):
+    clients = int(os.getenv('BENCH_CLIENTS', '100'))
+    per_client = int(os.getenv('BENCH_REQUESTS', '20'))
+    app = get_asgi_application()
+    token = str(AccessToken.for_user(user))
+    pk = products[0].pk
+
+    async def load(path):
+        async def client():
+            for _ in range(per_client):
+                assert await asgi_get(app, path, token) == 200
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(clients)))
+        return time.perf_counter() - started
+
+    # Like Django's test client, keep the test transaction's connection open.
+    request_started.disconnect(close_old_connections)
+    request_finished.disconnect(close_old_connections)
+    try:
+        print()
+        for sync_path, async_path in (
+            ('/products/', '/async/products/'),
+            (f'/products/{pk}/', f'/async/products/{pk}/'),
+            (f'/products/{pk}/stock/', f'/async/products/{pk}/stock/'),
+            ('/categories/', '/async/categories/'),
+        ):
+            sync = async_to_sync(load)(sync_path)
+            asynchronous = async_to_sync(load)(async_path)
+            total = clients * per_client
+            print(f'{sync_path:<22} sync {total / sync:6.0f} req/s   async {total / asynchronous:6.0f} req/s')
+    finally:
+        request_started.connect(close_old_connections)
+        request_finished.connect(close_old_connections)
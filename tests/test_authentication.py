@@ -0,0 +1,130 @@
+import os
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from MiniShopApp.authentication import StatelessJWTAuthentication, TTLCache, user_cache
+from MiniShopApp.models import Category, Product
+from MiniShopApp.views import ProductViewSet
+
+
+def authenticate(api_client, user):
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+
+
+def user_queries(queries):
+    return [q['sql'] for q in queries if 'auth_user' in q['sql']]
+
+
+@pytest.fixture
+def stateless(monkeypatch):
+    monkeypatch.setattr(ProductViewSet, 'authentication_classes', [StatelessJWTAuthentication])
+
+
+@pytest.fixture
+def product(create_user):
+    user = create_user(username='user1', password='pass')
+    category = Category.objects.create(name='Electronics')
+    return Product.objects.create(name='Laptop', sku='ABC123', price=10, quantity_in_stock=5, category=category, owner=user)
+
+
+@pytest.mark.django_db
+def test_stateless_auth_reads_user_once(api_client, stateless, product):
+    authenticate(api_client, product.owner)
+    url = reverse('product-detail', args=[product.pk])
+    assert api_client.get(url).status_code == 200
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(url)
+
+    assert response.status_code == 200
+    assert response.data['name'] == 'Laptop'
+    assert user_queries(queries) == []
+
+
+@pytest.mark.django_db
+def test_stateless_auth_creates_owned_rows(api_client, stateless, product):
+    authenticate(api_client, product.owner)
+    data = {'name': 'Mouse', 'sku': 'M1', 'price': '5.00', 'quantity_in_stock': 1, 'category': product.category.name}
+
+    response = api_client.post(reverse('product-list'), data, format='json')
+
+    assert response.status_code == 201
+    assert Product.objects.get(sku='M1').owner == product.owner
+
+
+@pytest.mark.django_db
+def test_stateless_auth_rejects_other_owner(api_client, stateless, create_user, product):
+    authenticate(api_client, create_user(username='user2', password='pass'))
+
+    response = api_client.get(reverse('product-detail', args=[product.pk]))
+
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_deactivated_user_is_evicted(api_client, stateless, product):
+    user = product.owner
+    authenticate(api_client, user)
+    assert api_client.get(reverse('product-list')).status_code == 200
+
+    user.is_active = False
+    user.save()
+
+    assert api_client.get(reverse('product-list')).status_code == 401
+
+
+@pytest.mark.django_db
+def test_deleted_user_is_rejected(api_client, stateless, product):
+    user = product.owner
+    authenticate(api_client, user)
+    user.delete()
+
+    assert api_client.get(reverse('product-list')).status_code == 401
+
+
+def test_ttl_cache_expires_and_evicts_oldest():
+    now = [0.0]
+    cache = TTLCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+
+    now[0] = 10
+    assert cache.get('a') is None
+    assert cache.get('c') is None
+    assert len(cache) == 0
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_benchmark_products_requests_per_second(api_client, monkeypatch, create_user):
+    requests = int(os.getenv('BENCH_REQUESTS', '2000'))
+    user = create_user(username='user1', password='pass')
+    category = Category.objects.create(name='Electronics')
+    Product.objects.bulk_create([
+        Product(owner=user, name=f'Item {i}', sku=f'SKU{i}', price=10, quantity_in_stock=0, category=category)
+        for i in range(50)
+    ])
+    authenticate(api_client, user)
+    url = reverse('product-list')
+
+    print()
+    for auth in (JWTAuthentication, StatelessJWTAuthentication):
+        monkeypatch.setattr(ProductViewSet, 'authentication_classes', [auth])
+        user_cache.clear()
+        api_client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for _ in range(requests):
+                assert api_client.get(url).status_code == 200
+            elapsed = time.perf_counter() - started
+        print(f'{auth.__name__}: {requests / elapsed:.0f} req/s, {len(queries) / requests:.2f} queries/request')
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from MiniShopApp import benchmark, journal
+from MiniShopApp.models import DailyTotals, Product, Sale, User
+
+
+def seed_small():
+    return benchmark.seed(owners=2, products=12, customers=5, suppliers=2, years=1, sales_per_day=2,
+                          purchases_per_day=1, random_seed=7)
+
+
+@pytest.mark.django_db
+def test_seed_is_deterministic_and_consistent():
+    counts = seed_small()
+    first = list(Sale.objects.order_by('pk').values_list('product__name', 'quantity', 'sale_date'))
+    benchmark.flush()
+    assert not User.objects.filter(username__startswith=benchmark.OWNER_PREFIX).exists()
+    seed_small()
+
+    assert counts['owners'] == 2 and counts['products'] == 24 and counts['sales'] == Sale.objects.count()
+    assert list(Sale.objects.order_by('pk').values_list('product__name', 'quantity', 'sale_date')) == first
+    assert not journal.reconcile()
+    assert DailyTotals.objects.exists()
+
+
+@pytest.mark.django_db
+def test_seed_command_refuses_to_seed_twice():
+    call_command('seed_benchmark', owners=1, products=3, customers=2, suppliers=1, years=1, sales_per_day=1)
+
+    with pytest.raises(CommandError):
+        call_command('seed_benchmark', owners=1, products=3, customers=2, suppliers=1, years=1, sales_per_day=1)
+    call_command('seed_benchmark', owners=1, products=4, customers=2, suppliers=1, years=1, sales_per_day=1, flush=True)
+    assert Product.objects.count() == 4
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_command_writes_comparable_results(tmp_path):
+    seed_small()
+    output = tmp_path / 'results.json'
+
+    call_command('benchmark', threads=1, requests=40, warmup=2, host='testserver', output=str(output))
+
+    results = json.loads(output.read_text())
+    assert set(results) == {'meta', 'elapsed_seconds', 'endpoints', 'total'}
+    assert results['meta']['workload'] == 'mixed' and results['meta']['owners'] == 2
+    assert results['total']['requests'] == 40
+    assert results['total']['errors'] == 0
+    for stats in results['endpoints'].values():
+        assert stats['p50_ms'] <= stats['p95_ms'] <= stats['p99_ms'] <= stats['max_ms']
+    assert not benchmark.compare(results, results)
+    assert not journal.reconcile()
+
+
+def test_benchmark_command_needs_seeded_owners(db):
+    with pytest.raises(CommandError):
+        call_command('benchmark', requests=1, warmup=0)
+
+
+def test_percentiles_use_the_nearest_rank():
+    ordered = list(range(1, 101))
+
+    assert benchmark.percentile(ordered, 0.50) == 50
+    assert benchmark.percentile(ordered, 0.95) == 95
+    assert benchmark.percentile(ordered, 0.99) == 99
+    assert benchmark.percentile([4], 0.99) == 4
+
+
+def test_compare_flags_slower_endpoints():
+    def results(p95, rps):
+        return {'endpoints': {'catalog-list': {'requests': 10, 'p95_ms': p95, 'throughput_rps': rps},
+                              'report': {'requests': 0, 'errors': 0}}}
+
+    assert benchmark.compare(results(10, 100), results(10.5, 95)) == []
+    assert benchmark.compare(results(10, 100), results(12, 80)) == [
+        ('catalog-list', 'p95_ms', 10, 12), ('catalog-list', 'throughput_rps', 100, 80),
+    ]
@@ -0,0 +1,160 @@
+import json
+import os
+import time
+from datetime import date
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from MiniShopApp.models import Sale, Purchase, Product, User
+
+
+@pytest.fixture
+def shop(make_shop):
+    shop = make_shop(products=(('Laptop', 'ABC123', 1200), ('Mouse', 'MOU123', 20)), stock=[10, 3])
+    return shop.user, *shop.products, shop.customer, shop.supplier
+
+
+def sale_line(product, quantity, customer="Test Customer"):
+    return {"product": product, "customer": customer, "quantity": quantity, "sale_date": date.today().isoformat()}
+
+
+@pytest.mark.django_db
+def test_bulk_sales_aggregate_stock(api_client, shop):
+    user, laptop, mouse, customer, supplier = shop
+    api_client.force_authenticate(user=user)
+
+    lines = [sale_line("Laptop", 2), sale_line("Mouse", 1), sale_line("Laptop", 3)]
+    response = api_client.post(reverse("sale-bulk"), data=lines, format='json')
+
+    assert response.status_code == 201
+    assert response.data == {'created': 3, 'errors': []}
+    laptop.refresh_from_db()
+    mouse.refresh_from_db()
+    assert laptop.quantity_in_stock == 5
+    assert mouse.quantity_in_stock == 2
+    assert Sale.objects.get(quantity=2).total_price == 2400
+
+
+@pytest.mark.django_db
+def test_bulk_sales_atomic_rejects_whole_batch(api_client, shop):
+    user, laptop, mouse, customer, supplier = shop
+    api_client.force_authenticate(user=user)
+
+    lines = [sale_line("Laptop", 2), sale_line("Mouse", 2), sale_line("Mouse", 2), sale_line("Nope", 1)]
+    response = api_client.post(reverse("sale-bulk"), data=lines, format='json')
+
+    assert response.status_code == 400
+    assert [error['line'] for error in response.data['errors']] == [2, 3]
+    assert not Sale.objects.exists()
+    laptop.refresh_from_db()
+    assert laptop.quantity_in_stock == 10
+
+
+@pytest.mark.django_db
+def test_bulk_sales_partial_reports_failed_lines(api_client, shop):
+    user, laptop, mouse, customer, supplier = shop
+    api_client.force_authenticate(user=user)
+
+    lines = [sale_line("Mouse", 2), sale_line("Mouse", 2), {"product": "Laptop"}, sale_line("Laptop", 1, customer="Nobody")]
+    response = api_client.post(reverse("sale-bulk") + '?atomic=false', data=lines, format='json')
+
+    assert response.status_code == 201
+    assert response.data['created'] == 1
+    errors = {error['line']: error['errors'] for error in response.data['errors']}
+    assert set(errors) == {1, 2, 3}
+    assert 'quantity' in errors[1]
+    assert 'customer' in errors[3]
+    mouse.refresh_from_db()
+    assert mouse.quantity_in_stock == 1
+
+
+@pytest.mark.django_db
+def test_bulk_sales_do_not_resolve_other_owners_names(api_client, shop):
+    user, laptop, mouse, customer, supplier = shop
+    other = User.objects.create_user(username="user2", password="pass2")
+    api_client.force_authenticate(user=other)
+
+    response = api_client.post(reverse("sale-bulk"), data=[sale_line("Laptop", 1)], format='json')
+
+    assert response.status_code == 400
+    assert not Sale.objects.exists()
+
+
+@pytest.mark.django_db
+def test_bulk_purchases_accept_ndjson(api_client, shop):
+    user, laptop, mouse, customer, supplier = shop
+    api_client.force_authenticate(user=user)
+
+    lines = [
+        {"product": "Laptop", "supplier": "Test Supplier", "quantity": 5, "purchase_date": date.today().isoformat(), "unit_cost_price": "3.50"},
+        {"product": "Laptop", "supplier": "Test Supplier", "quantity": 1, "purchase_date": date.today().isoformat(), "unit_cost_price": "4.00"},
+    ]
+    body = "\n".join(json.dumps(line) for line in lines) + "\n"
+    response = api_client.post(reverse("purchase-bulk"), data=body, content_type='application/x-ndjson')
+
+    assert response.status_code == 201
+    assert response.data['created'] == 2
+    assert Purchase.objects.get(quantity=5).total_price == 17.50
+    laptop.refresh_from_db()
+    assert laptop.quantity_in_stock == 16
+
+
+@pytest.mark.django_db
+def test_bulk_lines_need_a_positive_quantity(api_client, shop):
+    user, laptop, mouse, customer, supplier = shop
+    api_client.force_authenticate(user=user)
+
+    sales = api_client.post(reverse("sale-bulk"), data=[sale_line("Laptop", 1), sale_line("Mouse", 0)], format='json')
+    purchases = api_client.post(reverse("purchase-bulk"), data=[
+        {"product": "Laptop", "supplier": "Test Supplier", "quantity": 0, "purchase_date": date.today().isoformat(), "unit_cost_price": "3.50"},
+    ], format='json')
+
+    assert sales.status_code == purchases.status_code == 400
+    assert [error['line'] for error in sales.data['errors']] == [1]
+    assert 'quantity' in sales.data['errors'][0]['errors']
+    assert not Sale.objects.exists() and not Purchase.objects.exists()
+
+
+@pytest.mark.django_db
+def test_bulk_rejects_empty_batch(api_client, shop):
+    user, laptop, mouse, customer, supplier = shop
+    api_client.force_authenticate(user=user)
+
+    response = api_client.post(reverse("purchase-bulk"), data=[], format='json')
+
+    assert response.status_code == 400
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_benchmark_bulk_sales(api_client, shop):
+    user, laptop, mouse, customer, supplier = shop
+    lines_count = int(os.getenv('BENCH_LINES', '10000'))
+    category = laptop.category
+    Product.objects.bulk_create([
+        Product(name=f'Item {i}', sku=f'SKU{i}', price=5, quantity_in_stock=lines_count, category=category, owner=user)
+        for i in range(100)
+    ])
+    api_client.force_authenticate(user=user)
+    lines = [sale_line(f'Item {i % 100}', 1) for i in range(lines_count)]
+
+    db_time = 0.0
+
+    def timed(execute, sql, params, many, context):
+        nonlocal db_time
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            db_time += time.perf_counter() - started
+
+    started = time.perf_counter()
+    with connection.execute_wrapper(timed), CaptureQueriesContext(connection) as queries:
+        response = api_client.post(reverse("sale-bulk"), data=lines, format='json')
+    elapsed = time.perf_counter() - started
+
+    assert response.status_code == 201
+    assert response.data['created'] == lines_count
+    print(f"\nbulk sales: {lines_count} lines in {elapsed:.2f}s total, {db_time:.3f}s DB time, {len(queries)} queries")
@@ -0,0 +1,215 @@
+import os
+import time
+from datetime import date, timedelta
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from django.utils.http import http_date
+
+from MiniShopApp.models import Category, Customer, Product, Sale, Supplier, Purchase
+
+
+@pytest.fixture
+def user(create_user):
+    return create_user(username='user1', password='pass')
+
+
+@pytest.fixture
+def shop(user):
+    category = Category.objects.create(name='Electronics')
+    products = [
+        Product.objects.create(name=f'Item {i}', sku=f'SKU{i}', price=10, quantity_in_stock=50, category=category, owner=user)
+        for i in range(3)
+    ]
+    customer = Customer.objects.create(owner=user, name='Customer', email='c@t.bg')
+    supplier = Supplier.objects.create(owner=user, name='Supplier', contact_email='s@t.bg')
+    for product in products:
+        Sale.objects.create(owner=user, product=product, customer=customer, quantity=1, sale_date=date.today())
+        Purchase.objects.create(owner=user, product=product, supplier=supplier, quantity=1, purchase_date=date.today(), unit_cost_price=5)
+    return {'category': category, 'products': products, 'customer': customer, 'supplier': supplier}
+
+
+ROUTES = ['category-list', 'product-list', 'customer-list', 'supplier-list', 'purchase-list', 'sale-list']
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('route', ROUTES)
+def test_list_answers_if_none_match_with_304(api_client, user, shop, route):
+    api_client.force_authenticate(user=user)
+    first = api_client.get(reverse(route))
+    assert first.status_code == 200
+    assert first['ETag'].startswith('"')
+    assert 'Last-Modified' not in first
+
+    response = api_client.get(reverse(route), HTTP_IF_NONE_MATCH=first['ETag'])
+
+    assert response.status_code == 304
+    assert response.content == b''
+    assert response['ETag'] == first['ETag']
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('route', ['product-detail', 'sale-detail', 'customer-detail'])
+def test_detail_answers_if_none_match_with_304(api_client, user, shop, route):
+    api_client.force_authenticate(user=user)
+    model = {'product-detail': Product, 'sale-detail': Sale, 'customer-detail': Customer}[route]
+    url = reverse(route, args=[model.objects.first().pk])
+    etag = api_client.get(url)['ETag']
+
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    assert api_client.get(url, HTTP_IF_NONE_MATCH='"other"').status_code == 200
+
+
+@pytest.mark.django_db
+def test_if_modified_since(api_client, user, shop):
+    api_client.force_authenticate(user=user)
+    url = reverse('customer-detail', args=[shop['customer'].pk])
+    last_modified = api_client.get(url)['Last-Modified']
+
+    assert api_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code == 304
+    earlier = http_date(time.time() - 3600)
+    assert api_client.get(url, HTTP_IF_MODIFIED_SINCE=earlier).status_code == 200
+
+
+@pytest.mark.django_db
+def test_if_modified_since_on_a_list_sees_deletes(api_client, user, shop):
+    api_client.force_authenticate(user=user)
+    Customer.objects.create(owner=user, name='Newest', email='n@t.bg')
+    url = reverse('customer-list') + '?page_size=2&ordering=-updated_at'
+    first = api_client.get(url)
+
+    Customer.objects.get(name='Newest').delete()
+    response = api_client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 3600))
+
+    assert response.status_code == 200
+    assert response.data['count'] == first.data['count'] - 1
+
+
+@pytest.mark.django_db
+def test_update_changes_etag(api_client, user, shop):
+    api_client.force_authenticate(user=user)
+    etag = api_client.get(reverse('product-list'))['ETag']
+
+    product = shop['products'][0]
+    api_client.patch(reverse('product-detail', args=[product.pk]), {'price': '11.00'}, format='json')
+
+    response = api_client.get(reverse('product-list'), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+
+
+@pytest.mark.django_db
+def test_related_rename_changes_etag(api_client, user, shop):
+    api_client.force_authenticate(user=user)
+    etag = api_client.get(reverse('sale-list'))['ETag']
+
+    shop['customer'].name = 'Renamed'
+    shop['customer'].save()
+
+    response = api_client.get(reverse('sale-list'), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.data['results'][0]['customer'] == 'Renamed'
+
+
+@pytest.mark.django_db
+def test_delete_changes_etag(api_client, user, shop):
+    api_client.force_authenticate(user=user)
+    url = reverse('purchase-list') + '?page_size=1'
+    etag = api_client.get(url)['ETag']
+
+    Purchase.objects.filter(owner=user).order_by('-created_at').first().delete()
+
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_etag_depends_on_user_and_query(api_client, user, create_user, shop):
+    api_client.force_authenticate(user=user)
+    etag = api_client.get(reverse('category-list'))['ETag']
+    assert api_client.get(reverse('category-list') + '?page_size=2')['ETag'] != etag
+
+    api_client.force_authenticate(user=create_user(username='user2', password='pass'))
+    assert api_client.get(reverse('category-list'), HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_cursor_pages_are_conditional(api_client, user, shop):
+    api_client.force_authenticate(user=user)
+    url = reverse('sale-list') + '?pagination=cursor&page_size=2'
+    etag = api_client.get(url)['ETag']
+
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+
+@pytest.mark.django_db
+def test_cached_response_revalidates_without_queries(api_client, user, shop, django_assert_num_queries):
+    api_client.force_authenticate(user=user)
+    etag = api_client.get(reverse('product-list'))['ETag']
+
+    with django_assert_num_queries(0):
+        response = api_client.get(reverse('product-list'), HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+
+
+def measure(api_client, url, **headers):
+    db_time = 0.0
+
+    def wrapper(execute, sql, params, many, context):
+        nonlocal db_time
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            db_time += time.perf_counter() - started
+
+    started = time.perf_counter()
+    with connection.execute_wrapper(wrapper):
+        response = api_client.get(url, **headers)
+    return response, len(response.content), db_time * 1000, (time.perf_counter() - started) * 1000
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('route', ROUTES)
+def test_revalidation_saves_bytes(api_client, user, shop, route):
+    api_client.force_authenticate(user=user)
+    url = reverse(route) + '?page_size=100'
+
+    full, full_bytes, _, _ = measure(api_client, url)
+    revalidated, revalidated_bytes, _, _ = measure(api_client, url, HTTP_IF_NONE_MATCH=full['ETag'])
+
+    assert revalidated.status_code == 304
+    assert full_bytes > 0
+    assert revalidated_bytes == 0
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_benchmark_revalidation_savings(api_client, user):
+    rows = int(os.getenv('BENCH_SALES', '20000'))
+    category = Category.objects.create(name='Electronics')
+    products = Product.objects.bulk_create([
+        Product(owner=user, name=f'Item {i}', sku=f'SKU{i}', price=10, quantity_in_stock=0, category=category)
+        for i in range(100)
+    ])
+    customer = Customer.objects.create(owner=user, name='Customer', email='c@t.bg')
+    Sale.objects.bulk_create((
+        Sale(owner=user, product=products[i % 100], customer=customer, quantity=1,
+             sale_date=date.today() - timedelta(days=i % 365), sale_price=10, total_price=10)
+        for i in range(rows)
+    ), batch_size=5000)
+    api_client.force_authenticate(user=user)
+
+    print()
+    for route in ('product-list', 'sale-list'):
+        url = reverse(route) + '?page_size=100'
+        full, full_bytes, cold_db, cold_total = measure(api_client, url)
+        # The second 200 is what a poller without validators pays on a warm server.
+        _, _, warm_db, warm_total = measure(api_client, url)
+        _, revalidated_bytes, revalidated_db, revalidated_total = measure(api_client, url, HTTP_IF_NONE_MATCH=full['ETag'])
+        print(
+            f'{route:<13} 200: {full_bytes} B, {cold_db:.2f} ms DB, {cold_total:.1f} ms (cold); '
+            f'{warm_db:.2f} ms DB, {warm_total:.1f} ms (warm)   '
+            f'304: {revalidated_bytes} B, {revalidated_db:.2f} ms DB, {revalidated_total:.1f} ms'
+        )
@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+import os
+import tracemalloc
+from datetime import date
+
+import pytest
+from django.urls import reverse
+from MiniShopApp.models import Sale, User
+
+
+@pytest.fixture
+def shop(make_shop):
+    shop = make_shop(products=(('Laptop', 'ABC123', 1200), ('Mouse', 'MOU123', '19.99')), stock=100, reorder_level=[5, 20])
+    return shop.user, *shop.products, shop.customer
+
+
+def read_csv(response):
+    body = b''.join(response.streaming_content).decode()
+    return list(csv.DictReader(io.StringIO(body)))
+
+
+@pytest.mark.django_db
+def test_product_export_matches_list_representation(api_client, shop):
+    user, laptop, mouse, customer = shop
+    api_client.force_authenticate(user=user)
+
+    listed = api_client.get(reverse('product-list')).data['results']
+    response = api_client.get(reverse('product-export'))
+
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'text/csv'
+    assert read_csv(response) == [{key: str(value) for key, value in row.items()} for row in listed]
+
+
+@pytest.mark.django_db
+def test_sale_export_honours_filters_and_ordering(api_client, shop):
+    user, laptop, mouse, customer = shop
+    for product, quantity in [(laptop, 1), (mouse, 5), (laptop, 3)]:
+        Sale.objects.create(owner=user, product=product, customer=customer, quantity=quantity, sale_date=date.today(), sale_price=10)
+    Sale.objects.create(owner=User.objects.create(username="user2"), product=laptop, customer=customer,
+                        quantity=9, sale_date=date.today(), sale_price=10)
+    api_client.force_authenticate(user=user)
+
+    response = api_client.get(reverse('sale-export') + f'?product={laptop.pk}&ordering=-created_at&output=ndjson')
+    rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+
+    assert response['Content-Type'] == 'application/x-ndjson'
+    assert [(row['product'], row['quantity'], row['total_price']) for row in rows] == [('Laptop', 3, '30.00'), ('Laptop', 1, '10.00')]
+    listed = api_client.get(reverse('sale-list') + f'?product={laptop.pk}&ordering=-created_at').data['results']
+    assert rows == [dict(row) for row in listed]
+
+
+@pytest.mark.django_db
+def test_export_rejects_unknown_output(api_client, shop):
+    user, laptop, mouse, customer = shop
+    api_client.force_authenticate(user=user)
+
+    assert api_client.get(reverse('purchase-export') + '?output=xml').status_code == 400
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_benchmark_export_memory_stays_flat(api_client, shop):
+    user, laptop, mouse, customer = shop
+    api_client.force_authenticate(user=user)
+    rows = int(os.getenv('BENCH_SALES', '100000'))
+
+    peaks = []
+    created = 0
+    for target in (rows // 10, rows):
+        Sale.objects.bulk_create((
+            Sale(owner=user, product=laptop, customer=customer, quantity=1, sale_date=date.today(), sale_price=10, total_price=10)
+            for _ in range(target - created)
+        ), batch_size=5000)
+        created = target
+
+        tracemalloc.start()
+        response = api_client.get(reverse('sale-export'))
+        lines = sum(chunk.count(b'\n') for chunk in response.streaming_content)
+        peaks.append(tracemalloc.get_traced_memory()[1] / 1024 / 1024)
+        tracemalloc.stop()
+        assert lines == target + 1
+
+    print(f"\nexport peak memory: {rows // 10} rows {peaks[0]:.1f} MiB, {rows} rows {peaks[1]:.1f} MiB")
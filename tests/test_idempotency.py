@@ -0,0 +1,198 @@
+import random
+import time
+from datetime import date, timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from MiniShopApp import idempotency
+from MiniShopApp.models import IdempotencyKey, Purchase, Sale, Product, Customer, User, Category
+from tests.test_stock import run_parallel
+
+
+@pytest.fixture
+def shop(make_shop):
+    shop = make_shop(stock=10)
+    return shop.user, shop.product, shop.customer, shop.supplier
+
+
+def sale_payload(product, customer, quantity=2):
+    return {'product': product.name, 'customer': customer.name, 'quantity': quantity,
+            'sale_date': date.today().isoformat(), 'sale_price': '1000.00'}
+
+
+def purchase_payload(product, supplier, quantity=2):
+    return {'product': product.name, 'supplier': supplier.name, 'quantity': quantity,
+            'purchase_date': date.today().isoformat(), 'unit_cost_price': '800.00'}
+
+
+def make_other_shop():
+    other = User.objects.create_user(username='user2', password='pass')
+    product = Product.objects.create(name='Phone', sku='P1', price=10, quantity_in_stock=10,
+                                     category=Category.objects.first(), owner=other)
+    customer = Customer.objects.create(owner=other, name='Other Customer', email='o@t.bg')
+    return other, product, customer
+
+
+@pytest.mark.django_db
+def test_sale_retry_replays_the_first_response(api_client, shop):
+    user, product, customer, _ = shop
+    api_client.force_authenticate(user=user)
+    url = reverse('sale-list')
+
+    first = api_client.post(url, sale_payload(product, customer), format='json', HTTP_IDEMPOTENCY_KEY='order-1')
+    with CaptureQueriesContext(connection) as queries:
+        retry = api_client.post(url, sale_payload(product, customer), format='json', HTTP_IDEMPOTENCY_KEY='order-1')
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.content == first.content
+    assert retry['Idempotent-Replayed'] == 'true'
+    assert 'Idempotent-Replayed' not in first
+    assert Sale.objects.count() == 1
+    product.refresh_from_db()
+    assert product.quantity_in_stock == 8
+    assert not any('MiniShopApp_product' in query['sql'] for query in queries.captured_queries)
+
+
+@pytest.mark.django_db
+def test_purchase_retry_replays_the_first_response(api_client, shop):
+    user, product, _, supplier = shop
+    api_client.force_authenticate(user=user)
+    url = reverse('purchase-list')
+
+    first = api_client.post(url, purchase_payload(product, supplier), format='json', HTTP_IDEMPOTENCY_KEY='po-1')
+    retry = api_client.post(url, purchase_payload(product, supplier), format='json', HTTP_IDEMPOTENCY_KEY='po-1')
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.content == first.content
+    assert Purchase.objects.count() == 1
+    product.refresh_from_db()
+    assert product.quantity_in_stock == 12
+
+
+@pytest.mark.django_db
+def test_a_key_reused_for_another_request_is_refused(api_client, shop):
+    user, product, customer, _ = shop
+    api_client.force_authenticate(user=user)
+    url = reverse('sale-list')
+
+    api_client.post(url, sale_payload(product, customer, quantity=2), format='json', HTTP_IDEMPOTENCY_KEY='order-1')
+    response = api_client.post(url, sale_payload(product, customer, quantity=3), format='json', HTTP_IDEMPOTENCY_KEY='order-1')
+
+    assert response.status_code == 422
+    assert Sale.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_failed_requests_store_nothing(api_client, shop):
+    user, product, customer, _ = shop
+    api_client.force_authenticate(user=user)
+    url = reverse('sale-list')
+
+    failed = api_client.post(url, sale_payload(product, customer, quantity=50), format='json', HTTP_IDEMPOTENCY_KEY='order-1')
+    Product.objects.filter(pk=product.pk).update(quantity_in_stock=100)
+    retried = api_client.post(url, sale_payload(product, customer, quantity=50), format='json', HTTP_IDEMPOTENCY_KEY='order-1')
+
+    assert failed.status_code == 409
+    assert retried.status_code == 201
+    assert 'Idempotent-Replayed' not in retried
+    assert Sale.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_keys_are_scoped_to_owner_and_route(api_client, shop):
+    user, product, customer, supplier = shop
+    other, other_product, other_customer = make_other_shop()
+    url = reverse('sale-list')
+
+    api_client.force_authenticate(user=user)
+    api_client.post(url, sale_payload(product, customer), format='json', HTTP_IDEMPOTENCY_KEY='shared')
+    purchased = api_client.post(reverse('purchase-list'), purchase_payload(product, supplier), format='json',
+                                HTTP_IDEMPOTENCY_KEY='shared')
+    api_client.force_authenticate(user=other)
+    sold = api_client.post(url, sale_payload(other_product, other_customer), format='json', HTTP_IDEMPOTENCY_KEY='shared')
+
+    assert purchased.status_code == sold.status_code == 201
+    assert 'Idempotent-Replayed' not in purchased and 'Idempotent-Replayed' not in sold
+    assert Sale.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_overlong_keys_are_rejected(api_client, shop):
+    user, product, customer, _ = shop
+    api_client.force_authenticate(user=user)
+
+    response = api_client.post(reverse('sale-list'), sale_payload(product, customer), format='json',
+                               HTTP_IDEMPOTENCY_KEY='k' * 256)
+
+    assert response.status_code == 400
+    assert Sale.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_expired_keys_are_swept_in_one_statement(api_client, shop, settings):
+    user, product, customer, _ = shop
+    api_client.force_authenticate(user=user)
+    url = reverse('sale-list')
+    for key in ['a', 'b', 'c']:
+        api_client.post(url, sale_payload(product, customer, quantity=1), format='json', HTTP_IDEMPOTENCY_KEY=key)
+    IdempotencyKey.objects.exclude(key='c').update(expires_at=timezone.now() - timedelta(seconds=1))
+
+    with CaptureQueriesContext(connection) as queries:
+        assert idempotency.sweep_expired() == 2
+
+    assert len(queries) == 1
+    assert queries[0]['sql'].startswith('DELETE')
+    assert list(IdempotencyKey.objects.values_list('key', flat=True)) == ['c']
+    call_command('expire_idempotency_keys')
+
+
+@pytest.mark.django_db
+def test_an_expired_key_runs_the_request_again(api_client, shop):
+    user, product, customer, _ = shop
+    api_client.force_authenticate(user=user)
+    url = reverse('sale-list')
+
+    api_client.post(url, sale_payload(product, customer), format='json', HTTP_IDEMPOTENCY_KEY='order-1')
+    IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+    again = api_client.post(url, sale_payload(product, customer), format='json', HTTP_IDEMPOTENCY_KEY='order-1')
+
+    assert again.status_code == 201
+    assert 'Idempotent-Replayed' not in again
+    assert Sale.objects.count() == 2
+    assert IdempotencyKey.objects.count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_duplicates_create_one_sale(shop):
+    user, product, customer, _ = shop
+    responses = []
+
+    def submit():
+        # The test client re-raises errors from any thread's request, so they
+        # are left as 500s here; SQLite locks a table on write and a request
+        # that found it busy is sent again.
+        client = APIClient(raise_request_exception=False)
+        client.force_authenticate(user=user)
+        while True:
+            response = client.post(reverse('sale-list'), sale_payload(product, customer), format='json',
+                                   HTTP_IDEMPOTENCY_KEY='pos-retry')
+            if response.status_code != 500 or connection.vendor != 'sqlite':
+                break
+            time.sleep(random.uniform(0, 0.01))
+        responses.append(response)
+
+    elapsed, errors = run_parallel(20, submit)
+
+    assert not errors
+    assert len(responses) == 20
+    assert {response.status_code for response in responses} == {201}
+    assert len({response.content for response in responses}) == 1
+    assert sum('Idempotent-Replayed' in response for response in responses) == 19
+    assert Sale.objects.count() == 1
+    product.refresh_from_db()
+    assert product.quantity_in_stock == 8
@@ -0,0 +1,173 @@
+import io
+import os
+import time
+import uuid
+from datetime import date, datetime, time as clock, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+import pytest
+from django.core.cache import caches
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from MiniShopApp.caching import CACHE_ALIAS
+from MiniShopApp.models import Sale, User
+from MiniShopApp.parsers import FastJSONParser
+from MiniShopApp.read_serializers import SaleValuesSerializer
+from MiniShopApp.renderers import FastJSONRenderer
+from tests.test_read_serializers import seed
+
+PAYLOADS = [
+    {'id': 1, 'name': 'Item', 'price': '10.50', 'reorder_level': None, 'active': True},
+    [{'product': 'Phone', 'quantity': 2, 'total_price': '20.00', 'sale_date': '2025-07-01'}] * 3,
+    {'text': 'tab\tnew\nline\x00\x1f "quoted" \\ back', 'unicode': 'Кирилица ✓ 😀', 'separators': 'a b c'},
+    {'created_at': datetime(2025, 7, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc)},
+    {'created_at': datetime(2025, 7, 1, 12, 30, tzinfo=dt_timezone(timedelta(hours=3)))},
+    {'naive': datetime(2025, 7, 1, 12, 30), 'day': date(2025, 7, 1), 'at': clock(9, 15)},
+    {'prices': [Decimal('10.50'), Decimal('0.01'), Decimal('-3'), Decimal('123456789.99')]},
+    {'price': Decimal('1E+20')},
+    {'price': Decimal('0.00001')},
+    {'price': Decimal('0.0001')},
+    {'floats': [0.1, 1.5, -2.25, 3.0, 123456789.123, 1e15, 0.0001]},
+    {'float': 1e16},
+    {'float': 1.661666020301178e-05},
+    {'sku': 'A1e5', 'note': 'rate 0.00001'},
+    {'ints': [0, -1, 2 ** 63 - 1, 2 ** 64, -2 ** 70]},
+    {'lazy': gettext_lazy('Not found.'), 'uuid': uuid.UUID(int=7), 'span': timedelta(minutes=90)},
+    {'nested': {'tuple': (1, 2), 'set': {3}, 'empty': {}, 'list': []}},
+    {1: 'one', 'two': 2},
+    {},
+    [],
+    'plain string',
+    3,
+]
+
+
+@pytest.mark.parametrize('data', PAYLOADS)
+def test_renderer_output_matches_drf(data):
+    assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+@pytest.mark.parametrize('media_type, context', [
+    ('application/json; indent=4', {}),
+    (None, {'indent': 2}),
+])
+def test_indented_output_matches_drf(media_type, context):
+    data = {'price': Decimal('1.50'), 'items': [1, 2]}
+
+    assert FastJSONRenderer().render(data, media_type, context) == JSONRenderer().render(data, media_type, context)
+
+
+def test_nothing_renders_as_empty_body():
+    assert FastJSONRenderer().render(None) == b''
+
+
+@pytest.mark.parametrize('data', PAYLOADS)
+def test_renderer_without_orjson_matches_drf(monkeypatch, data):
+    monkeypatch.setattr(FastJSONRenderer, 'fast', False)
+
+    assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+@pytest.mark.parametrize('fast', [True, False])
+@pytest.mark.parametrize('data', [
+    {'price': Decimal('NaN')},
+    {'rows': [{'a': None}, {'price': Decimal('-Infinity')}]},
+    {'price': Decimal('1E+400')},
+])
+def test_non_finite_decimals_are_refused_like_drf(monkeypatch, data, fast):
+    monkeypatch.setattr(FastJSONRenderer, 'fast', fast)
+
+    with pytest.raises(ValueError, match='Out of range float values are not JSON compliant'):
+        JSONRenderer().render(data)
+    with pytest.raises(ValueError, match='Out of range float values are not JSON compliant'):
+        FastJSONRenderer().render(data)
+
+
+@pytest.mark.parametrize('body', [
+    b'{"product": 1, "quantity": 2, "sale_price": "10.50"}',
+    b'[{"a": 1.5}, {"b": null, "c": true}, "\\u00e9\\u2028"]',
+    '{"name": "Кирилица ✓"}'.encode(),
+    b'{"big": 123456789012345678901234567890, "small": -99999999999999999999}',
+    b'{"float": 1e400}',
+    b'  [1, 2, 3]\n',
+])
+def test_parser_output_matches_drf(body):
+    assert FastJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(io.BytesIO(body))
+
+
+@pytest.mark.parametrize('body', [b'{"a": ', b'{"a": NaN}', b'[1, 2,]', b'\xef\xbb\xbf{}', b''])
+def test_parser_errors_match_drf(body):
+    with pytest.raises(ParseError) as expected:
+        JSONParser().parse(io.BytesIO(body))
+    with pytest.raises(ParseError) as raised:
+        FastJSONParser().parse(io.BytesIO(body))
+
+    assert str(raised.value) == str(expected.value)
+
+
+def test_parser_honours_other_encodings():
+    body = '{"name": "Кирилица"}'.encode('cp1251')
+
+    assert FastJSONParser().parse(io.BytesIO(body), parser_context={'encoding': 'cp1251'}) == {'name': 'Кирилица'}
+
+
+@pytest.mark.django_db
+def test_sale_pages_render_as_before(api_client, monkeypatch):
+    user = User.objects.create(username='user1')
+    seed(user, 30)
+    api_client.force_authenticate(user=user)
+    url = reverse('sale-list') + '?page_size=30'
+
+    fast = api_client.get(url)
+    caches[CACHE_ALIAS].clear()
+    monkeypatch.setattr(FastJSONRenderer, 'fast', False)
+    slow = api_client.get(url)
+
+    assert fast.status_code == slow.status_code == 200
+    assert fast['Content-Type'] == slow['Content-Type'] == 'application/json'
+    assert fast.content == slow.content
+    assert fast['ETag'] == slow['ETag']
+
+
+def rate(run, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    return 1 / best
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+@pytest.mark.parametrize('page_size', [100, 1000])
+def test_benchmark_sale_pages(page_size):
+    rows = int(os.getenv('BENCH_ROWS', '5000'))
+    user = User.objects.create(username='user1')
+    seed(user, rows)
+    sales = Sale.objects.select_related('product', 'customer').order_by('-created_at')[:page_size]
+    page = {
+        'count': rows,
+        'next': 'http://testserver/sales/?page=2',
+        'previous': None,
+        'results': SaleValuesSerializer.serialize(sales.values(*SaleValuesSerializer.lookups)),
+    }
+    # Exports and non-values() code paths hand the renderer model values as they are.
+    raw = [dict(row) for row in Sale.objects.values()[:page_size]]
+    drf, fast = JSONRenderer(), FastJSONRenderer()
+
+    for name, data in [('page', page), ('raw rows', raw)]:
+        assert fast.render(data) == drf.render(data)
+        before = rate(lambda: drf.render(data))
+        after = rate(lambda: fast.render(data))
+        print(f'\n/sales/ {name} of {page_size}: {before:,.0f} -> {after:,.0f} renders/s ({after / before:.1f}x)')
+        assert after > before
+
+    body = drf.render(page)
+    before = rate(lambda: JSONParser().parse(io.BytesIO(body)))
+    after = rate(lambda: FastJSONParser().parse(io.BytesIO(body)))
+    print(f'/sales/ page of {page_size} parsed: {before:,.0f} -> {after:,.0f} parses/s ({after / before:.1f}x)')
+    assert after > before
@@ -0,0 +1,173 @@
+import io
+from datetime import date
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from MiniShopApp import stock
+from MiniShopApp.catalog import import_products
+from MiniShopApp.models import Sale, Purchase, Product, User
+
+
+@pytest.fixture
+def shop(make_shop):
+    shop = make_shop(stock=10, reorder_level=5)
+    return shop.user, shop.category, shop.product, shop.customer, shop.supplier
+
+
+@pytest.fixture
+def alerts():
+    received = []
+
+    def receiver(sender, product_ids, **kwargs):
+        received.append(product_ids)
+
+    stock.low_stock.connect(receiver)
+    yield received
+    stock.low_stock.disconnect(receiver)
+
+
+def sell(user, product, customer, quantity):
+    return Sale.objects.create(owner=user, product=product, customer=customer, quantity=quantity, sale_date=date.today(), sale_price=10)
+
+
+@pytest.mark.django_db
+def test_sale_crossing_the_reorder_level_flags_the_product_once(shop, alerts, django_capture_on_commit_callbacks):
+    user, category, product, customer, supplier = shop
+
+    with django_capture_on_commit_callbacks(execute=True):
+        sell(user, product, customer, 4)
+    product.refresh_from_db()
+    assert product.low_stock_since is None
+    assert alerts == []
+
+    with django_capture_on_commit_callbacks(execute=True):
+        sell(user, product, customer, 1)
+    product.refresh_from_db()
+    flagged = product.low_stock_since
+    assert flagged is not None
+    assert alerts == [[product.pk]]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        sell(user, product, customer, 2)
+    product.refresh_from_db()
+    assert product.low_stock_since == flagged
+    assert alerts == [[product.pk]]
+
+
+@pytest.mark.django_db
+def test_purchase_above_the_reorder_level_clears_the_flag(shop):
+    user, category, product, customer, supplier = shop
+    sell(user, product, customer, 6)
+
+    Purchase.objects.create(owner=user, product=product, supplier=supplier, quantity=1, purchase_date=date.today(), unit_cost_price=5)
+    product.refresh_from_db()
+    assert product.low_stock_since is not None
+
+    Purchase.objects.create(owner=user, product=product, supplier=supplier, quantity=1, purchase_date=date.today(), unit_cost_price=5)
+    product.refresh_from_db()
+    assert product.quantity_in_stock == 6
+    assert product.low_stock_since is None
+
+
+@pytest.mark.django_db
+def test_untracked_products_are_never_flagged(shop):
+    user, category, product, customer, supplier = shop
+    other = Product.objects.create(name='Mouse', sku='MOU123', price=20, quantity_in_stock=1, category=category, owner=user)
+
+    sell(user, other, customer, 1)
+
+    other.refresh_from_db()
+    assert other.low_stock_since is None
+
+
+@pytest.mark.django_db
+def test_batch_stock_update_flags_and_clears_crossings(shop, alerts, django_capture_on_commit_callbacks):
+    user, category, product, customer, supplier = shop
+    restocked = Product.objects.create(name='Mouse', sku='MOU123', price=20, quantity_in_stock=1, reorder_level=3, category=category, owner=user)
+    assert restocked.low_stock_since is not None
+
+    with django_capture_on_commit_callbacks(execute=True):
+        stock.apply_stock_deltas({product.pk: -7, restocked.pk: 5})
+
+    assert alerts == [[product.pk]]
+    assert Product.objects.get(pk=product.pk).low_stock_since is not None
+    assert Product.objects.get(pk=restocked.pk).low_stock_since is None
+
+
+@pytest.mark.django_db
+def test_changing_the_reorder_level_through_the_api_updates_the_flag(api_client, shop):
+    user, category, product, customer, supplier = shop
+    api_client.force_authenticate(user=user)
+
+    response = api_client.patch(reverse('product-detail', args=[product.pk]), {'reorder_level': 10}, format='json')
+    assert response.status_code == 200
+    assert response.data['reorder_level'] == 10
+    product.refresh_from_db()
+    assert product.low_stock_since is not None
+
+    api_client.patch(reverse('product-detail', args=[product.pk]), {'reorder_level': None}, format='json')
+    product.refresh_from_db()
+    assert product.low_stock_since is None
+
+
+@pytest.mark.django_db
+def test_import_refreshes_low_stock_flags(shop):
+    user, category, product, customer, supplier = shop
+
+    import_products(user, io.StringIO('name,sku,price,quantity_in_stock,category\nLaptop,ABC123,1200,2,Electronics\n'))
+
+    product.refresh_from_db()
+    assert product.quantity_in_stock == 2
+    assert product.low_stock_since is not None
+
+
+@pytest.mark.django_db
+def test_low_stock_endpoint_lists_the_owners_flagged_products_in_one_query(api_client, shop, django_assert_num_queries):
+    user, category, product, customer, supplier = shop
+    other = User.objects.create(username="user2")
+    Product.objects.create(name='Foreign', sku='FOR123', price=20, quantity_in_stock=0, reorder_level=3, category=category, owner=other)
+    Product.objects.create(name='Plenty', sku='PLE123', price=20, quantity_in_stock=50, reorder_level=3, category=category, owner=user)
+    mouse = Product.objects.create(name='Mouse', sku='MOU123', price=20, quantity_in_stock=1, reorder_level=3, category=category, owner=user)
+    sell(user, product, customer, 8)
+    api_client.force_authenticate(user=user)
+
+    with django_assert_num_queries(1):
+        response = api_client.get(reverse('product-low-stock'))
+
+    assert response.status_code == 200
+    assert [row['sku'] for row in response.data] == ['MOU123', 'ABC123']
+    assert response.data[0] == {
+        'id': mouse.pk, 'name': 'Mouse', 'sku': 'MOU123', 'quantity_in_stock': 1, 'reorder_level': 3,
+        'low_stock_since': response.data[0]['low_stock_since'],
+    }
+    assert response.data[1]['quantity_in_stock'] == 2
+
+
+@pytest.mark.django_db
+def test_low_stock_query_uses_the_partial_index(api_client, shop):
+    user, category, product, customer, supplier = shop
+    Product.objects.bulk_create([
+        Product(owner=user, name=f'Item {i}', sku=f'SKU-{i}', price=10, quantity_in_stock=100, reorder_level=5, category=category)
+        for i in range(200)
+    ])
+    sell(user, product, customer, 8)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    api_client.force_authenticate(user=user)
+
+    with CaptureQueriesContext(connection) as queries:
+        api_client.get(reverse('product-low-stock'))
+    [query] = queries.captured_queries
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('EXPLAIN ' + query['sql'])
+        else:
+            cursor.execute('EXPLAIN QUERY PLAN ' + query['sql'])
+        plan = '\n'.join(str(row[-1]) for row in cursor.fetchall())
+    assert 'product_low_stock_idx' in plan, plan
+    assert 'TEMP B-TREE' not in plan
+    assert 'Sort' not in plan
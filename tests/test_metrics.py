@@ -0,0 +1,123 @@
+import logging
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from MiniShopApp import metrics
+from MiniShopApp.models import Product
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    metrics.registry.clear()
+
+
+@pytest.fixture
+def shop(make_shop):
+    return make_shop(products=[(f'Item {i}', f'SKU{i}', 10) for i in range(3)], stock=5).user
+
+
+@pytest.mark.django_db
+def test_requests_are_recorded_per_route_and_method(api_client, shop):
+    api_client.force_authenticate(user=shop)
+
+    with CaptureQueriesContext(connection) as queries:
+        assert api_client.get(reverse('product-list')).status_code == 200
+    api_client.get(reverse('product-list') + '?page=2')
+    api_client.post(reverse('product-list'), {}, format='json')
+
+    listed = metrics.registry.get('product-list', 'GET')
+    assert listed.count == 2
+    assert listed.queries >= len(queries)
+    assert listed.sql_seconds > 0
+    assert listed.serialization_seconds > 0
+    assert sum(listed.buckets) == 2
+    assert metrics.registry.get('product-list', 'POST').count == 1
+
+
+@pytest.mark.django_db
+def test_async_routes_count_their_queries(api_client, shop):
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(shop)}')
+
+    assert api_client.get(reverse('async-product-list')).status_code == 200
+
+    recorded = metrics.registry.get('async-product-list', 'GET')
+    assert recorded.count == 1
+    assert recorded.queries >= 2
+    assert recorded.serialization_seconds > 0
+
+
+@pytest.mark.django_db
+def test_unresolved_paths_share_one_label(api_client, shop):
+    api_client.get('/no/such/page/')
+    api_client.get('/nor/this/')
+
+    assert metrics.registry.get(metrics.UNMATCHED, 'GET').count == 2
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_serves_prometheus_text(api_client, shop, settings):
+    settings.METRICS_PUBLIC = True
+    api_client.force_authenticate(user=shop)
+    api_client.get(reverse('product-detail', args=[Product.objects.first().pk]))
+
+    response = api_client.get('/metrics')
+
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    body = response.content.decode()
+    labels = 'route="product-detail",method="GET"'
+    assert '# TYPE minishop_request_duration_seconds histogram' in body
+    assert f'minishop_request_duration_seconds_bucket{{{labels},le="+Inf"}} 1' in body
+    assert f'minishop_request_duration_seconds_count{{{labels}}} 1' in body
+    assert f'minishop_db_queries_total{{{labels}}} ' in body
+    assert f'minishop_serialization_seconds_total{{{labels}}} ' in body
+
+
+@pytest.mark.django_db
+def test_metrics_are_closed_by_default(api_client, settings):
+    settings.METRICS_TOKEN, settings.METRICS_ALLOWED_IPS, settings.METRICS_PUBLIC = '', [], False
+
+    assert api_client.get('/metrics').status_code == 403
+    assert api_client.get('/metrics', HTTP_AUTHORIZATION='Bearer ').status_code == 403
+
+    settings.METRICS_PUBLIC = True
+    assert api_client.get('/metrics').status_code == 200
+
+
+@pytest.mark.django_db
+def test_metrics_token_is_required_when_set(api_client, settings):
+    settings.METRICS_TOKEN = 'secret'
+
+    assert api_client.get('/metrics').status_code == 403
+    assert api_client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code == 403
+    assert api_client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret').status_code == 200
+
+
+@pytest.mark.django_db
+def test_metrics_allow_listed_sources(api_client, settings):
+    settings.METRICS_ALLOWED_IPS = ['10.0.0.0/8', '192.168.1.7']
+
+    assert api_client.get('/metrics', REMOTE_ADDR='10.1.2.3').status_code == 200
+    assert api_client.get('/metrics', REMOTE_ADDR='192.168.1.7').status_code == 200
+    assert api_client.get('/metrics', REMOTE_ADDR='192.168.1.8').status_code == 403
+    assert api_client.get('/metrics', REMOTE_ADDR='127.0.0.1').status_code == 403
+
+
+@pytest.mark.django_db
+def test_slow_requests_are_logged_with_their_sql(api_client, shop, settings, caplog):
+    api_client.force_authenticate(user=shop)
+
+    settings.SLOW_REQUEST_SECONDS = 60
+    with caplog.at_level(logging.WARNING, logger='MiniShopApp.metrics'):
+        api_client.get(reverse('product-list'))
+    assert not caplog.records
+
+    settings.SLOW_REQUEST_SECONDS = 1e-9
+    with caplog.at_level(logging.WARNING, logger='MiniShopApp.metrics'):
+        api_client.get(reverse('product-list') + '?ordering=name')
+    [record] = caplog.records
+    assert 'Slow request: GET /products/?ordering=name (product-list)' in record.getMessage()
+    assert 'FROM "MiniShopApp_product"' in record.getMessage()
@@ -0,0 +1,168 @@
+import random
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from MiniShopApp.bulk import place_order
+from MiniShopApp.models import DailyTotals, Order, Sale, Product, StockMovement
+from tests.test_stock import run_parallel
+
+
+@pytest.fixture
+def shop(make_shop):
+    shop = make_shop(products=[(f'Item {i}', f'SKU{i}', 10 + i) for i in range(40)], stock=100)
+    return shop.user, shop.products, shop.customer
+
+
+def basket(products, customer, quantity=1, **line):
+    return {
+        'customer': customer.name,
+        'order_date': date.today().isoformat(),
+        'lines': [{'product': product.name, 'quantity': quantity, **line} for product in products],
+    }
+
+
+@pytest.mark.django_db
+def test_checkout_creates_the_order_and_its_lines(api_client, shop):
+    user, products, customer = shop
+    api_client.force_authenticate(user=user)
+    payload = basket(products[:3], customer, quantity=2)
+    payload['lines'][1]['sale_price'] = '5.00'
+
+    response = api_client.post(reverse('order-list'), payload, format='json')
+
+    assert response.status_code == 201
+    data = response.json()
+    assert data['customer'] == 'Test Customer'
+    assert [(line['product'], line['quantity'], line['sale_price'], line['total_price']) for line in data['lines']] == [
+        ('Item 0', 2, '10.00', '20.00'),
+        ('Item 1', 2, '5.00', '10.00'),
+        ('Item 2', 2, '12.00', '24.00'),
+    ]
+    assert data['total_price'] == '54.00'
+    order = Order.objects.get()
+    assert order.lines.count() == 3
+    assert set(Product.objects.filter(pk__in=[p.pk for p in products[:3]]).values_list('quantity_in_stock', flat=True)) == {98}
+
+
+@pytest.mark.django_db
+def test_checkout_cost_does_not_grow_with_the_basket(api_client, shop):
+    user, products, customer = shop
+    api_client.force_authenticate(user=user)
+
+    with CaptureQueriesContext(connection) as small:
+        api_client.post(reverse('order-list'), basket(products[:3], customer), format='json')
+    with CaptureQueriesContext(connection) as large:
+        api_client.post(reverse('order-list'), basket(products[3:33], customer), format='json')
+
+    # The daily report rollup is kept per product and day (with a savepoint
+    # around each first insert), as for bulk ingestion.
+    def checkout(queries):
+        return [
+            query['sql'] for query in queries.captured_queries
+            if 'MiniShopApp_dailytotals' not in query['sql'] and 'SAVEPOINT' not in query['sql']
+        ]
+
+    assert len(checkout(large)) == len(checkout(small))
+    assert sum(sql.startswith('UPDATE "MiniShopApp_product"') for sql in checkout(large)) == 1
+    assert sum(sql.startswith('INSERT INTO "MiniShopApp_sale"') for sql in checkout(large)) == 1
+
+
+@pytest.mark.django_db
+def test_repeated_products_are_checked_together(api_client, shop):
+    user, products, customer = shop
+    Product.objects.filter(pk=products[0].pk).update(quantity_in_stock=5)
+    api_client.force_authenticate(user=user)
+    payload = basket([products[0], products[1], products[0]], customer, quantity=3)
+
+    response = api_client.post(reverse('order-list'), payload, format='json')
+
+    assert response.status_code == 400
+    assert response.json() == {'lines': [{}, {}, {'quantity': ['Not enough stock to complete the sale.']}]}
+    assert not Order.objects.exists() and not Sale.objects.exists()
+    assert Product.objects.get(pk=products[0].pk).quantity_in_stock == 5
+    assert Product.objects.get(pk=products[1].pk).quantity_in_stock == 100
+
+
+@pytest.mark.django_db
+def test_unknown_products_reject_the_basket(api_client, shop):
+    user, products, customer = shop
+    api_client.force_authenticate(user=user)
+    payload = basket(products[:2], customer)
+    payload['lines'].append({'product': 'Missing', 'quantity': 1})
+
+    response = api_client.post(reverse('order-list'), payload, format='json')
+
+    assert response.status_code == 400
+    assert response.json() == {'lines': [{}, {}, {'product': ['Object with name=Missing does not exist.']}]}
+    assert not Order.objects.exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('payload', [
+    {'customer': 'Test Customer', 'order_date': '2025-07-01', 'lines': []},
+    {'customer': 'Test Customer', 'order_date': '2025-07-01', 'lines': [{'product': 'Item 0', 'quantity': 0}]},
+    {'customer': 'Nobody', 'order_date': '2025-07-01', 'lines': [{'product': 'Item 0', 'quantity': 1}]},
+])
+def test_invalid_baskets_are_rejected(api_client, shop, payload):
+    user, _, _ = shop
+    api_client.force_authenticate(user=user)
+
+    assert api_client.post(reverse('order-list'), payload, format='json').status_code == 400
+    assert not Order.objects.exists()
+
+
+@pytest.mark.django_db
+def test_lines_are_journaled_reported_and_listed_as_sales(api_client, shop):
+    user, products, customer = shop
+    api_client.force_authenticate(user=user)
+    order_id = api_client.post(reverse('order-list'), basket(products[:2], customer, quantity=4), format='json').json()['id']
+    lines = list(Sale.objects.filter(order_id=order_id).order_by('pk'))
+
+    movements = StockMovement.objects.filter(kind=StockMovement.SALE).order_by('pk')
+    assert [(m.product_id, m.delta, m.reference) for m in movements] == [(s.product_id, -4, s.pk) for s in lines]
+    totals = DailyTotals.objects.get(owner=user, product=products[1], day=date.today())
+    assert (totals.sale_quantity, totals.sale_total) == (4, Decimal('44.00'))
+
+    listed = api_client.get(reverse('sale-list') + f'?order={order_id}&page_size=10').json()
+    assert [sale['product'] for sale in listed['results']] == ['Item 0', 'Item 1']
+    assert api_client.get(reverse('sale-detail', args=[lines[0].pk])).status_code == 200
+
+
+@pytest.mark.django_db
+def test_orders_are_listed_per_owner(api_client, shop, create_user):
+    user, products, customer = shop
+    api_client.force_authenticate(user=user)
+    api_client.post(reverse('order-list'), basket(products[:2], customer), format='json')
+
+    with CaptureQueriesContext(connection) as queries:
+        listed = api_client.get(reverse('order-list')).json()
+    detail = api_client.get(reverse('order-detail', args=[listed['results'][0]['id']]))
+    api_client.force_authenticate(user=create_user(username='user2', password='pass'))
+
+    assert listed['count'] == 1
+    assert len(listed['results'][0]['lines']) == 2
+    assert len(queries) <= 4
+    assert detail.status_code == 200
+    assert api_client.get(reverse('order-list')).json()['count'] == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_overlapping_baskets_keep_stock_exact(shop):
+    user, products, customer = shop
+    forward, backward = products[:10], products[9::-1]
+
+    def checkout():
+        lines = random.choice([forward, backward])
+        order, errors = place_order(user, customer, date.today(), [{'product': p.name, 'quantity': 1} for p in lines])
+        assert order is not None and not errors
+
+    elapsed, errors = run_parallel(8, checkout)
+
+    assert not errors
+    assert Order.objects.count() == 8
+    assert Sale.objects.count() == 80
+    assert set(Product.objects.filter(pk__in=[p.pk for p in forward]).values_list('quantity_in_stock', flat=True)) == {92}
@@ -0,0 +1,176 @@
+import json
+import os
+import time
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from urllib.parse import parse_qs, urlsplit
+from datetime import date
+
+import pytest
+from django.conf import settings
+from django.db import connection
+from django.urls import reverse
+from rest_framework.utils.urls import replace_query_param
+from MiniShopApp.models import Sale, Product, Customer, Category
+from MiniShopApp.pagination import KeysetPagination
+
+
+def make_customers(user, count):
+    return Customer.objects.bulk_create([
+        Customer(owner=user, name=f"Customer {i}", email=f"c{i}@t.bg") for i in range(count)
+    ])
+
+
+def walk(api_client, url, key='email'):
+    seen = []
+    while url:
+        response = api_client.get(url)
+        assert response.status_code == 200
+        assert 'count' not in response.data
+        seen.extend(row[key] for row in response.data['results'])
+        url = response.data['next']
+    return seen
+
+
+@pytest.mark.django_db
+def test_page_number_is_still_the_default(api_client, create_user):
+    user = create_user(username='user1', password='pass')
+    api_client.force_authenticate(user=user)
+    make_customers(user, 7)
+
+    response = api_client.get(reverse('customer-list'))
+
+    assert response.data['count'] == 7
+    assert len(response.data['results']) == 5
+
+
+@pytest.mark.django_db
+def test_cursor_walk_visits_every_row_once_with_ties(api_client, create_user):
+    user = create_user(username='user1', password='pass')
+    api_client.force_authenticate(user=user)
+    category = Category.objects.create(name='Electronics')
+    products = Product.objects.bulk_create([
+        Product(owner=user, name=f"Item {i}", sku=f"SKU{i}", price=i % 2, quantity_in_stock=0, category=category)
+        for i in range(12)
+    ])
+
+    seen = walk(api_client, reverse('product-list') + '?pagination=cursor&ordering=-price&page_size=5', 'sku')
+
+    assert sorted(seen) == sorted(product.sku for product in products)
+    assert len(seen) == len(set(seen))
+
+
+@pytest.mark.django_db
+def test_cursor_previous_link_returns_the_earlier_page(api_client, create_user):
+    user = create_user(username='user1', password='pass')
+    api_client.force_authenticate(user=user)
+    make_customers(user, 9)
+
+    first = api_client.get(reverse('customer-list') + '?pagination=cursor&page_size=4')
+    second = api_client.get(first.data['next'])
+    back = api_client.get(second.data['previous'])
+
+    assert first.data['previous'] is None
+    assert [row['email'] for row in back.data['results']] == [row['email'] for row in first.data['results']]
+    assert back.data['next'] is not None
+
+
+@pytest.mark.django_db
+def test_page_size_is_capped(api_client, create_user):
+    user = create_user(username='user1', password='pass')
+    api_client.force_authenticate(user=user)
+    make_customers(user, settings.MAX_PAGE_SIZE + 5)
+
+    response = api_client.get(reverse('customer-list') + '?pagination=cursor&page_size=100000')
+
+    assert len(response.data['results']) == settings.MAX_PAGE_SIZE
+
+
+@pytest.mark.django_db
+def test_invalid_cursor_is_not_found(api_client, create_user):
+    user = create_user(username='user1', password='pass')
+    api_client.force_authenticate(user=user)
+
+    response = api_client.get(reverse('customer-list') + '?cursor=garbage')
+
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_cursor_from_other_ordering_is_rejected(api_client, create_user):
+    user = create_user(username='user1', password='pass')
+    api_client.force_authenticate(user=user)
+    make_customers(user, 6)
+
+    first = api_client.get(reverse('customer-list') + '?pagination=cursor&ordering=name')
+    response = api_client.get(first.data['next'].replace('ordering=name', 'ordering=created_at'))
+
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('position', [
+    lambda p: [[p[0]], p[1]],
+    lambda p: [p[0], {'id': p[1]}],
+    lambda p: [p[0], 'not a number'],
+    lambda p: [None, p[1]],
+    lambda p: [True, p[1]],
+])
+def test_cursor_with_wrong_position_types_is_not_found(api_client, create_user, position):
+    user = create_user(username='user1', password='pass')
+    api_client.force_authenticate(user=user)
+    make_customers(user, 6)
+    url = api_client.get(reverse('customer-list') + '?pagination=cursor&page_size=2').data['next']
+    tokens = json.loads(urlsafe_b64decode(parse_qs(urlsplit(url).query)['cursor'][0]))
+    tokens['p'] = position(tokens['p'])
+    cursor = urlsafe_b64encode(json.dumps(tokens).encode()).decode()
+
+    response = api_client.get(replace_query_param(url, 'cursor', cursor))
+
+    assert response.status_code == 404
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_benchmark_deep_pages(api_client, create_user):
+    rows = int(os.getenv('BENCH_SALES', '200000'))
+    user = create_user(username='user1', password='pass')
+    category = Category.objects.create(name='Electronics')
+    product = Product.objects.create(name='Laptop', sku='ABC123', price=10, quantity_in_stock=0, category=category, owner=user)
+    customer = Customer.objects.create(owner=user, name='Test Customer', email='t@t.bg')
+    Sale.objects.bulk_create((
+        Sale(owner=user, product=product, customer=customer, quantity=1, sale_date=date.today(), sale_price=10, total_price=10)
+        for _ in range(rows)
+    ), batch_size=5000)
+    api_client.force_authenticate(user=user)
+    page_size = settings.MAX_PAGE_SIZE
+    url = reverse('sale-list')
+
+    def timed(path):
+        db_time = 0.0
+
+        def wrapper(execute, sql, params, many, context):
+            nonlocal db_time
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                db_time += time.perf_counter() - started
+
+        with connection.execute_wrapper(wrapper):
+            response = api_client.get(path)
+        assert response.status_code == 200
+        return db_time * 1000
+
+    print()
+    for depth in (0.0, 0.5, 0.99):
+        offset = int((rows - page_size) * depth)
+        page = offset // page_size + 1
+        pivot = Sale.objects.filter(owner=user).order_by('created_at', 'pk')[offset]
+
+        paginator = KeysetPagination()
+        paginator.ordering = ['created_at', 'pk']
+        paginator.base_url = f'{url}?page_size={page_size}'
+        cursor_url = paginator.encode_cursor(paginator.get_position(pivot))
+
+        print(f"depth {depth:>4.0%}: page number {timed(f'{url}?page_size={page_size}&page={page}'):7.1f} ms DB, "
+              f"cursor {timed(cursor_url):7.1f} ms DB")
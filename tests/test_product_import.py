@@ -0,0 +1,136 @@
+import io
+import os
+import time
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from MiniShopApp import catalog
+from MiniShopApp.models import Product, User, Category
+
+HEADER = "name,sku,price,quantity_in_stock,category\n"
+
+
+def upload(api_client, body):
+    file = SimpleUploadedFile('products.csv', (HEADER + body).encode(), content_type='text/csv')
+    return api_client.post(reverse('product-import'), data={'file': file}, format='multipart')
+
+
+@pytest.mark.django_db
+def test_import_creates_products_and_categories(api_client):
+    user = User.objects.create(username="user1")
+    Category.objects.create(name='Electronics')
+    api_client.force_authenticate(user=user)
+
+    response = upload(api_client, "Laptop,ABC123,1200.00,3,Electronics\nDesk,DSK1,99.50,1,Furniture\n")
+
+    assert response.status_code == 200
+    assert response.data == {'created': 2, 'updated': 0, 'errors': []}
+    assert Product.objects.get(sku='DSK1').category.name == 'Furniture'
+    assert Category.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_import_upserts_by_sku_and_reports_bad_rows(api_client):
+    user = User.objects.create(username="user1")
+    other = User.objects.create(username="user2")
+    category = Category.objects.create(name='Electronics')
+    laptop = Product.objects.create(name='Laptop', sku='ABC123', price=1200, quantity_in_stock=3, category=category, owner=user)
+    Product.objects.create(name='Theirs', sku='THEIRS', price=1, quantity_in_stock=1, category=category, owner=other)
+    api_client.force_authenticate(user=user)
+
+    response = upload(api_client, "\n".join([
+        "Laptop Pro,ABC123,1500.00,4,Electronics",
+        "Broken,BRK1,abc,1,Electronics",
+        "Stolen,THEIRS,1.00,1,Electronics",
+        "Mouse,MOU1,20.00,5,Electronics",
+        "Mouse again,MOU1,20.00,5,Electronics",
+    ]) + "\n")
+
+    assert response.data['created'] == 1
+    assert response.data['updated'] == 1
+    assert {error['line']: list(error['errors']) for error in response.data['errors']} == {3: ['price'], 4: ['sku'], 6: ['sku']}
+    laptop.refresh_from_db()
+    assert (laptop.name, laptop.price, laptop.quantity_in_stock) == ('Laptop Pro', 1500, 4)
+    assert Product.objects.get(sku='THEIRS').owner == other
+
+
+def race(monkeypatch, write):
+    """Run ``write`` once between the import's checks and its upsert, as a concurrent import would."""
+    resolve = catalog._resolve_categories
+    calls = []
+
+    def resolve_then_race(names, categories):
+        resolve(names, categories)
+        if not calls:
+            write()
+        calls.append(names)
+
+    monkeypatch.setattr(catalog, '_resolve_categories', resolve_then_race)
+    return calls
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('competitor', [
+    {'owner': 'user2', 'name': 'Theirs', 'sku': 'RACE1'},
+    {'owner': 'user1', 'name': 'Racer', 'sku': 'OTHER1'},
+])
+def test_import_does_not_overwrite_rows_written_meanwhile(api_client, monkeypatch, competitor):
+    user = User.objects.create(username="user1")
+    other = User.objects.create(username="user2")
+    category = Category.objects.create(name='Electronics')
+    api_client.force_authenticate(user=user)
+    owner = {'user1': user, 'user2': other}[competitor['owner']]
+    calls = race(monkeypatch, lambda: Product.objects.create(
+        name=competitor['name'], sku=competitor['sku'], price=1, quantity_in_stock=1, category=category, owner=owner,
+    ))
+
+    response = upload(api_client, "Racer,RACE1,10.00,2,Electronics\n")
+
+    # The first attempt is rolled back together with the simulated write;
+    # the second one checks the rows again and goes through.
+    assert response.status_code == 200
+    assert response.data == {'created': 1, 'updated': 0, 'errors': []}
+    assert len(calls) == 2
+    product = Product.objects.get(sku='RACE1')
+    assert (product.owner, product.name, product.quantity_in_stock) == (user, 'Racer', 2)
+
+
+@pytest.mark.django_db
+def test_import_requires_a_file(api_client):
+    api_client.force_authenticate(user=User.objects.create(username="user1"))
+
+    response = api_client.post(reverse('product-import'), data={}, format='multipart')
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_import_command(tmp_path):
+    User.objects.create(username="user1")
+    path = tmp_path / 'products.csv'
+    path.write_text(HEADER + "".join(f"Item {i},SKU{i},1.00,1,Cat {i % 3}\n" for i in range(25)))
+    out = io.StringIO()
+
+    call_command('import_products', str(path), owner='user1', chunk_size=10, stdout=out)
+
+    assert Product.objects.count() == 25
+    assert Category.objects.count() == 3
+    assert 'Created 25' in out.getvalue()
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_benchmark_import_throughput(api_client):
+    rows = int(os.getenv('BENCH_PRODUCTS', '50000'))
+    user = User.objects.create(username="user1")
+    api_client.force_authenticate(user=user)
+    body = "".join(f"Item {i},SKU{i},{i % 100}.99,{i % 7},Category {i % 50}\n" for i in range(rows))
+
+    started = time.perf_counter()
+    response = upload(api_client, body)
+    elapsed = time.perf_counter() - started
+
+    assert response.data['created'] == rows
+    print(f"\nimported {rows} products in {elapsed:.1f}s ({rows / elapsed * 60:,.0f} rows/minute)")
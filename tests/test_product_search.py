@@ -0,0 +1,208 @@
+import os
+import time
+from datetime import date
+
+import pytest
+from django.urls import reverse
+
+from MiniShopApp import caching, search
+from MiniShopApp.models import Category, Customer, Product, Purchase, Sale, Supplier
+
+
+@pytest.fixture(autouse=True)
+def fresh_index():
+    search.invalidate()
+
+
+@pytest.fixture
+def user(create_user):
+    return create_user(username='user1', password='pass')
+
+
+@pytest.fixture
+def catalog(user):
+    laptops = Category.objects.create(name='Laptops')
+    audio = Category.objects.create(name='Audio Gear')
+    rows = [
+        ('Laptop Pro 15', 'LP-15', laptops),
+        ('Laptop Air', 'LA-13', laptops),
+        ('Laptop Bag', 'BAG-1', audio),
+        ('Headphones', 'HP-200', audio),
+        ('Lapel Microphone', 'MIC-9', audio),
+    ]
+    return {
+        name: Product.objects.create(name=name, sku=sku, price=10, quantity_in_stock=1, category=category, owner=user)
+        for name, sku, category in rows
+    }
+
+
+def names(response):
+    assert response.status_code == 200
+    return [row['name'] for row in response.data['results']]
+
+
+@pytest.mark.django_db
+def test_search_matches_word_prefixes(api_client, user, catalog):
+    api_client.force_authenticate(user=user)
+
+    assert set(names(api_client.get(reverse('product-list'), {'search': 'lap'}))) == {
+        'Laptop Pro 15', 'Laptop Air', 'Laptop Bag', 'Lapel Microphone',
+    }
+    assert names(api_client.get(reverse('product-list'), {'search': 'micro'})) == ['Lapel Microphone']
+    assert names(api_client.get(reverse('product-list'), {'search': 'ptop'})) == []
+
+
+@pytest.mark.django_db
+def test_search_requires_every_term_across_fields(api_client, user, catalog):
+    api_client.force_authenticate(user=user)
+
+    assert names(api_client.get(reverse('product-list'), {'search': 'laptop audio'})) == ['Laptop Bag']
+    assert names(api_client.get(reverse('product-list'), {'search': 'hp 200'})) == ['Headphones']
+
+
+@pytest.mark.django_db
+def test_search_ranks_name_and_exact_matches_first(api_client, user, catalog):
+    api_client.force_authenticate(user=user)
+
+    ranked = names(api_client.get(reverse('product-list'), {'search': 'laptops', 'page_size': 10}))
+    assert ranked == ['Laptop Pro 15', 'Laptop Air']
+
+    ranked = names(api_client.get(reverse('product-list'), {'search': 'air laptop', 'page_size': 10}))
+    assert ranked == ['Laptop Air']
+
+    ranked = names(api_client.get(reverse('product-list'), {'search': 'laptop', 'page_size': 10}))
+    assert ranked[:3] == ['Laptop Pro 15', 'Laptop Air', 'Laptop Bag']
+
+
+@pytest.mark.django_db
+def test_explicit_ordering_overrides_rank(api_client, user, catalog):
+    api_client.force_authenticate(user=user)
+
+    response = api_client.get(reverse('product-list'), {'search': 'laptop', 'ordering': 'name'})
+
+    assert names(response) == ['Laptop Air', 'Laptop Bag', 'Laptop Pro 15']
+
+
+@pytest.mark.django_db
+def test_search_is_scoped_to_owner(api_client, create_user, catalog):
+    other = create_user(username='user2', password='pass')
+    api_client.force_authenticate(user=other)
+
+    assert names(api_client.get(reverse('product-list'), {'search': 'laptop'})) == []
+
+
+@pytest.mark.django_db
+def test_index_follows_product_changes(api_client, user, catalog):
+    api_client.force_authenticate(user=user)
+    assert names(api_client.get(reverse('product-list'), {'search': 'tablet'})) == []
+
+    product = catalog['Laptop Air']
+    response = api_client.patch(reverse('product-detail', args=[product.pk]), {'name': 'Tablet Air'}, format='json')
+    assert response.status_code == 200
+    assert names(api_client.get(reverse('product-list'), {'search': 'tablet'})) == ['Tablet Air']
+
+    api_client.delete(reverse('product-detail', args=[product.pk]))
+    assert names(api_client.get(reverse('product-list'), {'search': 'tablet'})) == []
+
+
+@pytest.mark.django_db
+def test_index_follows_writes_made_by_other_processes(api_client, user, catalog):
+    api_client.force_authenticate(user=user)
+    assert names(api_client.get(reverse('product-list'), {'search': 'tablet'})) == []
+
+    # Another process renames the product: its receivers bump the shared
+    # version counters, and nothing runs in this one.
+    Product.objects.filter(pk=catalog['Laptop Air'].pk).update(name='Tablet Air')
+    caching.invalidate(Product, user.pk)
+
+    assert names(api_client.get(reverse('product-list'), {'search': 'tablet'})) == ['Tablet Air']
+
+
+@pytest.mark.django_db
+def test_indexes_are_bounded(api_client, create_user, user, catalog, monkeypatch):
+    monkeypatch.setattr(search, 'MAX_INDEXES', 2)
+    others = [create_user(username=f'other{i}', password='pass') for i in range(3)]
+    for owner in [user, *others]:
+        search.get_index(owner.pk)
+
+    assert list(search._indexes) == [(Product._meta.label_lower, owner.pk) for owner in others[1:]]
+
+    monkeypatch.setattr(search, 'MAX_INDEXED_ROWS', 2)
+    api_client.force_authenticate(user=user)
+    assert set(names(api_client.get(reverse('product-list'), {'search': 'laptop audio'}))) == {'Laptop Bag'}
+    assert search.get_index(user.pk) is None
+
+
+@pytest.fixture
+def ledger(user, catalog):
+    alice = Customer.objects.create(owner=user, name='Alice Brown', email='a@t.bg')
+    bob = Customer.objects.create(owner=user, name='Bob Stone', email='b@t.bg')
+    acme = Supplier.objects.create(owner=user, name='Acme Parts', contact_email='acme@t.bg')
+    globex = Supplier.objects.create(owner=user, name='Globex', contact_email='globex@t.bg')
+    laptop, headphones = catalog['Laptop Air'], catalog['Headphones']
+    for product, customer in [(laptop, alice), (headphones, bob)]:
+        Sale.objects.create(owner=user, product=product, customer=customer, quantity=1, sale_date=date(2025, 7, 1), sale_price=10)
+    for product, supplier, day in [(laptop, acme, date(2025, 7, 14)), (headphones, globex, date(2025, 8, 2))]:
+        Purchase.objects.create(owner=user, product=product, supplier=supplier, quantity=1, purchase_date=day, unit_cost_price=5)
+
+
+@pytest.mark.django_db
+def test_sales_and_purchases_search_related_names(api_client, user, ledger):
+    api_client.force_authenticate(user=user)
+
+    def found(name, query):
+        response = api_client.get(reverse(f'{name}-list'), {'search': query})
+        assert response.status_code == 200
+        return sorted((row['product'], row.get('customer') or row.get('supplier')) for row in response.data['results'])
+
+    assert found('sale', 'ali') == [('Laptop Air', 'Alice Brown')]
+    assert found('sale', 'head') == [('Headphones', 'Bob Stone')]
+    assert found('sale', 'stone headphones') == [('Headphones', 'Bob Stone')]
+    assert found('sale', 'stone laptop') == []
+    assert found('sale', 'rown') == []
+    assert found('purchase', 'acme') == [('Laptop Air', 'Acme Parts')]
+    assert found('purchase', 'glob') == [('Headphones', 'Globex')]
+    assert found('purchase', '2025-07') == [('Laptop Air', 'Acme Parts')]
+    assert found('purchase', '2025-08-02') == [('Headphones', 'Globex')]
+    assert len(found('purchase', '2025')) == 2
+    assert found('purchase', '2025-07 glob') == []
+
+
+@pytest.mark.django_db
+def test_blank_search_lists_everything(api_client, user, catalog):
+    api_client.force_authenticate(user=user)
+
+    response = api_client.get(reverse('product-list'), {'search': ' -- ', 'page_size': 10})
+
+    assert len(names(response)) == len(catalog)
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_benchmark_search_latency(api_client, user):
+    rows = int(os.getenv('BENCH_PRODUCTS', '100000'))
+    adjectives = ['Compact', 'Wireless', 'Premium', 'Rugged', 'Smart', 'Classic', 'Portable', 'Ultra']
+    nouns = ['Laptop', 'Speaker', 'Monitor', 'Keyboard', 'Camera', 'Router', 'Charger', 'Headset']
+    categories = Category.objects.bulk_create([Category(name=f'Category {i}') for i in range(50)])
+    Product.objects.bulk_create((
+        Product(
+            owner=user, name=f'{adjectives[i % 8]} {nouns[i // 8 % 8]} {i}', sku=f'SKU{i:07d}',
+            price=10, quantity_in_stock=1, category=categories[i % 50],
+        )
+        for i in range(rows)
+    ), batch_size=5000)
+    api_client.force_authenticate(user=user)
+
+    started = time.perf_counter()
+    search.get_index(user.pk)
+    print(f'\nindex build over {rows} products: {(time.perf_counter() - started) * 1000:.0f} ms')
+    for query in ('wireless cam', 'sku00012', 'portable router 77', 'zzz'):
+        timings = []
+        for run in range(20):
+            # A fresh URL skips the response cache but keeps the index.
+            started = time.perf_counter()
+            response = api_client.get(reverse('product-list'), {'search': query, 'run': run})
+            timings.append(time.perf_counter() - started)
+            assert response.status_code == 200
+        timings.sort()
+        print(f'{query!r:<22} {response.data["count"]:>6} hits  p50 {timings[10] * 1000:.1f} ms')
@@ -0,0 +1,73 @@
+from datetime import date
+
+import pytest
+from django.urls import reverse
+from MiniShopApp.models import Sale, Purchase, Product, Customer, Supplier, User, Category
+
+
+def seed(user, rows):
+    categories = Category.objects.bulk_create([Category(name=f'Category {i}') for i in range(rows)])
+    products = Product.objects.bulk_create([
+        Product(owner=user, name=f'Item {i}', sku=f'SKU{i}', price=10, quantity_in_stock=0, category=categories[i])
+        for i in range(rows)
+    ])
+    customers = Customer.objects.bulk_create([Customer(owner=user, name=f'Customer {i}', email='c@t.bg') for i in range(rows)])
+    suppliers = Supplier.objects.bulk_create([Supplier(owner=user, name=f'Supplier {i}', contact_email='s@t.bg') for i in range(rows)])
+    Sale.objects.bulk_create([
+        Sale(owner=user, product=products[i], customer=customers[i], quantity=1, sale_date=date.today(), sale_price=10, total_price=10)
+        for i in range(rows)
+    ])
+    Purchase.objects.bulk_create([
+        Purchase(owner=user, product=products[i], supplier=suppliers[i], quantity=1, purchase_date=date.today(), unit_cost_price=10, total_price=10)
+        for i in range(rows)
+    ])
+
+
+# Each list runs COUNT(*) plus one SELECT, whatever the page size.
+LIST_QUERIES = {
+    'category-list': 2,
+    'product-list': 2,
+    'customer-list': 2,
+    'supplier-list': 2,
+    'purchase-list': 2,
+    'sale-list': 2,
+}
+
+# One SELECT for the row; IsOwner compares owner_id without a query.
+DETAIL_QUERIES = {
+    'product-detail': (Product, 1),
+    'customer-detail': (Customer, 1),
+    'supplier-detail': (Supplier, 1),
+    'purchase-detail': (Purchase, 1),
+    'sale-detail': (Sale, 1),
+}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('rows', [1, 20])
+@pytest.mark.parametrize('route', sorted(LIST_QUERIES))
+def test_list_query_count_does_not_grow_with_page(api_client, django_assert_num_queries, route, rows):
+    user = User.objects.create(username='user1')
+    seed(user, rows)
+    api_client.force_authenticate(user=user)
+
+    with django_assert_num_queries(LIST_QUERIES[route]):
+        response = api_client.get(reverse(route) + '?page_size=20')
+
+    assert response.status_code == 200
+    assert len(response.data['results']) == rows
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('route', sorted(DETAIL_QUERIES))
+def test_retrieve_query_count(api_client, django_assert_num_queries, route):
+    user = User.objects.create(username='user1')
+    seed(user, 1)
+    api_client.force_authenticate(user=user)
+    model, expected = DETAIL_QUERIES[route]
+    url = reverse(route, args=[model.objects.get().pk])
+
+    with django_assert_num_queries(expected):
+        response = api_client.get(url)
+
+    assert response.status_code == 200
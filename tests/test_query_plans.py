@@ -0,0 +1,108 @@
+from datetime import date, timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from MiniShopApp.models import Sale, Purchase, Product, Customer, Supplier, User, Category
+
+ROWS = 50
+
+
+def unique_name_index(model):
+    # SQLite builds the (owner, name) constraint as an automatic index.
+    return (f'{model}_owner_name_uniq', f'sqlite_autoindex_MiniShopApp_{model}_')
+
+
+# (route, query string, index the list query must use, index also gives the order).
+# The category filter joins the category row for select_related, and SQLite
+# then sorts the few matching products instead of walking the index in order.
+SHAPES = [
+    ('product-list', '', 'product_owner_created_idx', True),
+    ('product-list', '?name=Item 7', unique_name_index('product'), False),
+    ('product-list', '?category={category}', 'product_owner_category_idx', False),
+    ('customer-list', '', 'customer_owner_created_idx', True),
+    ('customer-list', '?name=Customer 7', unique_name_index('customer'), False),
+    ('supplier-list', '', 'supplier_owner_created_idx', True),
+    ('supplier-list', '?name=Supplier 7', unique_name_index('supplier'), False),
+    ('purchase-list', '', 'purchase_owner_created_idx', True),
+    ('purchase-list', '?product={product}', 'purchase_owner_product_idx', True),
+    ('purchase-list', '?supplier={supplier}', 'purchase_owner_supplier_idx', True),
+    ('purchase-list', '?purchase_date={day}', 'purchase_owner_date_idx', True),
+    ('sale-list', '', 'sale_owner_created_idx', True),
+    ('sale-list', '?product={product}', 'sale_owner_product_idx', True),
+    ('sale-list', '?customer={customer}', 'sale_owner_customer_idx', True),
+]
+
+
+def seed(user, categories):
+    products = Product.objects.bulk_create([
+        Product(owner=user, name=f'Item {i}', sku=f'{user.pk}-{i}', price=10, quantity_in_stock=0, category=categories[i % len(categories)])
+        for i in range(ROWS)
+    ])
+    customers = Customer.objects.bulk_create([
+        Customer(owner=user, name=f'Customer {i}', email=f'c{i}@t.bg') for i in range(ROWS)
+    ])
+    suppliers = Supplier.objects.bulk_create([
+        Supplier(owner=user, name=f'Supplier {i}', contact_email=f's{i}@t.bg') for i in range(ROWS)
+    ])
+    Sale.objects.bulk_create([
+        Sale(owner=user, product=products[i % ROWS], customer=customers[i % ROWS], quantity=1,
+             sale_date=date.today(), sale_price=10, total_price=10)
+        for i in range(ROWS * 5)
+    ])
+    Purchase.objects.bulk_create([
+        Purchase(owner=user, product=products[i % ROWS], supplier=suppliers[i % ROWS], quantity=1,
+                 purchase_date=date.today() - timedelta(days=i % 365), unit_cost_price=10, total_price=10)
+        for i in range(ROWS * 5)
+    ])
+    return products[7], customers[7], suppliers[7]
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('EXPLAIN ' + sql)
+        else:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+        return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+
+
+@pytest.fixture
+def seeded(db):
+    categories = Category.objects.bulk_create([Category(name=f'Category {i}') for i in range(ROWS)])
+    users = [User.objects.create(username=f'user{i}') for i in range(2)]
+    for user in users[1:]:
+        seed(user, categories)
+    product, customer, supplier = seed(users[0], categories)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return users[0], {
+        'category': categories[7].pk,
+        'product': product.pk,
+        'customer': customer.pk,
+        'supplier': supplier.pk,
+        'day': date.today().isoformat(),
+    }
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('route, query, index, ordered', SHAPES)
+def test_list_endpoints_use_owner_scoped_indexes(api_client, seeded, route, query, index, ordered):
+    user, values = seeded
+    api_client.force_authenticate(user=user)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(reverse(route) + query.format(**values))
+    assert response.status_code == 200
+
+    table = f'"MiniShopApp_{route.split("-")[0]}"'
+    [sql] = [q['sql'] for q in queries if q['sql'].startswith('SELECT') and table in q['sql'] and 'ORDER BY' in q['sql']]
+    plan = explain(sql)
+
+    indexes = index if isinstance(index, tuple) else (index,)
+    assert any(name in plan for name in indexes), plan
+    if ordered:
+        assert 'TEMP B-TREE' not in plan
+        assert 'Sort' not in plan
@@ -0,0 +1,156 @@
+import os
+import time
+from datetime import date, timedelta
+
+import pytest
+from django.core.cache import caches
+from django.urls import reverse
+from django.utils import timezone
+from MiniShopApp import serializers, views
+from MiniShopApp.caching import CACHE_ALIAS
+from MiniShopApp.models import Sale, Purchase, Product, Customer, Supplier, User, Category
+from MiniShopApp.read_serializers import (
+    CustomerValuesSerializer, ProductValuesSerializer, PurchaseValuesSerializer, SaleValuesSerializer,
+    SupplierValuesSerializer,
+)
+
+VIEWSETS = {
+    'product': views.ProductViewSet,
+    'customer': views.CustomerViewSet,
+    'supplier': views.SupplierViewSet,
+    'purchase': views.PurchaseViewSet,
+    'sale': views.SaleViewSet,
+}
+
+QUERIES = [
+    ('product', ''),
+    ('product', '?ordering=-price&page_size=20'),
+    ('product', '?search=item'),
+    ('product', '?pagination=cursor&ordering=name'),
+    ('customer', '?page_size=20'),
+    ('supplier', '?ordering=-name'),
+    ('purchase', '?page_size=50'),
+    ('purchase', '?pagination=cursor&ordering=-purchase_date'),
+    ('sale', '?page_size=50'),
+    ('sale', '?product={product}&ordering=-updated_at'),
+    ('sale', '?pagination=cursor'),
+]
+
+
+def seed(user, rows):
+    category = Category.objects.create(name='Electronics')
+    products = Product.objects.bulk_create([
+        Product(owner=user, name=f'Item {i}', sku=f'SKU{i}', price=f'{i}.{i % 10}0', quantity_in_stock=1000,
+                reorder_level=i if i % 2 else None, category=category)
+        for i in range(20)
+    ])
+    customers = Customer.objects.bulk_create([
+        Customer(owner=user, name=f'Customer {i}', email=f'c{i}@t.bg', phone=str(i) if i % 3 else None)
+        for i in range(20)
+    ])
+    suppliers = Supplier.objects.bulk_create([
+        Supplier(owner=user, name=f'Supplier {i}', contact_email=f's{i}@t.bg', address=f'Street {i}' if i % 2 else None)
+        for i in range(20)
+    ])
+    Sale.objects.bulk_create([
+        Sale(owner=user, product=products[i % 20], customer=customers[i % 20], quantity=i % 7 + 1,
+             sale_date=date.today() - timedelta(days=i), sale_price=None if i % 5 == 0 else f'{i}.05', total_price=f'{i * 3}.10')
+        for i in range(rows)
+    ])
+    Purchase.objects.bulk_create([
+        Purchase(owner=user, product=products[i % 20], supplier=suppliers[i % 20], quantity=i % 9 + 1,
+                 purchase_date=date.today() - timedelta(days=i), unit_cost_price=f'{i}.5', total_price=f'{i * 9}')
+        for i in range(rows)
+    ])
+    return products
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('route, query', QUERIES)
+def test_values_serializers_render_the_same_json(api_client, monkeypatch, route, query):
+    user = User.objects.create(username='user1')
+    products = seed(user, 60)
+    api_client.force_authenticate(user=user)
+    url = reverse(f'{route}-list') + query.format(product=products[3].pk)
+
+    lean = api_client.get(url)
+    caches[CACHE_ALIAS].clear()
+    monkeypatch.setattr(VIEWSETS[route], 'values_serializer_class', None)
+    full = api_client.get(url)
+
+    assert lean.status_code == full.status_code == 200
+    assert lean.content == full.content
+    assert lean['ETag'] == full['ETag']
+
+
+@pytest.mark.django_db
+def test_cursor_links_follow_the_same_pages(api_client):
+    user = User.objects.create(username='user1')
+    seed(user, 30)
+    api_client.force_authenticate(user=user)
+
+    url = reverse('sale-list') + '?pagination=cursor&page_size=7'
+    seen = []
+    while url:
+        page = api_client.get(url).json()
+        seen += page['results']
+        url = page['next']
+
+    assert len(seen) == 30
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('zone', ['UTC', 'Europe/Sofia', 'America/New_York'])
+def test_datetimes_follow_the_active_time_zone(zone):
+    user = User.objects.create(username='user1')
+    seed(user, 5)
+    sales = Sale.objects.select_related('product', 'customer')
+
+    with timezone.override(zone):
+        assert SaleValuesSerializer.serialize(sales.values(*SaleValuesSerializer.lookups)) == \
+            serializers.SaleSerializer(sales, many=True).data
+
+
+MODEL_SERIALIZERS = [
+    ('product', serializers.ProductSerializer, ProductValuesSerializer, lambda: Product.objects.select_related('category')),
+    ('customer', serializers.CustomerSerializer, CustomerValuesSerializer, lambda: Customer.objects.all()),
+    ('supplier', serializers.SupplierSerializer, SupplierValuesSerializer, lambda: Supplier.objects.all()),
+    ('purchase', serializers.PurchaseSerializer, PurchaseValuesSerializer, lambda: Purchase.objects.select_related('product', 'supplier')),
+    ('sale', serializers.SaleSerializer, SaleValuesSerializer, lambda: Sale.objects.select_related('product', 'customer')),
+]
+
+
+def rate(rows, run, repeat=3):
+    best = min(timed(run) for _ in range(repeat))
+    return rows / best
+
+
+def timed(run):
+    started = time.perf_counter()
+    run()
+    return time.perf_counter() - started
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+@pytest.mark.parametrize('name, model_serializer, values_serializer, queryset', MODEL_SERIALIZERS)
+def test_benchmark_values_serializers(name, model_serializer, values_serializer, queryset):
+    rows = int(os.getenv('BENCH_ROWS', '5000'))
+    user = User.objects.create(username='user1')
+    seed(user, rows)
+    count = queryset().count()
+
+    instances = list(queryset())
+    values = list(queryset().values(*values_serializer.lookups))
+    assert values_serializer.serialize(values) == model_serializer(instances, many=True).data
+
+    serialize_full = rate(count, lambda: model_serializer(instances, many=True).data)
+    serialize_lean = rate(count, lambda: values_serializer.serialize(values))
+    fetch_full = rate(count, lambda: model_serializer(list(queryset()), many=True).data)
+    fetch_lean = rate(count, lambda: values_serializer.serialize(queryset().values(*values_serializer.lookups)))
+    print(
+        f'\n{name} ({count} rows): serialize {serialize_full:,.0f} -> {serialize_lean:,.0f} rows/s '
+        f'({serialize_lean / serialize_full:.1f}x), fetch+serialize {fetch_full:,.0f} -> {fetch_lean:,.0f} rows/s '
+        f'({fetch_lean / fetch_full:.1f}x)'
+    )
+    assert serialize_lean > serialize_full
@@ -0,0 +1,224 @@
+import os
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+from django.urls import reverse
+from MiniShopApp import reports
+from MiniShopApp.models import DailyTotals, Order, Sale, Purchase, Product, Customer, User
+
+
+@pytest.fixture
+def shop(make_shop):
+    shop = make_shop(products=(('Laptop', 'ABC123', 1200), ('Mouse', 'MOU123', 20)), stock=100)
+    return shop.user, *shop.products, shop.customer, shop.supplier
+
+
+def sell(shop, product, quantity, price, day):
+    user, _, _, customer, _ = shop
+    return Sale.objects.create(owner=user, product=product, customer=customer, quantity=quantity, sale_date=day, sale_price=price)
+
+
+def buy(shop, product, quantity, cost, day):
+    user, _, _, _, supplier = shop
+    return Purchase.objects.create(owner=user, product=product, supplier=supplier, quantity=quantity, purchase_date=day, unit_cost_price=cost)
+
+
+def snapshot():
+    return sorted(DailyTotals.objects.values_list('product_id', 'day', 'sale_quantity', 'sale_total', 'purchase_quantity', 'purchase_total'))
+
+
+@pytest.mark.django_db
+def test_writes_keep_daily_totals_incremental(shop):
+    user, laptop, mouse, customer, supplier = shop
+    today = date.today()
+    sale = sell(shop, laptop, 2, 100, today)
+    sell(shop, laptop, 1, 50, today)
+    buy(shop, laptop, 5, 10, today)
+
+    row = DailyTotals.objects.get(product=laptop, day=today)
+    assert (row.sale_quantity, row.sale_total, row.purchase_quantity, row.purchase_total) == (3, 250, 5, 50)
+
+    sale.quantity = 4
+    sale.sale_date = today - timedelta(days=1)
+    sale.save()
+    assert DailyTotals.objects.get(product=laptop, day=today).sale_quantity == 1
+    assert DailyTotals.objects.get(product=laptop, day=today - timedelta(days=1)).sale_total == 400
+
+    sale.delete()
+    assert DailyTotals.objects.get(product=laptop, day=today - timedelta(days=1)).sale_quantity == 0
+
+
+@pytest.mark.django_db
+def test_rebuild_command_matches_incremental_totals(shop):
+    user, laptop, mouse, customer, supplier = shop
+    for offset in range(5):
+        day = date.today() - timedelta(days=offset)
+        sell(shop, laptop, 1, 100 + offset, day)
+        sell(shop, mouse, 2, 5, day)
+        buy(shop, mouse, 3, 2, day)
+    incremental = snapshot()
+
+    DailyTotals.objects.all().delete()
+    call_command('rebuild_reports')
+
+    assert snapshot() == incremental
+
+
+def rebuilt():
+    # Removing a contribution leaves a zero row behind where a rebuild has none.
+    def totals():
+        return [row for row in snapshot() if any(row[2:])]
+
+    incremental = totals()
+    reports.rebuild()
+    return incremental, totals()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('rows', [5, 30])
+def test_cascades_update_totals_without_loading_the_rows(shop, rows):
+    user, laptop, mouse, customer, supplier = shop
+    other = Customer.objects.create(owner=user, name="Other Customer", email="o@t.bg")
+    order = Order.objects.create(owner=user, customer=other, order_date=date.today())
+    for offset in range(rows):
+        day = date.today() - timedelta(days=offset % 7)
+        sell(shop, laptop, 1, 100 + offset, day)
+        Sale.objects.create(owner=user, product=mouse, customer=other, quantity=1, sale_date=day, sale_price=5)
+        Sale.objects.create(owner=user, product=laptop, customer=other, order=order, quantity=2, sale_date=day, sale_price=9)
+        buy(shop, mouse, 3, 2, day)
+
+    with CaptureQueriesContext(connection) as queries:
+        order.delete()
+        customer.delete()
+        supplier.delete()
+
+    incremental, expected = rebuilt()
+    assert incremental == expected
+    assert Sale.objects.filter(customer=other).count() == rows
+    assert not Purchase.objects.exists()
+    # Sales and purchases are deleted in bulk, never loaded one by one.
+    assert not [query['sql'] for query in queries.captured_queries if query['sql'].startswith('SELECT') and (
+        'FROM "MiniShopApp_sale"' in query['sql'] or 'FROM "MiniShopApp_purchase"' in query['sql'])]
+
+
+@pytest.mark.django_db
+def test_queryset_deletes_update_totals(shop):
+    user, laptop, mouse, customer, supplier = shop
+    other = User.objects.create(username="user2")
+    for offset in range(3):
+        day = date.today() - timedelta(days=offset)
+        sell(shop, laptop, 1, 100, day)
+        sell(shop, mouse, 2, 5, day)
+        buy(shop, mouse, 3, 2, day)
+    Sale.objects.create(owner=other, product=laptop, customer=customer, quantity=1, sale_date=date.today(), sale_price=7)
+
+    # As the admin's "delete selected" action does.
+    Sale.objects.filter(product=mouse).delete()
+    Sale.objects.filter(sale_date=date.today()).delete()
+    Purchase.objects.filter(purchase_date__lt=date.today()).delete()
+
+    incremental, expected = rebuilt()
+    assert incremental == expected
+    assert Sale.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_deleting_the_owner_or_a_product_drops_its_totals(shop):
+    user, laptop, mouse, customer, supplier = shop
+    sell(shop, laptop, 1, 100, date.today())
+    sell(shop, mouse, 2, 5, date.today())
+    buy(shop, mouse, 3, 2, date.today())
+
+    laptop.delete()
+    incremental, expected = rebuilt()
+    assert incremental == expected
+    user.delete()
+    assert not DailyTotals.objects.exists()
+
+
+@pytest.mark.django_db
+def test_bulk_ingestion_updates_totals(api_client, shop):
+    user, laptop, mouse, customer, supplier = shop
+    api_client.force_authenticate(user=user)
+    lines = [{"product": "Mouse", "customer": "Test Customer", "quantity": 1, "sale_date": date.today().isoformat(), "sale_price": "5.00"}] * 3
+
+    api_client.post(reverse("sale-bulk"), data=lines, format='json')
+
+    row = DailyTotals.objects.get(product=mouse)
+    assert (row.sale_quantity, row.sale_total) == (3, Decimal('15.00'))
+
+
+@pytest.mark.django_db
+def test_reports_group_and_filter(api_client, shop):
+    user, laptop, mouse, customer, supplier = shop
+    first, second = date(2025, 1, 31), date(2025, 2, 1)
+    sell(shop, laptop, 2, 100, first)
+    sell(shop, mouse, 1, 20, second)
+    buy(shop, mouse, 4, 5, second)
+    api_client.force_authenticate(user=user)
+
+    by_month = api_client.get(reverse('reports') + '?group_by=month').data
+    assert [(row['group'], row['revenue'], row['cost'], row['margin']) for row in by_month] == [
+        ('2025-01-01', '200.00', '0.00', '200.00'),
+        ('2025-02-01', '20.00', '20.00', '0.00'),
+    ]
+
+    by_product = api_client.get(reverse('reports') + '?group_by=product&date_from=2025-02-01').data
+    assert [(row['group'], row['quantity_sold'], row['quantity_purchased']) for row in by_product] == [('Mouse', 1, 4)]
+
+    total = api_client.get(reverse('reports') + '?group_by=total&product=Laptop').data
+    assert total[0]['revenue'] == '200.00'
+
+
+@pytest.mark.django_db
+def test_reports_are_per_owner_and_validate_params(api_client, shop):
+    user, laptop, mouse, customer, supplier = shop
+    sell(shop, laptop, 2, 100, date.today())
+    api_client.force_authenticate(user=User.objects.create(username="user2"))
+
+    assert api_client.get(reverse('reports')).data == []
+    assert api_client.get(reverse('reports') + '?group_by=week').status_code == 400
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_benchmark_year_report(api_client, shop):
+    user, laptop, mouse, customer, supplier = shop
+    products = int(os.getenv('BENCH_PRODUCTS', '50'))
+    per_day = int(os.getenv('BENCH_SALES_PER_DAY', '500'))
+    items = Product.objects.bulk_create([
+        Product(owner=user, name=f'Item {i}', sku=f'SKU{i}', price=10, quantity_in_stock=0, category=laptop.category)
+        for i in range(products)
+    ])
+    start = date.today() - timedelta(days=365)
+    Sale.objects.bulk_create((
+        Sale(owner=user, product=items[(day * per_day + n) % products], customer=customer, quantity=1,
+             sale_date=start + timedelta(days=day), sale_price=10, total_price=10)
+        for day in range(365) for n in range(per_day)
+    ), batch_size=5000)
+    call_command('rebuild_reports')
+    api_client.force_authenticate(user=user)
+    url = reverse('reports') + f'?group_by=month&date_from={start.isoformat()}'
+    api_client.get(url)
+
+    started = time.perf_counter()
+    response = api_client.get(url)
+    rollup_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    raw = list(Sale.objects.filter(owner=user, sale_date__gte=start).annotate(month=TruncMonth('sale_date'))
+               .values('month').annotate(revenue=Sum('total_price')).order_by('month'))
+    raw_ms = (time.perf_counter() - started) * 1000
+
+    assert response.status_code == 200
+    assert sum(row['quantity_sold'] for row in response.data) == 365 * per_day
+    assert len(raw) == len(response.data)
+    print(f"\nyear report over {365 * per_day} sales ({DailyTotals.objects.count()} daily rows): "
+          f"{rollup_ms:.1f} ms from rollups, {raw_ms:.1f} ms aggregating raw sales")
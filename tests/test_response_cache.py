@@ -0,0 +1,140 @@
+from datetime import date
+
+import pytest
+from django.core import checks
+from django.core.cache import caches
+from django.urls import reverse
+from MiniShopApp.caching import CACHE_ALIAS
+from MiniShopApp.models import Sale, Customer, Supplier, User
+
+
+@pytest.fixture
+def shop(make_shop):
+    shop = make_shop(stock=10)
+    return shop.user, shop.category, shop.product
+
+
+@pytest.mark.django_db
+def test_repeated_get_is_served_from_cache(api_client, shop, django_assert_num_queries):
+    user, category, product = shop
+    api_client.force_authenticate(user=user)
+
+    first = api_client.get(reverse('product-list'))
+    detail = api_client.get(reverse('product-detail', args=[product.pk]))
+    with django_assert_num_queries(0):
+        second = api_client.get(reverse('product-list'))
+        again = api_client.get(reverse('product-detail', args=[product.pk]))
+
+    assert second.data == first.data
+    assert again.data == detail.data
+    assert second.content == first.content
+
+
+@pytest.mark.django_db
+def test_cache_is_per_owner(api_client, shop):
+    user, category, product = shop
+    other = User.objects.create(username="user2")
+
+    api_client.force_authenticate(user=user)
+    assert len(api_client.get(reverse('product-list')).data['results']) == 1
+    api_client.force_authenticate(user=other)
+    assert len(api_client.get(reverse('product-list')).data['results']) == 0
+
+
+@pytest.fixture(params=['locmem', 'file'])
+def backend(request, settings, tmp_path):
+    if request.param == 'file':
+        settings.CACHES = {
+            **settings.CACHES,
+            CACHE_ALIAS: {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': str(tmp_path)},
+        }
+    return request.param
+
+
+@pytest.mark.django_db
+def test_viewset_writes_invalidate(api_client, shop, backend):
+    user, category, product = shop
+    api_client.force_authenticate(user=user)
+    api_client.get(reverse('product-list'))
+
+    payload = {"name": "Mouse", "sku": "MOU1", "price": 20, "quantity_in_stock": 1, "category": category.name}
+    api_client.post(reverse('product-list'), data=payload, format='json')
+    assert api_client.get(reverse('product-list')).data['count'] == 2
+
+    api_client.patch(reverse('product-detail', args=[product.pk]), data={"price": 999}, format='json')
+    assert api_client.get(reverse('product-detail', args=[product.pk])).data['price'] == '999.00'
+
+    api_client.delete(reverse('product-detail', args=[product.pk]))
+    assert api_client.get(reverse('product-list')).data['count'] == 1
+
+
+@pytest.mark.django_db
+def test_stock_side_effects_invalidate(api_client, shop):
+    user, category, product = shop
+    customer = Customer.objects.get(owner=user)
+    api_client.force_authenticate(user=user)
+    api_client.get(reverse('product-detail', args=[product.pk]))
+
+    Sale.objects.create(owner=user, product=product, customer=customer, quantity=3, sale_date=date.today(), sale_price=1)
+
+    assert api_client.get(reverse('product-detail', args=[product.pk])).data['quantity_in_stock'] == 7
+
+
+@pytest.mark.django_db
+def test_category_rename_invalidates_products(api_client, shop):
+    user, category, product = shop
+    api_client.force_authenticate(user=user)
+    api_client.get(reverse('product-detail', args=[product.pk]))
+
+    api_client.patch(reverse('category-detail', args=[category.pk]), data={"name": "Computers"}, format='json')
+
+    assert api_client.get(reverse('product-detail', args=[product.pk])).data['category'] == 'Computers'
+
+
+@pytest.mark.django_db
+def test_model_writes_outside_viewsets_invalidate(api_client, shop, backend):
+    user, category, product = shop
+    customer = Customer.objects.get(owner=user)
+    supplier = Supplier.objects.get(owner=user)
+    api_client.force_authenticate(user=user)
+    for name in ['product', 'customer', 'supplier']:
+        api_client.get(reverse(f'{name}-list'))
+
+    # As the admin and management commands do.
+    product.price = 999
+    product.save()
+    customer.name = "Renamed Customer"
+    customer.save()
+    supplier.delete()
+
+    assert api_client.get(reverse('product-list')).data['results'][0]['price'] == '999.00'
+    assert api_client.get(reverse('customer-list')).data['results'][0]['name'] == "Renamed Customer"
+    assert api_client.get(reverse('supplier-list')).data['count'] == 0
+
+
+def test_deploy_check_warns_about_a_per_process_cache(settings):
+    settings.CACHES = {**settings.CACHES, CACHE_ALIAS: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    assert [message.id for message in checks.run_checks(include_deployment_checks=True, tags=['caches'])] == ['MiniShopApp.W001']
+
+    settings.CACHES = {**settings.CACHES, CACHE_ALIAS: {'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                                                        'LOCATION': 'redis://localhost:6379'}}
+    assert not checks.run_checks(include_deployment_checks=True, tags=['caches'])
+
+
+@pytest.mark.django_db
+def test_cache_size_is_bounded(api_client, shop, settings):
+    settings.CACHES = {
+        **settings.CACHES,
+        CACHE_ALIAS: {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'bounded-responses',
+            'OPTIONS': {'MAX_ENTRIES': 5, 'CULL_FREQUENCY': 5},
+        },
+    }
+    user, category, product = shop
+    api_client.force_authenticate(user=user)
+
+    for page_size in range(1, 20):
+        assert api_client.get(reverse('product-list') + f'?page_size={page_size}').status_code == 200
+
+    assert len(caches[CACHE_ALIAS]._cache) <= 5
@@ -0,0 +1,105 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from drf_yasg.generators import OpenAPISchemaGenerator
+
+from MiniShop import schema
+
+
+@pytest.fixture(autouse=True)
+def schema_dir(settings, tmp_path):
+    settings.OPENAPI_SCHEMA_DIR = str(tmp_path)
+    settings.CODE_VERSION = 'v1'
+    schema.code_version.cache_clear()
+    schema._artifacts.clear()
+    yield tmp_path
+    schema.code_version.cache_clear()
+    schema._artifacts.clear()
+
+
+def forget_artifacts():
+    schema._artifacts.clear()
+    schema.code_version.cache_clear()
+
+
+@pytest.mark.django_db
+def test_schema_is_served_with_etag(client, schema_dir):
+    response = client.get('/swagger.json')
+
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/json'
+    assert response['ETag']
+    assert response['Cache-Control'] == 'public, no-cache'
+    assert '/products/' in json.loads(response.content)['paths']
+    assert (schema_dir / 'openapi-v1.json').read_bytes() == response.content
+
+
+@pytest.mark.django_db
+def test_yaml_schema(client):
+    response = client.get('/swagger.yaml')
+
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/yaml'
+    assert b'swagger:' in response.content
+
+
+@pytest.mark.django_db
+def test_matching_etag_gets_not_modified(client):
+    etag = client.get('/swagger.json')['ETag']
+
+    response = client.get('/swagger.json', HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+    assert response.content == b''
+    assert client.get('/swagger.json', HTTP_IF_NONE_MATCH='"stale"').status_code == 200
+
+
+@pytest.mark.django_db
+def test_prebuilt_artifact_is_not_regenerated(client, monkeypatch):
+    first = client.get('/swagger.json').content
+    forget_artifacts()
+
+    def fail(*args, **kwargs):
+        raise AssertionError('schema regenerated')
+
+    monkeypatch.setattr(OpenAPISchemaGenerator, 'get_schema', fail)
+    assert client.get('/swagger.json').content == first
+
+
+@pytest.mark.django_db
+def test_new_code_version_rebuilds(client, settings, schema_dir):
+    client.get('/swagger.json')
+    (schema_dir / 'openapi-v1.json').write_bytes(b'{"swagger": "2.0", "paths": {}}')
+
+    settings.CODE_VERSION = 'v2'
+    forget_artifacts()
+    response = client.get('/swagger.json')
+
+    assert response.status_code == 200
+    assert '/products/' in json.loads(response.content)['paths']
+    assert (schema_dir / 'openapi-v2.json').exists()
+
+
+def test_code_version_defaults_to_source_hash(settings):
+    settings.CODE_VERSION = ''
+    forget_artifacts()
+
+    assert len(schema.code_version()) == 16
+
+
+@pytest.mark.django_db
+def test_build_schema_command_replaces_old_versions(schema_dir):
+    (schema_dir / 'openapi-old.json').write_text('{}')
+
+    call_command('build_schema', stdout=open('/dev/null', 'w'))
+
+    assert sorted(path.name for path in schema_dir.iterdir()) == ['openapi-v1.json', 'openapi-v1.yaml']
+
+
+@pytest.mark.django_db
+def test_ui_loads_the_prebuilt_schema(client):
+    response = client.get('/swagger/')
+
+    assert response.status_code == 200
+    assert b'/swagger.json' in response.content
@@ -0,0 +1,18 @@
+import os
+import subprocess
+import sys
+from importlib.util import find_spec
+
+import pytest
+from django.conf import settings
+
+
+@pytest.mark.skipif(find_spec('psycopg_pool') is not None, reason='psycopg 3 pool is installed')
+def test_pool_without_psycopg3_is_rejected_at_startup():
+    result = subprocess.run(
+        [sys.executable, '-c', 'import MiniShop.settings'],
+        cwd=settings.BASE_DIR, env={**os.environ, 'DB_POOL': 'true'}, capture_output=True, text=True,
+    )
+
+    assert result.returncode != 0
+    assert 'ImproperlyConfigured: DB_POOL=true needs psycopg 3' in result.stderr
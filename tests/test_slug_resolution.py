@@ -0,0 +1,141 @@
+import os
+import time
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.urls import reverse
+from MiniShopApp.models import Sale, Product, Customer, User, Category
+from MiniShopApp.serializers import OwnerSlugRelatedField
+
+
+def make_product(user, category, name='Laptop', sku='ABC123', stock=10):
+    return Product.objects.create(name=name, sku=sku, price=1200, quantity_in_stock=stock, category=category, owner=user)
+
+
+@pytest.mark.django_db
+def test_sale_resolves_names_among_own_rows(api_client):
+    user = User.objects.create_user(username="user1", password="pass")
+    other = User.objects.create_user(username="user2", password="pass2")
+    category = Category.objects.create(name='Electronics')
+    mine = make_product(user, category)
+    theirs = make_product(other, category, sku='XYZ789')
+    Customer.objects.create(owner=user, name="Test Customer", email="t@t.bg")
+    Customer.objects.create(owner=other, name="Test Customer", email="o@t.bg")
+    api_client.force_authenticate(user=user)
+
+    payload = {"product": "Laptop", "customer": "Test Customer", "quantity": 1, "sale_date": date.today().isoformat()}
+    response = api_client.post(reverse("sale-list"), data=payload, format='json')
+
+    assert response.status_code == 201
+    assert Sale.objects.get().product == mine
+    theirs.refresh_from_db()
+    assert theirs.quantity_in_stock == 10
+
+
+@pytest.mark.django_db
+def test_sale_cannot_use_other_owners_product(api_client):
+    user = User.objects.create_user(username="user1", password="pass")
+    other = User.objects.create_user(username="user2", password="pass2")
+    category = Category.objects.create(name='Electronics')
+    make_product(other, category)
+    Customer.objects.create(owner=user, name="Test Customer", email="t@t.bg")
+    api_client.force_authenticate(user=user)
+
+    payload = {"product": "Laptop", "customer": "Test Customer", "quantity": 1, "sale_date": date.today().isoformat()}
+    response = api_client.post(reverse("sale-list"), data=payload, format='json')
+
+    assert response.status_code == 400
+    assert 'product' in response.data
+
+
+@pytest.mark.django_db
+def test_duplicate_product_name_per_owner_is_rejected(api_client):
+    user = User.objects.create_user(username="user1", password="pass")
+    category = Category.objects.create(name='Electronics')
+    make_product(user, category)
+    api_client.force_authenticate(user=user)
+
+    payload = {"name": "Laptop", "sku": "NEW1", "price": 10, "quantity_in_stock": 1, "category": category.name}
+    response = api_client.post(reverse("product-list"), data=payload, format='json')
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_repeated_names_resolve_once_per_request(django_assert_num_queries):
+    user = User.objects.create(username="user1")
+    category = Category.objects.create(name='Electronics')
+    product = make_product(user, category)
+    field = OwnerSlugRelatedField(slug_field='name', queryset=Product.objects.all())
+    field._context = {'request': SimpleNamespace(user=user)}
+
+    with django_assert_num_queries(1):
+        resolved = [field.to_internal_value('Laptop') for _ in range(3)]
+
+    assert resolved == [product] * 3
+
+
+@pytest.mark.django_db(transaction=True)
+def test_migration_renames_duplicate_names_before_adding_the_constraints():
+    before = ('MiniShopApp', '0007_owner_scoped_indexes')
+    executor = MigrationExecutor(connection)
+    executor.migrate([before])
+    apps = executor.loader.project_state(before).apps
+    owner = apps.get_model('auth', 'User').objects.create(username='user1')
+    other = apps.get_model('auth', 'User').objects.create(username='user2')
+    category = apps.get_model('MiniShopApp', 'Category').objects.create(name='Electronics')
+    OldProduct, OldCustomer = apps.get_model('MiniShopApp', 'Product'), apps.get_model('MiniShopApp', 'Customer')
+    rows = [(owner, 'Laptop'), (owner, 'Laptop'), (owner, 'Laptop'), (owner, 'L' * 100), (owner, 'L' * 100), (other, 'Laptop')]
+    for i, (user, name) in enumerate(rows):
+        OldProduct.objects.create(owner=user, name=name, sku=f'SKU{i}', price=1, quantity_in_stock=0, category=category)
+    for i in range(2):
+        renamed = OldCustomer.objects.create(owner=owner, name='Test Customer', email=f'c{i}@t.bg')
+    # The first suffixes the duplicate would get are taken already.
+    for suffix in [f'({renamed.pk})', f'({renamed.pk}-2)']:
+        OldCustomer.objects.create(owner=owner, name=f'Test Customer {suffix}', email='taken@t.bg')
+
+    executor = MigrationExecutor(connection)
+    executor.migrate(executor.loader.graph.leaf_nodes('MiniShopApp'))
+
+    names = list(Product.objects.filter(owner_id=owner.pk).order_by('pk').values_list('pk', 'name'))
+    assert [name for _, name in names[:3]] == ['Laptop', f'Laptop ({names[1][0]})', f'Laptop ({names[2][0]})']
+    assert names[3][1] == 'L' * 100 and names[4][1].endswith(f' ({names[4][0]})') and len(names[4][1]) == 100
+    assert Product.objects.get(owner_id=other.pk).name == 'Laptop'
+    assert Customer.objects.filter(name='Test Customer').count() == 1
+    assert Customer.objects.get(pk=renamed.pk).name == f'Test Customer ({renamed.pk}-3)'
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_benchmark_sale_creation_latency(api_client):
+    products = int(os.getenv('BENCH_PRODUCTS', '100000'))
+    owners = int(os.getenv('BENCH_OWNERS', '1000'))
+    sales = int(os.getenv('BENCH_SALES', '200'))
+    per_owner = products // owners
+
+    users = User.objects.bulk_create([User(username=f'owner{i}') for i in range(owners)])
+    category = Category.objects.create(name='Electronics')
+    Product.objects.bulk_create((
+        Product(owner=users[i % owners], name=f'Item {i // owners}', sku=f'SKU{i}', price=10,
+                quantity_in_stock=sales, category=category)
+        for i in range(per_owner * owners)
+    ), batch_size=5000)
+    user = users[owners // 2]
+    Customer.objects.create(owner=user, name='Test Customer', email='t@t.bg')
+    api_client.force_authenticate(user=user)
+
+    latencies = []
+    for i in range(sales):
+        payload = {"product": f"Item {i % per_owner}", "customer": "Test Customer", "quantity": 1,
+                   "sale_date": date.today().isoformat()}
+        started = time.perf_counter()
+        response = api_client.post(reverse("sale-list"), data=payload, format='json')
+        latencies.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 201
+
+    latencies.sort()
+    print(f"\nsale creation over {products} products / {owners} owners: "
+          f"p50 {latencies[len(latencies) // 2]:.2f} ms, p95 {latencies[int(len(latencies) * 0.95)]:.2f} ms")
@@ -0,0 +1,150 @@
+import os
+import random
+import threading
+import time
+from datetime import date
+
+import pytest
+from django.db import OperationalError, connection, connections, transaction
+from django.urls import reverse
+from MiniShopApp.exceptions import InsufficientStock
+from MiniShopApp.models import Sale, Purchase, Product
+from MiniShopApp.stock import apply_stock_delta
+
+
+def run_parallel(workers, target):
+    errors = []
+
+    def worker():
+        try:
+            while True:
+                try:
+                    return target()
+                except OperationalError:
+                    # SQLite stands in for Postgres here and locks the whole
+                    # table on write, so a busy writer is retried.
+                    if connection.vendor != 'sqlite':
+                        raise
+                    time.sleep(random.uniform(0, 0.01))
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, errors
+
+
+@pytest.mark.django_db
+def test_apply_stock_delta_only_writes_stock(make_shop):
+    product = make_shop(stock=10).product
+    stale = Product.objects.get(pk=product.pk)
+    Product.objects.filter(pk=product.pk).update(name='Renamed')
+
+    apply_stock_delta(stale.pk, -4)
+
+    product.refresh_from_db()
+    assert product.quantity_in_stock == 6
+    assert product.name == 'Renamed'
+
+
+@pytest.mark.django_db
+def test_apply_stock_delta_refuses_oversell(make_shop):
+    product = make_shop(stock=3).product
+
+    with pytest.raises(InsufficientStock):
+        apply_stock_delta(product.pk, -4)
+
+    product.refresh_from_db()
+    assert product.quantity_in_stock == 3
+
+
+@pytest.mark.django_db
+def test_oversell_returns_conflict(api_client, make_shop):
+    shop = make_shop(stock=2)
+    user, product, customer = shop.user, shop.product, shop.customer
+    api_client.force_authenticate(user=user)
+
+    payload = {
+        "product": product.name,
+        "customer": customer.name,
+        "quantity": 5,
+        "sale_date": date.today().isoformat(),
+        "sale_price": "1000.00"
+    }
+
+    response = api_client.post(reverse("sale-list"), data=payload, format='json')
+
+    assert response.status_code == 409
+    assert not Sale.objects.exists()
+    product.refresh_from_db()
+    assert product.quantity_in_stock == 2
+
+
+@pytest.mark.django_db
+def test_purchase_uses_stale_product_without_overwriting_stock(make_shop):
+    shop = make_shop(stock=3)
+    user, product, supplier = shop.user, shop.product, shop.supplier
+    Product.objects.filter(pk=product.pk).update(quantity_in_stock=7)
+
+    Purchase.objects.create(owner=user, product=product, supplier=supplier, quantity=5, purchase_date=date.today(), unit_cost_price=1.0)
+
+    product.refresh_from_db()
+    assert product.quantity_in_stock == 12
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_sales_keep_stock_exact(make_shop):
+    shop = make_shop(stock=50)
+    user, product, customer = shop.user, shop.product, shop.customer
+
+    def sell_one():
+        Sale.objects.create(owner=user, product=product, customer=customer, quantity=1, sale_date=date.today(), sale_price=10)
+
+    elapsed, errors = run_parallel(200, sell_one)
+
+    product.refresh_from_db()
+    assert product.quantity_in_stock == 0
+    assert Sale.objects.count() == 50
+    assert errors and all(isinstance(error, InsufficientStock) for error in errors)
+
+
+def legacy_sell(product, customer, lock):
+    products = Product.objects.select_for_update() if lock else Product.objects
+    with transaction.atomic():
+        current = products.get(pk=product.pk)
+        if current.quantity_in_stock < 1:
+            raise InsufficientStock()
+        current.quantity_in_stock -= 1
+        current.save()
+        Sale.objects.bulk_create([Sale(owner=current.owner, product=current, customer=customer, quantity=1,
+                                       sale_date=date.today(), sale_price=10, total_price=10)])
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('strategy', ['read-modify-write', 'select-for-update', 'conditional-update'])
+def test_benchmark_parallel_sales(strategy, make_shop):
+    sales = int(os.getenv('BENCH_SALES', '200'))
+    shop = make_shop(stock=sales)
+    user, product, customer = shop.user, shop.product, shop.customer
+
+    if strategy == 'conditional-update':
+        def sell_one():
+            Sale.objects.create(owner=user, product=product, customer=customer, quantity=1, sale_date=date.today(), sale_price=10)
+    else:
+        def sell_one():
+            legacy_sell(product, customer, lock=strategy == 'select-for-update')
+
+    elapsed, errors = run_parallel(sales, sell_one)
+
+    product.refresh_from_db()
+    sold = Sale.objects.count()
+    print(f"\n{strategy}: {sold / elapsed:.0f} sales/s, {sold} sold, {product.quantity_in_stock} left, {len(errors)} errors")
+    if strategy == 'conditional-update':
+        assert product.quantity_in_stock == sales - sold == 0
@@ -0,0 +1,146 @@
+import random
+from datetime import date
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from MiniShopApp import journal
+from MiniShopApp.exceptions import InsufficientStock
+from MiniShopApp.models import Sale, Purchase, Product
+
+# Fixed seeds, so a failure replays exactly: rerun the failing seed's case.
+SEEDS = range(25)
+STEPS = 40
+
+
+@pytest.fixture
+def shop(make_shop):
+    shop = make_shop(products=[(f'Item {i}', f'SKU{i}', 10) for i in range(3)], stock=20)
+    return shop.user, shop.products, shop.customer, shop.supplier
+
+
+def stock_of(*products):
+    return [Product.objects.get(pk=product.pk).quantity_in_stock for product in products]
+
+
+def stock_updates(queries):
+    return [q['sql'] for q in queries if q['sql'].startswith('UPDATE') and 'SET "quantity_in_stock"' in q['sql']]
+
+
+@pytest.mark.django_db
+def test_editing_a_sale_applies_only_the_difference(api_client, shop):
+    user, (laptop, mouse, cable), customer, supplier = shop
+    sale = Sale.objects.create(owner=user, product=laptop, customer=customer, quantity=5, sale_date=date.today(), sale_price=10)
+    api_client.force_authenticate(user=user)
+
+    response = api_client.patch(reverse('sale-detail', args=[sale.pk]), {'quantity': 7}, format='json')
+    assert response.status_code == 200
+    assert stock_of(laptop) == [13]
+
+    response = api_client.patch(reverse('sale-detail', args=[sale.pk]), {'sale_date': '2024-01-01'}, format='json')
+    assert response.status_code == 200
+    assert stock_of(laptop) == [13]
+
+
+@pytest.mark.django_db
+def test_moving_a_sale_to_another_product_is_one_conditional_update(api_client, shop):
+    user, (laptop, mouse, cable), customer, supplier = shop
+    sale = Sale.objects.create(owner=user, product=laptop, customer=customer, quantity=5, sale_date=date.today(), sale_price=10)
+    api_client.force_authenticate(user=user)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.patch(reverse('sale-detail', args=[sale.pk]), {'product': 'Item 1', 'quantity': 8}, format='json')
+
+    assert response.status_code == 200
+    assert stock_of(laptop, mouse) == [20, 12]
+    assert len(stock_updates(queries)) == 1
+
+
+@pytest.mark.django_db
+def test_moving_a_sale_to_a_product_without_stock_changes_nothing(api_client, shop):
+    user, (laptop, mouse, cable), customer, supplier = shop
+    sale = Sale.objects.create(owner=user, product=laptop, customer=customer, quantity=5, sale_date=date.today(), sale_price=10)
+    api_client.force_authenticate(user=user)
+
+    response = api_client.patch(reverse('sale-detail', args=[sale.pk]), {'product': 'Item 1', 'quantity': 21}, format='json')
+
+    assert response.status_code == 409
+    assert stock_of(laptop, mouse) == [15, 20]
+    assert Sale.objects.get(pk=sale.pk).product_id == laptop.pk
+
+
+@pytest.mark.django_db
+def test_deleting_returns_the_stock(api_client, shop):
+    user, (laptop, mouse, cable), customer, supplier = shop
+    sale = Sale.objects.create(owner=user, product=laptop, customer=customer, quantity=5, sale_date=date.today(), sale_price=10)
+    purchase = Purchase.objects.create(owner=user, product=mouse, supplier=supplier, quantity=4, purchase_date=date.today(), unit_cost_price=5)
+    api_client.force_authenticate(user=user)
+
+    assert api_client.delete(reverse('sale-detail', args=[sale.pk])).status_code == 204
+    assert api_client.delete(reverse('purchase-detail', args=[purchase.pk])).status_code == 204
+
+    assert stock_of(laptop, mouse) == [20, 20]
+    assert journal.reconcile() == []
+
+
+@pytest.mark.django_db
+def test_deleting_a_purchase_whose_stock_was_sold_is_refused(api_client, shop):
+    user, (laptop, mouse, cable), customer, supplier = shop
+    purchase = Purchase.objects.create(owner=user, product=laptop, supplier=supplier, quantity=10, purchase_date=date.today(), unit_cost_price=5)
+    Sale.objects.create(owner=user, product=laptop, customer=customer, quantity=25, sale_date=date.today(), sale_price=10)
+    api_client.force_authenticate(user=user)
+
+    assert api_client.delete(reverse('purchase-detail', args=[purchase.pk])).status_code == 409
+    assert Purchase.objects.filter(pk=purchase.pk).exists()
+    assert stock_of(laptop) == [5]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('seed', SEEDS)
+def test_seeded_sequences_keep_stock_exact(shop, seed):
+    """
+    Randomized regression check over fixed seeds, not a property-based test:
+    after each seed's sequence of creates, edits and deletes, stock equals
+    the opening stock plus the purchases minus the sales that still exist.
+    """
+    user, products, customer, supplier = shop
+    rng = random.Random(seed)
+    rows = []
+
+    for _ in range(STEPS):
+        action = rng.choice(['create', 'create', 'update', 'update', 'delete'])
+        try:
+            if action == 'create' or not rows:
+                model = rng.choice([Sale, Purchase])
+                row = model(owner=user, product=rng.choice(products), quantity=rng.randint(1, 15))
+                if model is Sale:
+                    row.customer, row.sale_date, row.sale_price = customer, date.today(), 10
+                else:
+                    row.supplier, row.purchase_date, row.unit_cost_price = supplier, date.today(), 5
+                row.save()
+                rows.append(row)
+            elif action == 'update':
+                row = rng.choice(rows)
+                row = type(row).objects.get(pk=row.pk)
+                if rng.random() < 0.5:
+                    row.product = rng.choice(products)
+                row.quantity = rng.randint(1, 15)
+                row.save()
+            else:
+                row = rows.pop(rng.randrange(len(rows)))
+                try:
+                    row.delete()
+                except InsufficientStock:
+                    rows.append(row)
+                    raise
+        except InsufficientStock:
+            pass
+
+    expected = {product.pk: 20 for product in products}
+    for sale in Sale.objects.all():
+        expected[sale.product_id] -= sale.quantity
+    for purchase in Purchase.objects.all():
+        expected[purchase.product_id] += purchase.quantity
+    assert dict(Product.objects.values_list('pk', 'quantity_in_stock')) == expected
+    assert journal.reconcile() == []
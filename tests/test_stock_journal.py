@@ -0,0 +1,166 @@
+import io
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from MiniShopApp import journal
+from MiniShopApp.catalog import import_products
+from MiniShopApp.models import Sale, Purchase, Product, StockMovement, StockSnapshot
+
+
+@pytest.fixture
+def shop(make_shop):
+    shop = make_shop(products=(('Laptop', 'ABC123', 1200), ('Mouse', 'MOU123', 20)), stock=[10, 3])
+    return shop.user, *shop.products, shop.customer, shop.supplier
+
+
+def movements(product):
+    return list(product.stock_movements.order_by('pk').values_list('kind', 'delta', 'reference'))
+
+
+@pytest.mark.django_db
+def test_every_stock_change_is_journaled(api_client, shop):
+    user, laptop, mouse, customer, supplier = shop
+    sale = Sale.objects.create(owner=user, product=laptop, customer=customer, quantity=4, sale_date=date.today(), sale_price=10)
+    purchase = Purchase.objects.create(owner=user, product=laptop, supplier=supplier, quantity=6, purchase_date=date.today(), unit_cost_price=5)
+    api_client.force_authenticate(user=user)
+    api_client.patch(reverse('product-detail', args=[laptop.pk]), {'quantity_in_stock': 20}, format='json')
+    api_client.patch(reverse('product-detail', args=[laptop.pk]), {'price': 1100}, format='json')
+
+    assert movements(laptop) == [
+        (StockMovement.OPENING, 10, None),
+        (StockMovement.SALE, -4, sale.pk),
+        (StockMovement.PURCHASE, 6, purchase.pk),
+        (StockMovement.ADJUSTMENT, 8, None),
+    ]
+    assert journal.reconcile() == []
+
+
+@pytest.mark.django_db
+def test_saving_a_stale_product_keeps_the_stock_moved_meanwhile(api_client, shop):
+    user, laptop, mouse, customer, supplier = shop
+    stale = Product.objects.get(pk=laptop.pk)
+    sale = Sale.objects.create(owner=user, product=laptop, customer=customer, quantity=4, sale_date=date.today(), sale_price=10)
+
+    stale.price = 1100
+    stale.save()
+    assert Product.objects.get(pk=laptop.pk).quantity_in_stock == 6
+    assert stale.quantity_in_stock == 6
+
+    Sale.objects.create(owner=user, product=laptop, customer=customer, quantity=1, sale_date=date.today(), sale_price=10)
+    stale.quantity_in_stock = 9
+    stale.save()
+
+    assert Product.objects.get(pk=laptop.pk).quantity_in_stock == 9
+    assert movements(laptop)[:2] == [(StockMovement.OPENING, 10, None), (StockMovement.SALE, -4, sale.pk)]
+    assert movements(laptop)[3] == (StockMovement.ADJUSTMENT, 4, None)
+    assert journal.reconcile() == []
+
+
+@pytest.mark.django_db
+def test_bulk_ingest_and_import_are_journaled(api_client, shop):
+    user, laptop, mouse, customer, supplier = shop
+    api_client.force_authenticate(user=user)
+
+    lines = [
+        {"product": "Laptop", "customer": "Test Customer", "quantity": 2, "sale_date": date.today().isoformat()},
+        {"product": "Mouse", "customer": "Test Customer", "quantity": 1, "sale_date": date.today().isoformat()},
+    ]
+    assert api_client.post(reverse("sale-bulk"), data=lines, format='json').status_code == 201
+    import_products(user, io.StringIO(
+        'name,sku,price,quantity_in_stock,category\nLaptop,ABC123,1200,30,Electronics\nCable,CAB123,5,7,Electronics\n'
+    ))
+
+    sale = Sale.objects.get(product=laptop)
+    assert movements(laptop) == [
+        (StockMovement.OPENING, 10, None),
+        (StockMovement.SALE, -2, sale.pk),
+        (StockMovement.IMPORT, 22, None),
+    ]
+    assert movements(Product.objects.get(sku='CAB123')) == [(StockMovement.IMPORT, 7, None)]
+    assert journal.reconcile() == []
+
+
+@pytest.mark.django_db
+def test_movements_are_append_only(shop):
+    user, laptop, mouse, customer, supplier = shop
+    movement = laptop.stock_movements.get()
+
+    movement.delta = 100
+    with pytest.raises(ValueError):
+        movement.save()
+    with pytest.raises(ValueError):
+        movement.delete()
+
+
+def at(hour):
+    return datetime(2025, 1, 1, hour, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def history(shop):
+    """Laptop stock of 10 from the fixture, then a movement every hour."""
+    user, laptop, mouse, customer, supplier = shop
+    StockMovement.objects.filter(product=laptop).update(created_at=at(0))
+    deltas = [5, -3, -4, 8, -1, 2]
+    for hour, delta in enumerate(deltas, start=1):
+        StockMovement.objects.create(product=laptop, delta=delta, kind=StockMovement.ADJUSTMENT, created_at=at(hour))
+    Product.objects.filter(pk=laptop.pk).update(quantity_in_stock=10 + sum(deltas))
+    return laptop, [10 + sum(deltas[:hour]) for hour in range(len(deltas) + 1)]
+
+
+@pytest.mark.django_db
+def test_stock_as_of_replays_the_journal(history):
+    laptop, expected = history
+
+    assert [journal.stock_as_of(laptop.pk, at(hour)) for hour in range(len(expected))] == expected
+    assert journal.stock_as_of(laptop.pk, at(0) - timedelta(minutes=1)) == 0
+
+
+@pytest.mark.django_db
+def test_stock_as_of_reads_a_snapshot_and_the_tail(history, django_assert_num_queries):
+    laptop, expected = history
+    assert journal.take_snapshots(settle=timedelta(0)) == 2
+    StockMovement.objects.create(product=laptop, delta=-2, kind=StockMovement.ADJUSTMENT, created_at=at(10))
+    Product.objects.filter(pk=laptop.pk).update(quantity_in_stock=expected[-1] - 2)
+
+    snapshot = StockSnapshot.objects.get(product=laptop)
+    assert (snapshot.taken_at, snapshot.quantity) == (at(6), expected[-1])
+    with django_assert_num_queries(2):
+        assert journal.stock_as_of(laptop.pk, at(12)) == expected[-1] - 2
+    assert journal.stock_as_of(laptop.pk, at(6)) == expected[-1]
+    assert journal.stock_as_of(laptop.pk, at(3)) == expected[3]
+    assert journal.reconcile() == []
+
+    # A second run only snapshots products with new movements.
+    assert journal.take_snapshots(settle=timedelta(0)) == 1
+    assert StockSnapshot.objects.filter(product=laptop).latest('taken_at').quantity == expected[-1] - 2
+
+
+@pytest.mark.django_db
+def test_snapshots_leave_out_unsettled_movements(shop):
+    user, laptop, mouse, customer, supplier = shop
+
+    assert journal.take_snapshots() == 0
+    assert not StockSnapshot.objects.exists()
+
+
+@pytest.mark.django_db
+def test_reconcile_reports_stock_written_around_the_journal(shop):
+    user, laptop, mouse, customer, supplier = shop
+    journal.take_snapshots(settle=timedelta(0))
+    Product.objects.filter(pk=mouse.pk).update(quantity_in_stock=9)
+
+    assert journal.reconcile() == [(mouse.pk, 9, 3)]
+
+    out = io.StringIO()
+    with pytest.raises(CommandError, match='1 products disagree'):
+        call_command('reconcile_stock', stdout=out)
+    assert f'Product {mouse.pk}: quantity_in_stock 9, journal 3' in out.getvalue()
+
+    out = io.StringIO()
+    Product.objects.filter(pk=mouse.pk).update(quantity_in_stock=3)
+    call_command('reconcile_stock', owner='user1', stdout=out)
+    assert 'Stock matches the journal.' in out.getvalue()